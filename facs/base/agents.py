@@ -0,0 +1,258 @@
+"""Module for the AgentTable class, a columnar store of agent state."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterator
+
+import numpy as np
+
+from .location_types import building_types_dict
+
+if TYPE_CHECKING:
+    from .house import House
+    from .household import Household
+    from .location import Location
+    from .person import Person
+
+
+STATUSES = ("susceptible", "exposed", "infectious", "recovered", "dead", "immune")
+SUSCEPTIBLE, EXPOSED, INFECTIOUS, RECOVERED, DEAD, IMMUNE = range(len(STATUSES))
+STATUS_CODES = {name: code for code, name in enumerate(STATUSES)}
+
+# column name: (dtype, default value)
+AGENT_COLUMNS = {
+    "status": ("int8", SUSCEPTIBLE),
+    "age": ("int16", 0),
+    "job": ("int8", 0),
+    "phase_duration": ("float64", 0.0),
+    "status_change_time": ("float64", -1.0),
+    "household": ("int32", -1),
+    "house": ("int32", -1),
+    "hospital": ("int32", -1),
+    "mild_version": ("bool", True),
+    "hospitalised": ("bool", False),
+    "dying": ("bool", False),
+    "symptomatic": ("bool", False),
+    "work_from_home": ("bool", False),
+    "school_from_home": ("bool", False),
+    "antivax": ("bool", False),
+    # quantile of the agent in compliance with stay-at-home measures, see
+    # Ecosystem.add_partial_closure; 1.0 never complies.
+    "compliance": ("float32", 1.0),
+    "symptoms_suppressed": ("bool", False),
+}
+
+
+class AgentTable:
+    """
+    Stores the state of all agents of a rank in contiguous NumPy columns.
+
+    Every column in AGENT_COLUMNS is available as an attribute holding a view of
+    the rows in use, e.g. `table.status[i]` or `table.age[table.household == 3]`.
+    The views are rebound whenever agents are added, so they should not be kept
+    across calls to `add_agents`.
+
+    Statuses are stored as the integer codes in STATUSES. `status_counts` holds
+    the number of agents in each status, and `household_infectious` the number
+    of infectious, non-hospitalised agents in each household. Both are kept up
+    to date as long as statuses are changed through `set_status` and
+    hospitalisations through `set_hospitalised`. The indices of all susceptible
+    agents are kept in `susceptible` (in no particular order), so that they can
+    be sampled without scanning the table.
+    """
+
+    def __init__(self, capacity: int = 16, num_location_types: int | None = None):
+        if num_location_types is None:
+            num_location_types = len(building_types_dict)
+
+        self.size = 0
+        self.status_counts = np.zeros(len(STATUSES), dtype="int64")
+        self._household_infectious = np.zeros(capacity, dtype="int32")
+        self.houses: list[House] = []
+        self.households: list[Household] = []
+        self.locations: list[Location] = []  # non-house locations by loc_inf_minutes_id
+
+        self._defaults = {name: default for name, (_, default) in AGENT_COLUMNS.items()}
+        self._defaults["groups"] = -1
+        self._buffers = {
+            name: np.full(capacity, default, dtype=dtype)
+            for name, (dtype, default) in AGENT_COLUMNS.items()
+        }
+        # group number per location type, -1 if the agent has no grouping.
+        self._buffers["groups"] = np.full(
+            (capacity, num_location_types), -1, dtype="int32"
+        )
+        # unordered index of the susceptible agents, and the slot of every
+        # agent in that index (-1 if the agent is not susceptible).
+        for name in ("_susceptible_index", "_susceptible_slot"):
+            self._defaults[name] = -1
+            self._buffers[name] = np.full(capacity, -1, dtype="int64")
+        self._bind_columns()
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def capacity(self) -> int:
+        """Number of rows that fit in the table without reallocating."""
+        return len(self._buffers["status"])
+
+    @property
+    def household_infectious(self) -> np.ndarray:
+        """Number of infectious, non-hospitalised agents per household id."""
+        return self._household_infectious[: len(self.households)]
+
+    @property
+    def susceptible(self) -> np.ndarray:
+        """Indices of all susceptible agents, in no particular order."""
+        return self._buffers["_susceptible_index"][: self.status_counts[SUSCEPTIBLE]]
+
+    def _bind_columns(self):
+        for name, buffer in self._buffers.items():
+            setattr(self, name, buffer[: self.size])
+
+    def _reserve(self, capacity: int):
+        if capacity <= self.capacity:
+            return
+
+        capacity = max(capacity, 2 * self.capacity)
+        for name, buffer in self._buffers.items():
+            grown = np.full(
+                (capacity,) + buffer.shape[1:], self._defaults[name], dtype=buffer.dtype
+            )
+            grown[: self.size] = buffer[: self.size]
+            self._buffers[name] = grown
+
+    def add_agents(self, num: int, house_id: int, household_id: int) -> int:
+        """Append `num` agents with default state and return the first index."""
+
+        start = self.size
+        self._reserve(start + num)
+        self.size += num
+        self._index_susceptible(np.arange(start, start + num))
+        self.status_counts[SUSCEPTIBLE] += num
+        self._bind_columns()
+        self.house[start:] = house_id
+        self.household[start:] = household_id
+        return start
+
+    def state(self) -> dict:
+        """
+        Return copies of all columns and counters, for restore. Houses,
+        households and locations are not included.
+        """
+
+        return {
+            "columns": {
+                name: buffer[: self.size].copy()
+                for name, buffer in self._buffers.items()
+            },
+            "status_counts": self.status_counts.copy(),
+            "household_infectious": self.household_infectious.copy(),
+        }
+
+    def restore(self, state: dict):
+        """
+        Replace all agents with those of a state returned by `state`. The
+        households of the state must have been added already.
+        """
+
+        columns = state["columns"]
+        self.size = 0
+        self._reserve(len(columns["status"]))
+        for name, values in columns.items():
+            self._buffers[name][: len(values)] = values
+            self._buffers[name][len(values) :] = self._defaults[name]
+        self.size = len(columns["status"])
+        self.status_counts[:] = state["status_counts"]
+        self.household_infectious[:] = state["household_infectious"]
+        self._bind_columns()
+
+    def set_status(self, ids, code: int):
+        """Set the status of the (unique) agents in `ids` and update the counters."""
+
+        ids = np.atleast_1d(ids)
+        contagious = self._contagious(ids)
+        susceptible = self.status[ids] == SUSCEPTIBLE
+        if code == SUSCEPTIBLE:
+            self._index_susceptible(ids[~susceptible])
+        else:
+            self._unindex_susceptible(ids[susceptible])
+        self.status_counts -= np.bincount(self.status[ids], minlength=len(STATUSES))
+        self.status_counts[code] += len(ids)
+        self.status[ids] = code
+        self._count_household_infectious(ids, contagious)
+
+    def set_hospitalised(self, ids, value: bool):
+        """Set whether the agents in `ids` are hospitalised and update the counters."""
+
+        ids = np.atleast_1d(ids)
+        contagious = self._contagious(ids)
+        self.hospitalised[ids] = value
+        self._count_household_infectious(ids, contagious)
+
+    def _index_susceptible(self, ids: np.ndarray):
+        """Append agents that become susceptible to the susceptible index."""
+
+        count = self.status_counts[SUSCEPTIBLE]
+        slots = np.arange(count, count + len(ids))
+        self._buffers["_susceptible_index"][slots] = ids
+        self._buffers["_susceptible_slot"][ids] = slots
+
+    def _unindex_susceptible(self, ids: np.ndarray):
+        """Remove agents that stop being susceptible from the susceptible index."""
+
+        index = self._buffers["_susceptible_index"]
+        slots = self._buffers["_susceptible_slot"]
+        count = self.status_counts[SUSCEPTIBLE]
+        for i in ids:
+            # move the last agent in the index into the freed slot.
+            count -= 1
+            last = index[count]
+            index[slots[i]] = last
+            slots[last] = slots[i]
+            slots[i] = -1
+
+    def _contagious(self, ids: np.ndarray) -> np.ndarray:
+        return (self.status[ids] == INFECTIOUS) & ~self.hospitalised[ids]
+
+    def _count_household_infectious(self, ids: np.ndarray, before: np.ndarray):
+        change = self._contagious(ids).astype("int32") - before
+        changed = np.flatnonzero(change)
+        if len(changed) > 0:
+            np.add.at(
+                self._household_infectious,
+                self.household[ids[changed]],
+                change[changed],
+            )
+
+    def add_house(self, house: House) -> int:
+        """Register a house and return its id."""
+
+        self.houses.append(house)
+        return len(self.houses) - 1
+
+    def add_household(self, household: Household) -> int:
+        """Register a household and return its id."""
+
+        num = len(self.households)
+        if num == len(self._household_infectious):
+            self._household_infectious = np.concatenate(
+                (self._household_infectious, np.zeros(max(num, 16), dtype="int32"))
+            )
+        self.households.append(household)
+        return num
+
+    def person(self, index: int) -> Person:
+        """Return a Person view of the agent at `index`."""
+
+        # pylint: disable=import-outside-toplevel
+        from .person import Person
+
+        return Person.view(self, index)
+
+    def people(self) -> Iterator[Person]:
+        """Iterate over Person views of all agents."""
+
+        for i in range(self.size):
+            yield self.person(i)
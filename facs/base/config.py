@@ -0,0 +1,85 @@
+"""
+Module for the Config class, the input configuration of a simulation.
+
+A Config names the data directory of a run and loads the files in it on
+first use only, so importing facs reads nothing from disk and every
+Ecosystem (or worker process) can use its own data directory.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+from functools import cached_property
+
+import yaml
+
+from facs.readers.read_disease_yml import read_disease_yml
+from .location_types import building_types_dict, get_building_types, read_building_types
+from .needs import Needs
+
+
+class Config:
+    """
+    Input configuration of a simulation, read lazily from data_dir.
+
+    immunity_disease_yml names the disease file (without extension) whose
+    immunity duration and fraction apply to the initially immune agents.
+    """
+
+    def __init__(
+        self, data_dir: str = "covid_data", immunity_disease_yml: str = "disease_measles"
+    ):
+        self.data_dir = data_dir
+        self.immunity_disease_yml = immunity_disease_yml
+
+    def __repr__(self) -> str:
+        return f"Config({self.data_dir!r}, {self.immunity_disease_yml!r})"
+
+    @property
+    def needs_file(self) -> str:
+        """The needs CSV file."""
+        return f"{self.data_dir}/needs.csv"
+
+    @cached_property
+    def building_types_data(self) -> dict[str, dict]:
+        """
+        The building types map, with the labels, default size, number of
+        neighbours and flags of every location type.
+        """
+
+        ymlfile = f"{self.data_dir}/building_types_map.yml"
+        if get_building_types(read_building_types(ymlfile=ymlfile)) != building_types_dict:
+            raise ValueError(
+                f"{ymlfile} must define the location types {building_types_dict}."
+            )
+
+        with open(ymlfile, encoding="utf-8") as f:
+            return yaml.safe_load(f)
+
+    def load_needs(self) -> Needs:
+        """Read a new Needs table from the needs CSV file."""
+        return Needs(self.needs_file, list(building_types_dict))
+
+    @cached_property
+    def antivax_fraction(self) -> float:
+        """Fraction of agents that refuse vaccination."""
+
+        with open(f"{self.data_dir}/vaccinations.yml", encoding="utf-8") as f:
+            return yaml.safe_load(f)["antivax_fraction"]
+
+    @cached_property
+    def immunity(self) -> tuple[float, float]:
+        """Immunity duration and fraction of the initially immune agents."""
+
+        disease = read_disease_yml(f"{self.data_dir}/{self.immunity_disease_yml}.yml")
+        return disease.immunity_duration, disease.immunity_fraction
+
+
+@functools.cache
+def default_config(data_dir: str = "covid_data") -> Config:
+    """
+    Return a shared Config of a data directory, for code that is not given
+    one (e.g. agents added outside of an Ecosystem).
+    """
+    return Config(os.path.normpath(data_dir))
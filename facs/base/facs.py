@@ -5,34 +5,51 @@
 # Covid-19 model, based on the general Flee paradigm.
 
 import csv
-import random
+import os
 import sys
+import warnings
 
 from datetime import timedelta
 
 import numpy as np
 import pandas as pd
 
-from .needs import Needs
+from .agents import AgentTable, SUSCEPTIBLE, INFECTIOUS, DEAD
+from .config import Config
 from .location_types import building_types_dict, building_types
 from .house import House
 from .location import Location
+from .population import add_households
 from .utils import (
-    probability,
     get_random_int,
+    sample_without_replacement,
     out_files,
     calc_dist,
     write_log_headers,
-    check_vac_eligibility,
 )
-from .mpi import MPIManager
+from .mpi import MPIManager, SerialManager
+from .rng import rng
+from .snapshot import (
+    disease_differences,
+    get_snapshot,
+    set_snapshot,
+    save_snapshot,
+    load_snapshot,
+    write_outputs,
+)
+from .spatial import LocationIndex, nearest_location_matrix
+from .progression import progress_conditions
+from .transmission import spread_infections, infect_agents
+from .visits import VisitPlanner, VisitBuffer
 
 log_prefix = "."
 
 class Ecosystem:
-    def __init__(self, duration, data_dir, mode="parallel"):
+    def __init__(self, duration, data_dir, mode="parallel", seed=None, config=None):
+        # input files are read from the configuration when first needed.
+        self.config = Config(data_dir) if config is None else config
         self.data_dir = data_dir
-        self.needsfile = f"{self.data_dir}/needs.csv"
+        self.needsfile = self.config.needs_file
         
         # Moveing MPI setup to the top to ensures `self.rank` exists early
         self.size = 1  # number of processes
@@ -44,24 +61,42 @@ class Ecosystem:
             self.rank = self.mpi.comm.Get_rank()
             self.size = self.mpi.comm.Get_size()
             self.mpi.comm.Barrier()  # Ensure all ranks reach this point before continuing
+        else:
+            self.mpi = SerialManager()
 
         if self.rank == 0:
             print(f"MPI initialized with {self.size} ranks available.")
 
+        # every rank draws from its own stream, spawned from the seed.
+        self.seed = seed
+        if seed is None:
+            if self.mode == "parallel":
+                rng.entropy = self.mpi.comm.bcast(rng.entropy, root=0)
+            rng.spawn(self.rank, self.size)
+        else:
+            rng.seed(seed, self.rank, self.size)
+
         self.global_stats = np.zeros(6, dtype="int64")
         
         # Only Rank 0 creates the Needs object
-        global needs
         if self.rank == 0:
-            needs = Needs(self.needsfile, building_types)
+            needs = self.config.load_needs()
             needs.compute_needs_statistics()
         else:
             needs = None  # Other ranks start with None
 
         # Broadcast Needs object to all MPI ranks
-        needs = self.mpi.comm.bcast(needs, root=0)
-        
+        if self.mode == "parallel":
+            needs = self.mpi.comm.bcast(needs, root=0)
+        self.needs = needs
+
+        self.agents = AgentTable()
+        self.visit_planner = None  # built on the first day, see evolve().
         self.locations = {}
+        self.location_indices = {}  # spatial index per location type, built on demand.
+        # preferred locations per house and location type, as indices into
+        # self.locations[type] padded with -1 (see update_nearest_locations).
+        self.nearest_locations = None
         self.houses = []
         self.house_names = []
         self.time = 0
@@ -70,6 +105,8 @@ class Ecosystem:
         self.num_hospitalised = 0  # currently in hospital (ICU)
         self.disease = None
         self.closures = {}
+        # dated entries of the measures file in use, see Measures.
+        self.measures_entries = None
         self.validation = np.zeros(duration + 1)
         self.contact_rate_multiplier = {}
         self.initialise_social_distance()  # default: no social distancing.
@@ -102,14 +139,6 @@ class Ecosystem:
         self.vaccinations_legal_age_limit = 16  # Minimum age to be allowed vaccines.
         self.vaccine_effect_time = 14
         self.traffic_multiplier = 0.0
-        self.status = {
-            "susceptible": 0,
-            "exposed": 0,
-            "infectious": 0,
-            "recovered": 0,
-            "dead": 0,
-            "immune": 0,
-        }
         self.enforce_masks_on_transport = False
         self.loc_groups = {}
 
@@ -137,6 +166,7 @@ class Ecosystem:
         
         self.debug_mode = False
         self.verbose = False
+        self.outfile = None  # main output file, set by print_header.
 
     def get_partition_size(self, num):
         """
@@ -157,6 +187,7 @@ class Ecosystem:
                 for i in range(0, len(self.locations[lt])):
                     self.locations[lt][i].loc_inf_minutes_id = offset + i
                     self.loc_m2[lt] += self.locations[lt][i].sqm
+                self.agents.locations.extend(self.locations[lt])
 
                 if self.rank == 0 and self.verbose:
                     print(
@@ -168,6 +199,7 @@ class Ecosystem:
                 self.loc_offsets[lt] = offset
                 offset += len(self.locations[lt])
         self.loc_inf_minutes = np.zeros(self.number_of_non_house_locations, dtype="f8")
+        self.visits = VisitBuffer(self.number_of_non_house_locations)
 
     def reset_loc_inf_minutes(self):
         self.loc_inf_minutes = np.zeros(self.number_of_non_house_locations, dtype="f8")
@@ -197,11 +229,12 @@ class Ecosystem:
         for i in range(0, max_groups):
             self.loc_groups[loc_type][i] = self.locations[loc_type][i % num_locs]
 
+        self.visit_planner = None
+
         # randomly assign agents to groups
-        for k, e in enumerate(self.houses):
-            for hh in e.households:
-                for a in hh.agents:
-                    a.assign_group(loc_type, max_groups)
+        self.agents.groups[:, building_types_dict[loc_type]] = rng.generator.integers(
+            0, max_groups, len(self.agents)
+        )
 
     def get_location_by_group(self, loc_type_id, group_num):
         loc_type = building_types[loc_type_id]
@@ -235,14 +268,9 @@ class Ecosystem:
             return
 
         # Synchronize infection statistics
-        self.print_status(None, silent=True)  
-        num_agents = (
-            self.global_stats[0]
-            + self.global_stats[1]
-            + self.global_stats[2]
-            + self.global_stats[3]
-            + self.global_stats[5]  # Exclude dead individuals
-        )
+        status_counts = self.global_status_counts()
+        # Exclude dead individuals
+        num_agents = status_counts.sum() - status_counts[DEAD]
 
         # Handle external infections only if enabled
         if self.external_travel_multiplier > 0:
@@ -260,7 +288,7 @@ class Ecosystem:
         # Adjust based on duration & exposure
         exposure_time_factor = (30.0 / 1440.0)  # 30 min exposure / full day
         occupancy_factor = (
-            (self.global_stats[2] + infected_external_passengers) / num_agents
+            (status_counts[INFECTIOUS] + infected_external_passengers) / num_agents
         )  # Proportion of infected travelers
 
         infection_probability = base_infection_probability * exposure_time_factor * occupancy_factor
@@ -275,15 +303,13 @@ class Ecosystem:
         if self.enforce_masks_on_transport:
             infection_probability *= 0.44  # 56% reduction from masks
 
-        # Iterate through agents and infect if probability threshold is met
-        num_inf = 0
-        for i in range(0, len(self.houses)):
-            h = self.houses[i]
-            for hh in h.households:
-                for a in hh.agents:
-                    if probability(infection_probability):  # Use new adjusted probability
-                        a.infect(self, location_type="traffic")
-                        num_inf += 1
+        # Draw the number of infected susceptibles, then pick them directly
+        susceptible = self.agents.susceptible
+        num_inf = rng.generator.binomial(
+            len(susceptible), min(infection_probability, 1.0)
+        )
+        infected = susceptible[sample_without_replacement(len(susceptible), num_inf)]
+        infect_agents(self, infected, ["traffic"] * num_inf)
 
         # Log results
         if self.rank == 0:
@@ -307,13 +333,13 @@ class Ecosystem:
             # print(building_types)
             # sys.exit()
 
+            nearest = np.full((len(self.houses), len(building_types_dict), 1), -1)
             for row in near_reader:
                 # print(row)
-                self.houses[i].nearest_locations = row
-                n = []
                 for j in range(0, len(header_row)):
                     try:
-                        n.append(self.locations[header_row[j]][int(row[j])])
+                        self.locations[header_row[j]][int(row[j])]
+                        nearest[i, building_types_dict[header_row[j]], 0] = int(row[j])
                     except:
                         print("ERROR: nearest building lookup from file failed:")
                         print("row in CSV: ", i)
@@ -331,36 +357,158 @@ class Ecosystem:
                             len(self.locations[header_row[j]]),
                         )
                         sys.exit()
-                self.houses[i].nearest_locations = n
-                # print(self.houses[i].nearest_locations)
                 i += 1
+            self.nearest_locations = nearest.astype("int32")
+            self.visit_planner = None
         except IOError:
             return False
 
-    def update_nearest_locations(self, dump_and_exit=False):
+    def save_nearest_locations(self, fname):
+        """
+        Save the nearest locations matrix to a compressed .npz file.
+        """
+        os.makedirs(os.path.dirname(fname) or ".", exist_ok=True)
+        np.savez_compressed(
+            fname,
+            nearest_locations=self.nearest_locations,
+            num_locations=self._num_locations_per_type(),
+        )
+
+    def load_nearest_locations(self, fname):
+        """
+        Load the nearest locations matrix from a .npz file written by
+        save_nearest_locations. Returns False if the file does not exist or
+        does not match the houses and locations of this ecosystem.
+        """
+        if not os.path.exists(fname):
+            return False
+
+        with np.load(fname) as data:
+            nearest = data["nearest_locations"]
+            num_locations = data["num_locations"]
+        if nearest.shape[:2] != (len(self.houses), len(building_types_dict)):
+            return False
+        if not np.array_equal(num_locations, self._num_locations_per_type()):
+            return False
+
+        self.nearest_locations = nearest
+        self.visit_planner = None
+        return True
+
+    def get_snapshot(self):
+        """
+        Return the state of this rank (agents, locations, groupings, nearest
+        locations, counters, measures, random number streams and output so
+        far), see snapshot.get_snapshot. The state can be restored any number
+        of times with set_snapshot, e.g. to branch several scenarios off it.
+        """
+        return get_snapshot(self)
+
+    def set_snapshot(self, state):
+        """
+        Restore the state of this rank from get_snapshot, replacing the
+        population and locations of this ecosystem.
+        """
+        set_snapshot(self, state)
+
+    def save_snapshot(self, fname):
+        """
+        Save the state of this rank to a per-rank file, see
+        snapshot.save_snapshot.
+        """
+        save_snapshot(self, fname)
+
+    def load_snapshot(self, fname, outfile=None):
+        """
+        Restore the state of this rank from a file written by save_snapshot.
+        If outfile is given, the output written before the snapshot is
+        restored too, with the main output going to outfile.
+
+        The disease is restored from the snapshot too. If a different disease
+        was set before loading, a warning is given.
+        """
+        requested = self.disease
+        state = load_snapshot(self, fname)
+        if requested is not None and self.rank == 0:
+            differences = disease_differences(requested, self.disease)
+            if differences:
+                warnings.warn(
+                    f"Snapshot {fname} holds disease {self.disease.name!r}, "
+                    f"which differs from the requested disease "
+                    f"{requested.name!r} in {', '.join(differences)}. "
+                    "The disease of the snapshot is used.",
+                    RuntimeWarning,
+                )
+        if self.mode == "parallel":
+            times = self.mpi.comm.allgather(self.time)
+            if min(times) != max(times):
+                raise ValueError(
+                    f"Snapshot files {fname} were taken on different days {times}."
+                )
+        if outfile is not None:
+            write_outputs(self, state, outfile)
+
+    def _num_locations_per_type(self):
+        types = sorted(building_types_dict, key=building_types_dict.get)
+        return np.array([len(self.locations.get(l, [])) for l in types])
+
+    def update_nearest_locations(
+        self, dump_and_exit=False, engine="block", cache_file=None
+    ):
+        """
+        Find the preferred locations of all houses for every location type.
+
+        engine "block" measures blocks of houses against all locations of a
+        type at once, "index" queries the spatial index house by house.
+        If cache_file is given, the result is loaded from it when it matches
+        this ecosystem, and saved to it otherwise.
+        """
         f = None
-        read_from_file = False
         if dump_and_exit == True:
             f = open("nearest_locations.csv", "w")
 
         if dump_and_exit == True:
             # print header row
             print(",".join(f"{x}" for x in building_types), file=f)
+        elif cache_file is not None and self.load_nearest_locations(cache_file):
+            print(f"Nearest locations loaded from {cache_file}.", file=sys.stderr)
+            self._assign_house_slices()
+            return
 
-        count = 0
         print("Updating nearest locations...", file=sys.stderr)
-        for h in self.houses:
-            ni = h.find_nearest_locations(self)
-            if dump_and_exit == True:
-                print(",".join(f"{x}" for x in ni), file=f)
-            count += 1
-            if count % 1000 == 0:
-                print(f"{count} houses scanned.", file=sys.stderr, end="\r")
-        print(f"Total {count} houses scanned.", file=sys.stderr)
+        types = sorted(building_types_dict, key=building_types_dict.get)
+        indices = []
+        for l in types:
+            if l not in self.locations:
+                print("WARNING: location type missing")
+                indices.append(None)
+            else:
+                indices.append(self.get_location_index(l))
+        self.nearest_locations = nearest_location_matrix(
+            np.array([h.location_x for h in self.houses]),
+            np.array([h.location_y for h in self.houses]),
+            indices,
+            [self.config.building_types_data[l]["neighbours"] for l in types],
+            [self.config.building_types_data[l]["fixed"] for l in types],
+            engine=engine,
+            generator=rng.independent("nearest_locations"),
+        )
+        if dump_and_exit == True:
+            for row in self.nearest_locations:
+                ni = [row[building_types_dict[l]] for l in building_types]
+                print(",".join(f"{x[x >= 0].tolist()}" for x in ni), file=f)
+        print(f"Total {len(self.houses)} houses scanned.", file=sys.stderr)
+        self.visit_planner = None
 
         if dump_and_exit == True:
             sys.exit()
 
+        if cache_file is not None:
+            self.save_nearest_locations(cache_file)
+
+        self._assign_house_slices()
+
+    def _assign_house_slices(self):
         if self.mode == "parallel":
             # Assign houses to ranks for parallelisation.
 
@@ -447,7 +595,7 @@ class Ecosystem:
                 )
 
         # remove visits from the previous day
-        total_visits = 0
+        total_visits = len(self.visits)
 
         if self.debug_mode:
             self.visit_minutes = self.mpi.CalcCommWorldTotalSingle(self.visit_minutes)
@@ -474,71 +622,38 @@ class Ecosystem:
             self.base_rate = 0.0
             self.loc_evolves = 0.0
 
-        for lk in self.locations.keys():
-            for l in self.locations[lk]:
-                total_visits += len(l.visits)
-                l.clear_visits(self)
+        self.visits.clear()
         self.reset_loc_inf_minutes()
 
         if self.rank == 0 and self.verbose:
             print("total visits:", total_visits)
 
         # collect visits for the current day
-        for i in range(0, len(self.houses)):
-            h = self.houses[i]
-            for hh in h.households:
-                for a in hh.agents:
-                    a.plan_visits(self)
-                    a.progress_condition(self, self.time, self.disease)
-
-                    if (
-                        a.age > self.vaccinations_age_limit
-                        and self.vaccinations_available - self.vaccinations_today > 0
-                    ):
-                        if check_vac_eligibility(a) == True:
-                            a.vaccinate(
-                                self.time,
-                                self.vac_no_symptoms,
-                                self.vac_no_transmission,
-                                self.vac_duration,
-                            )
-                            self.vaccinations_today += 1
-
-        if self.vaccinations_available - self.vaccinations_today > 0:
-            for i in range(0, len(self.houses)):
-                h = self.houses[i]
-                for hh in h.households:
-                    for a in hh.agents:
-                        # print("VAC:",self.vaccinations_available, self.vaccinations_today, self.vac_no_symptoms, self.vac_no_transmission, file=sys.stderr)
-                        if self.vaccinations_available - self.vaccinations_today > 0:
-                            if (
-                                a.age > self.vaccinations_legal_age_limit
-                                and check_vac_eligibility(a) == True
-                            ):
-                                a.vaccinate(
-                                    self.time,
-                                    self.vac_no_symptoms,
-                                    self.vac_no_transmission,
-                                    self.vac_duration,
-                                )
-                                self.vaccinations_today += 1
+        if self.visit_planner is None:
+            self.visit_planner = VisitPlanner(self)
+        self.visits.load(*self.visit_planner.plan(self))
+
+        progress_conditions(self, self.time, self.disease)
+
+        self.vaccinate_eligible(self.vaccinations_age_limit)
+        self.vaccinate_eligible(self.vaccinations_legal_age_limit)
 
         self._aggregate_loc_inf_minutes()
         if self.rank == 0 and self.verbose:
             print(self.rank, np.sum(self.loc_inf_minutes))
 
         # process visits for the current day (spread infection).
-        for lk in self.locations:
-            if lk in self.closures:
-                if self.closures[lk] < self.time:
-                    continue
-            for l in self.locations[lk]:
-                l.evolve(self, reduce_stochasticity)
+        if reduce_stochasticity:
+            print(
+                "reduce_stochasticity not supported for the time being,",
+                "due to instabilities in parallel implementation.",
+            )
+        else:
+            spread_infections(self, self.visit_planner)
 
         # process intra-household infection spread.
-        for i in range(0, len(self.houses)):
-            h = self.houses[i]
-            h.evolve(self, self.disease)
+        for i in np.flatnonzero(self.agents.household_infectious):
+            self.agents.households[i].evolve(self, self.disease)
 
         # process infection via public transport.
         self.evolve_public_transport()
@@ -547,40 +662,75 @@ class Ecosystem:
         self.date = self.date + timedelta(days=1)
         self.seasonal_effect = self.get_seasonal_effect()
 
+    def vaccinate_eligible(self, age_limit):
+        """
+        Vaccinate eligible agents older than age_limit, in order,
+        until today's vaccinations are used up.
+        """
+        remaining = int(np.ceil(self.vaccinations_available - self.vaccinations_today))
+        if remaining <= 0:
+            return
+
+        a = self.agents
+        eligible = np.flatnonzero(
+            (a.age > age_limit)
+            & (a.status == SUSCEPTIBLE)
+            & ~a.symptoms_suppressed
+            & ~a.antivax
+        )
+        for i in eligible[:remaining]:
+            a.person(i).vaccinate(
+                self.time,
+                self.vac_no_symptoms,
+                self.vac_no_transmission,
+                self.vac_duration,
+            )
+            self.vaccinations_today += 1
+
     def addHouse(self, name, x, y, num_households=1):
-        house = House(x, y)
-        house.add_households(self.household_size, self.ages, num_households)
+        house = House(x, y, agent_table=self.agents)
+        house.add_households(
+            self.household_size, self.ages, num_households, self.config
+        )
         self.num_agents += house.total_size
         self.houses.append(house)
 
         self.house_names.append(name)
         return house
 
-    def addRandomOffice(self, office_log, name, xbounds, ybounds, office_size):
+    def add_houses(self, names, xs, ys, num_households=1):
         """
-        Office coordinates are generated on Rank 0, then broadcasted to others.
+        Add a house for every name, at the coordinates in xs and ys.
         """
+        houses = [
+            House(x, y, agent_table=self.agents)
+            for x, y in zip(np.asarray(xs).tolist(), np.asarray(ys).tolist())
+        ]
+        add_households(
+            houses, self.household_size, self.ages, num_households, self.config
+        )
+        self.num_agents += sum(house.total_size for house in houses)
+        self.houses.extend(houses)
+        self.house_names.extend(np.asarray(names).tolist())
 
-        data = None  # Explicitly initialize `data` to None
-
-        if self.rank == 0:
-            x = random.uniform(xbounds[0], xbounds[1])
-            y = random.uniform(ybounds[0], ybounds[1])
-            data = [x, y]
-
-        # Broadcast the data to all ranks
-        data = self.mpi.comm.bcast(data, root=0)
-
-        # Ensure data is valid after broadcast
-        if data is None:
-            raise ValueError(f"MPI Broadcast Failed! Rank {self.rank} received None.")
-
-        # Add the office location
-        self.addLocation(name, "office", data[0], data[1], office_size)
-
-        # Only Rank 0 writes to the office log to prevent duplicate writes
-        if self.rank == 0:
-            office_log.write("office,{},{},{}\n".format(data[0], data[1], office_size))
+    def add_random_offices(self, names, xbounds, ybounds, office_size, office_log=None):
+        """
+        Add an office at a random position within the bounds for every name.
+        The positions are drawn from a stream shared by all ranks, so every
+        rank places the same offices without communicating. Rank 0 writes
+        them to office_log, if given.
+        """
+        generator = rng.shared("offices")
+        x = generator.uniform(xbounds[0], xbounds[1], len(names))
+        y = generator.uniform(ybounds[0], ybounds[1], len(names))
+        self.add_locations("office", names, x, y, np.full(len(names), office_size))
+
+        if self.rank == 0 and office_log is not None:
+            with open(office_log, "w") as f:
+                f.writelines(
+                    f"office,{ox},{oy},{office_size}\n"
+                    for ox, oy in zip(x.tolist(), y.tolist())
+                )
 
     def addLocation(self, name, loc_type, x, y, sqm=400):
         l = Location(name, loc_type, x, y, sqm)
@@ -588,8 +738,45 @@ class Ecosystem:
             self.locations[loc_type].append(l)
         else:
             self.locations[loc_type] = [l]
+        self.location_indices.pop(loc_type, None)
         return l
 
+    def add_locations(self, loc_type, names, xs, ys, sqms):
+        """
+        Add a location of loc_type for every name, with the coordinates and
+        sizes in xs, ys and sqms.
+        """
+        self.locations.setdefault(loc_type, []).extend(
+            Location(name, loc_type, x, y, sqm)
+            for name, x, y, sqm in zip(
+                np.asarray(names).tolist(),
+                np.asarray(xs).tolist(),
+                np.asarray(ys).tolist(),
+                np.asarray(sqms).tolist(),
+            )
+        )
+        self.location_indices.pop(loc_type, None)
+
+    def get_location_index(self, loc_type):
+        """
+        Return the spatial index of the locations of a type.
+        """
+        if loc_type not in self.location_indices:
+            if min([l.sqm for l in self.locations[loc_type]]) <= 0:
+                print("WARNING: location type with 0 sqm")
+                print(f"type: {loc_type}")
+                print(
+                    "These errors are commonly caused by corruptions in the <building>.csv file."
+                )
+                print("To detect these, you can use the following command:")
+                print('cat <buildings file name>.csv | grep -v house | grep ",0$"')
+                sys.exit()
+
+            self.location_indices[loc_type] = LocationIndex.from_locations(
+                self.locations[loc_type]
+            )
+        return self.location_indices[loc_type]
+
     def add_closure(self, loc_type, time):
         self.closures[loc_type] = time
 
@@ -600,51 +787,43 @@ class Ecosystem:
         self.closures = {}
 
     def add_partial_closure(self, loc_type, fraction=0.8, exclude_people=False):
+        # with exclude_people, the agents whose fixed compliance quantile is
+        # below the fraction stay home, so the same agents keep complying as
+        # the fraction changes.
         if loc_type == "school":
             fraction = min(fraction, 1.0 - self.keyworker_fraction)
             if exclude_people:
-                for k, e in enumerate(self.houses):
-                    for hh in e.households:
-                        for a in hh.agents:
-                            if probability(fraction):
-                                a.school_from_home = True
-                            else:
-                                a.school_from_home = False
+                np.less(
+                    self.agents.compliance, fraction, out=self.agents.school_from_home
+                )
             else:
-                needs.scale_needs(loc_type, 1.0 - fraction)
+                self.needs.set_multiplier(loc_type, 1.0 - fraction)
 
         elif loc_type == "office":
             fraction = min(fraction, 1.0 - self.keyworker_fraction)
             if exclude_people:
-                for k, e in enumerate(self.houses):
-                    for hh in e.households:
-                        for a in hh.agents:
-                            if probability(fraction):
-                                a.work_from_home = True
-                            else:
-                                a.work_from_home = False
+                np.less(
+                    self.agents.compliance, fraction, out=self.agents.work_from_home
+                )
             else:
-                needs.scale_needs(loc_type, 1.0 - fraction)
+                self.needs.set_multiplier(loc_type, 1.0 - fraction)
 
         else:
             if loc_type == "school_parttime":
                 loc_type = "school"
 
-            needs.scale_needs(loc_type, 1.0 - fraction)
+            self.needs.set_multiplier(loc_type, 1.0 - fraction)
 
     def undo_partial_closure(self, loc_type, fraction=0.8):
         if loc_type == "school":
-            for k, e in enumerate(self.houses):
-                for hh in e.households:
-                    for a in hh.agents:
-                        a.school_from_home = False
+            self.agents.school_from_home[:] = False
         elif loc_type == "office":
-            for k, e in enumerate(self.houses):
-                for hh in e.households:
-                    for a in hh.agents:
-                        a.work_from_home = False
+            self.agents.work_from_home[:] = False
         else:
-            needs.scale_needs(loc_type, 1.0 / (1.0 - fraction))
+            if loc_type == "school_parttime":
+                loc_type = "school"
+
+            self.needs.set_multiplier(loc_type, 1.0)
 
     def initialise_social_distance(self, contact_ratio=1.0):
         for l in building_types_dict:
@@ -667,11 +846,9 @@ class Ecosystem:
     def remove_all_measures(self):
         self.initialise_social_distance()
         self.remove_closures()
-        for k, e in enumerate(self.houses):
-            for hh in e.households:
-                for a in hh.agents:
-                    a.school_from_home = False
-                    a.work_from_home = False
+        self.needs.reset_multipliers()
+        self.agents.school_from_home[:] = False
+        self.agents.work_from_home[:] = False
 
     def add_work_from_home(self, compliance=0.75):
         self.add_partial_closure("office", compliance, exclude_people=True)
@@ -757,7 +934,7 @@ class Ecosystem:
 
             df.to_csv(csv_file, index=False)
 
-    def find_hospital(self):
+    def _large_hospitals(self):
         hospitals = []
         sqms = []
         if "hospital" not in self.locations.keys():
@@ -774,15 +951,26 @@ class Ecosystem:
                 print("Error: couldn't find hospitals with more than 4000 sqm.")
                 sys.exit()
         sqms = [float(i) / sum(sqms) for i in sqms]
-        return np.random.choice(hospitals, p=sqms)
+        return hospitals, sqms
+
+    def find_hospital(self):
+        hospitals, sqms = self._large_hospitals()
+        return rng.generator.choice(hospitals, p=sqms)
+
+    def find_hospitals(self, num):
+        """
+        Pick num hospitals, weighted by size, and return their loc_inf_minutes ids.
+        """
+        hospitals, sqms = self._large_hospitals()
+        ids = [h.loc_inf_minutes_id for h in hospitals]
+        return rng.generator.choice(ids, size=num, p=sqms)
 
     def print_needs(self):
-        for k, e in enumerate(self.houses):
-            for hh in e.households:
-                for a in hh.agents:
-                    print(k, a.get_needs())
+        for a in self.agents.people():
+            print(self.agents.house[a.index], a.get_needs(self.needs))
 
     def print_header(self, outfile):
+        self.outfile = outfile
         write_log_headers(
             self.rank
         )  # also write headers for process-specific log files.
@@ -794,24 +982,23 @@ class Ecosystem:
                 flush=True,
             )
 
+    def global_status_counts(self):
+        """
+        Return the number of agents in each status, summed over all ranks.
+        """
+        if self.mode == "parallel":
+            return self.mpi.CalcCommWorldTotal(self.agents.status_counts)
+        return self.agents.status_counts.copy()
+
     def print_status(self, outfile, silent=False):
-        local_stats = {
-            "susceptible": 0,
-            "exposed": 0,
-            "infectious": 0,
-            "recovered": 0,
-            "dead": 0,
-            "immune": 0,
-            "num_infections_today": self.num_infections_today,
-            "num_hospitalisations_today": self.num_hospitalisations_today,
-            "num_hospitalised": self.num_hospitalised,
-        }
-        for k, elem in enumerate(self.houses):
-            for hh in elem.households:
-                for a in hh.agents:
-                    # print(hh,a, a.status)
-                    local_stats[a.status] += 1
-        self.mpi.gather_stats(self, list(local_stats.values()))
+        # susceptible, exposed, infectious, recovered, dead, immune
+        local_stats = [
+            *self.agents.status_counts,
+            self.num_infections_today,
+            self.num_hospitalisations_today,
+            self.num_hospitalised,
+        ]
+        self.mpi.gather_stats(self, local_stats)
         if not silent:
             if self.rank == 0:
                 out = out_files.open(outfile)
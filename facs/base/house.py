@@ -1,19 +1,17 @@
 """Module for the House class."""
 
 from __future__ import annotations
-import sys
 
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
-import numpy as np
-
+from .agents import AgentTable
 from .household import Household
-from .location import Location
-from .utils import get_random_int, calc_dist
-from .location_types import building_types, building_types_data
+from .population import add_households
+from .utils import get_random_int
 
 if TYPE_CHECKING:
+    from .config import Config
     from .facs import Ecosystem
     from .disease import Disease
 
@@ -25,19 +23,24 @@ class House:
     location_x: float
     location_y: float
     households: list[Household] = field(default_factory=list)
-    nearest_locations: list[list[Location]] = field(default_factory=list)
     num_agents: int = 0
     total_size: int = 0
+    agent_table: AgentTable = field(default_factory=AgentTable, repr=False)
+    house_id: int = field(default=-1, init=False)
+
+    def __post_init__(self):
+        self.house_id = self.agent_table.add_house(self)
 
     def add_households(
-        self, household_size: int, ages: list[float], num_households: int
+        self,
+        household_size: int,
+        ages: list[float],
+        num_households: int,
+        config: Config | None = None,
     ):
         """Add households to the house."""
 
-        for _ in range(num_households):
-            size = 1 + np.random.poisson(household_size - 1)
-            self.total_size += size
-            self.households.append(Household(self, ages, size))
+        add_households([self], household_size, ages, num_households, config)
 
     def increment_num_agents(self):
         """Add an agent to the house."""
@@ -50,52 +53,6 @@ class House:
         for household in self.households:
             household.evolve(e, disease)
 
-    def find_nearest_locations(self, e: Ecosystem):
-        """
-        identify preferred locations for each particular purpose,
-        and store in an array.
-
-        Takes into account distance, and to a lesser degree size.
-        """
-        n = []
-        ni = []
-        for l in building_types:
-            if l not in e.locations.keys():
-                n.append(None)
-                print("WARNING: location type missing")
-
-            if min([element.sqm for element in e.locations[l]]) <= 0:
-                print("WARNING: location type with 0 sqm")
-                print(f"type: {l}")
-                print(
-                    "These errors are commonly caused by corruptions in the <building>.csv file."
-                )
-                print("To detect these, you can use the following command:")
-                print('cat <buildings file name>.csv | grep -v house | grep ",0$"')
-                sys.exit()
-
-            scaled_distances = [
-                calc_dist(self.location_x, self.location_y, element.x, element.y)
-                / np.sqrt(element.sqm)
-                for element in e.locations[l]
-            ]
-            sorted_indices = sorted(
-                range(len(scaled_distances)), key=lambda k: scaled_distances[k]
-            )
-            num_neighbours = building_types_data[l]["neighbours"]
-            sorted_indices_truncated = sorted_indices[:num_neighbours]
-
-            if building_types_data[l]["fixed"]:
-                sorted_indices_truncated = list(
-                    np.random.choice(sorted_indices_truncated, 1)
-                )
-
-            n.append([e.locations[l][i] for i in sorted_indices_truncated])
-            ni.append(sorted_indices_truncated)
-
-        self.nearest_locations = n
-        return ni
-
     def add_infection(self, e, severity="exposed"):
         """Pre-seed infections in the house."""
 
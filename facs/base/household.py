@@ -2,16 +2,17 @@
 
 from __future__ import annotations
 
-import random
 import warnings
 
-from dataclasses import dataclass, field
+from dataclasses import InitVar, dataclass, field
 from typing import TYPE_CHECKING, Optional
 
 from .person import Person
+from .rng import rng
 from .utils import probability
 
 if TYPE_CHECKING:
+    from .agents import AgentTable
     from .facs import Ecosystem
     from .disease import Disease
     
@@ -37,14 +38,20 @@ class Household:
     house: House
     ages: list[float]
     size: Optional[int] = None
+    populate: InitVar[bool] = True
 
-    agents: list[Person] = field(default_factory=list, init=False)
+    household_id: int = field(default=-1, init=False)
+    first_agent: int = field(default=-1, init=False)
 
-    def __post_init__(self):
-        """Post init function."""
+    def __post_init__(self, populate: bool):
+        """
+        Post init function. Adds the members of the household to the agent
+        table, unless populate is False (population.add_members then adds
+        them in bulk for many households).
+        """
 
         if self.size is None:
-            self.size = random.choice([1, 2, 3, 4])
+            self.size = int(rng.generator.integers(1, 5))
 
         if self.size < 1:
             raise ValueError("Household size must be at least 1.")
@@ -52,18 +59,34 @@ class Household:
         if self.size > 4:
             warnings.warn(f"Household size {self.size} is greater than 4.")
 
-        for _ in range(self.size):
-            self.agents.append(Person(self.house, self, self.ages))
+        self.household_id = self.table.add_household(self)
+        if populate:
+            # pylint: disable=import-outside-toplevel
+            from .population import add_members
+
+            add_members([self])
+
+    @property
+    def table(self) -> AgentTable:
+        """The agent table holding the members of the household."""
+        return self.house.agent_table
+
+    @property
+    def agent_slice(self) -> slice:
+        """The rows of the agent table holding the members of the household."""
+        return slice(self.first_agent, self.first_agent + self.size)
+
+    @property
+    def agents(self) -> list[Person]:
+        """Person views of the members of the household."""
+        return [
+            Person.view(self.table, i)
+            for i in range(self.first_agent, self.first_agent + self.size)
+        ]
 
     def get_infectious_count(self):
         """Get the number of infectious people in the household."""
-        return len(
-            list(
-                agent
-                for agent in self.agents
-                if agent.status == "infectious" and not agent.hospitalised
-            )
-        )
+        return int(self.table.household_infectious[self.household_id])
 
     def is_infected(self):
         """Check if the household has any infectious people."""
@@ -74,15 +97,17 @@ class Household:
         """Evolve the household."""
 
         ic = self.get_infectious_count()
-        for i in range(0, self.size):
-            if self.agents[i].status == "susceptible":
-                if ic > 0:
-                    infection_chance = (
-                        eco.contact_rate_multiplier["house"]
-                        * disease.infection_rate
-                        * HOME_INTERACTION_FRACTION
-                        * ic
-                    )
-                    # house infection already incorporates airflow, because derived from literature.
-                    if probability(infection_chance):
-                        self.agents[i].infect(eco)
+        if ic == 0:
+            return
+
+        infection_chance = (
+            eco.contact_rate_multiplier["house"]
+            * disease.infection_rate
+            * HOME_INTERACTION_FRACTION
+            * ic
+        )
+        # house infection already incorporates airflow, because derived from literature.
+        for agent in self.agents:
+            if agent.status == "susceptible":
+                if probability(infection_chance):
+                    agent.infect(eco)
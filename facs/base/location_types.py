@@ -47,14 +47,16 @@ def get_building_types(types):
 
     return buildings
 
-# Default data directory (will be updated dynamically)
-data_dir = "covid_data"
 
-# Dynamically load building types
-_data = read_building_types(data_dir)
-building_types_dict = get_building_types(_data)
-building_types = _data.keys()
-
-# Load full building type data dynamically
-with open(f"{data_dir}/building_types_map.yml", encoding="utf-8") as f:
-    building_types_data = yaml.safe_load(f)
+# Location types of the model, by id. The building types map of a data
+# directory gives their labels and parameters, see config.Config.
+building_types = (
+    "park",
+    "hospital",
+    "supermarket",
+    "office",
+    "school",
+    "leisure",
+    "shopping",
+)
+building_types_dict = {name: index for index, name in enumerate(building_types)}
@@ -1,3 +1,4 @@
+import functools
 import os
 import sys
 import warnings
@@ -5,8 +6,22 @@ from datetime import datetime, timedelta
 
 import yaml
 
-from facs.readers.read_measures_yml import read_measures_yml
-from facs.readers.read_vaccinations_yml import read_vaccinations_yml
+from facs.readers.read_measures_yml import (
+    MEASURE_HANDLERS,
+    RAMPED_MEASURES,
+    compile_measures_yml,
+    measure_events,
+    ramp_events,
+)
+from facs.readers.read_vaccinations_yml import (
+    RAMPED_VACCINATIONS,
+    advance_mutation,
+    change_vaccinations,
+    compile_vaccinations_yml,
+    start_mutation,
+)
+
+from .scheduler import Scheduler, expand_ramps
 
 import os
 import sys
@@ -16,8 +31,95 @@ import yaml
 
 class Measures:
     def __init__(self):
-        pass
-        # Initialize the Measures class attributes here
+        # measures and vaccinations parsed from their files, and the
+        # schedulers of their events, by file names.
+        self.timelines = {}
+        self.schedulers = {}
+
+    def timeline(self, data_dir, measures_yml, vaccinations_yml, disease_yml):
+        """
+        Return the measures and vaccinations timeline of a set of input files,
+        parsed from YAML on the first call only.
+        """
+
+        key = (data_dir, measures_yml, vaccinations_yml, disease_yml)
+        if key not in self.timelines:
+            self.timelines[key] = (
+                compile_measures_yml(f"{data_dir}/{measures_yml}.yml"),
+                compile_vaccinations_yml(
+                    data_dir,
+                    f"{data_dir}/{vaccinations_yml}.yml",
+                    f"{data_dir}/{disease_yml}.yml",
+                ),
+            )
+        return self.timelines[key]
+
+    def build_scheduler(self, data_dir, measures_yml, vaccinations_yml, disease_yml):
+        """
+        Return a Scheduler holding the vaccination, mutation and measures
+        events of a set of input files, with their ramps expanded.
+        """
+
+        (_, measures), vaccinations = self.timeline(
+            data_dir, measures_yml, vaccinations_yml, disease_yml
+        )
+        handlers = dict(MEASURE_HANDLERS)
+        handlers["vaccinations"] = change_vaccinations
+        handlers["mutation"] = functools.partial(
+            start_mutation, mutation_rates=vaccinations["mutation_rates"]
+        )
+        scheduler = Scheduler(handlers)
+
+        # vaccinations are changed before mutations start, and both before
+        # measures are enacted.
+        entries, steps = expand_ramps(vaccinations["vaccinations"], RAMPED_VACCINATIONS)
+        for day, dv in [*entries.items(), *steps.items()]:
+            scheduler.add(day, "vaccinations", dv, priority=0)
+
+        for day, dv in vaccinations["mutations"].items():
+            scheduler.add(day, "mutation", dv, priority=1)
+
+        entries, steps = expand_ramps(measures, RAMPED_MEASURES, inject=True)
+        for day, dm in entries.items():
+            for kind, value in measure_events(dm):
+                scheduler.add(day, kind, value, priority=2)
+        for day, levels in steps.items():
+            for kind, value in ramp_events(levels):
+                scheduler.add(day, kind, value, priority=2)
+
+        return scheduler
+
+    def scheduler(self, day, *files):
+        """
+        Return the scheduler of a set of input files, see build_scheduler. It
+        is built again if the simulation went back in time, e.g. to start
+        another scenario from a snapshot.
+        """
+
+        scheduler = self.schedulers.get(files)
+        if scheduler is None or (scheduler.day is not None and day <= scheduler.day):
+            scheduler = self.schedulers[files] = self.build_scheduler(*files)
+        return scheduler
+
+    def check_measures_in_force(self, e, measures, measures_yml):
+        """
+        Warn if a measures file takes over from another one, e.g. in a run
+        started from a snapshot, and its entries dated before today differ
+        from those that were enacted: these entries never fire, so the
+        measures in force stay those of the earlier file.
+        """
+
+        day = e.date.date()
+        if e.measures_entries is not None and e.rank == 0:
+            before = {d: m for d, m in e.measures_entries.items() if d < day}
+            if {d: m for d, m in measures.items() if d < day} != before:
+                warnings.warn(
+                    f"The entries of {measures_yml} dated before {day} differ "
+                    "from the measures enacted so far. They are not enacted, "
+                    "the measures in force are kept until its next entry.",
+                    RuntimeWarning,
+                )
+        e.measures_entries = measures
 
     def calculate_mutating_infection_rate(self, fraction, source=0.07, dest=0.1):
         # Original infection rate is 0.07 (COVID-19 disease.yml)
@@ -47,12 +149,18 @@ class Measures:
         #  # our estimate is 50% here, as Delta gains full dominance in this period.
         #  # https://www.gov.uk/government/news/confirmed-cases-of-covid-19-variants-identified-in-uk#:~:text=The%20Delta%20variant%20currently%20accounts,of%20cases%20across%20the%20UK.&text=In%20total%2C%203%2C692%20people%20have,the%20Delta%20and%20Beta%20variants.l
         #  print("infection rate adjusted to ", e.disease.infection_rate, file=sys.stderr)
-        read_vaccinations_yml(
-            e,
-            e.get_date_string(),
-            data_dir,
-            f"{data_dir}/{vaccinations_yml}.yml",
-            f"{data_dir}/{disease_yml}.yml",
+        (keyworker_fraction, measures), vaccinations = self.timeline(
+            data_dir, measures_yml, vaccinations_yml, disease_yml
         )
-        read_measures_yml(e, data_dir, f"{data_dir}/{measures_yml}.yml")
-        
+        if e.measures_entries is not measures:
+            self.check_measures_in_force(e, measures, measures_yml)
+        if keyworker_fraction:
+            e.keyworker_fraction = float(keyworker_fraction)
+        e.vaccine_effect_time = vaccinations["vaccine_effect_time"]
+        e.vac_duration = vaccinations["vac_duration"]
+
+        day = e.date.date()
+        self.scheduler(
+            day, data_dir, measures_yml, vaccinations_yml, disease_yml
+        ).run(e, day)
+        advance_mutation(e)
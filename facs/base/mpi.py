@@ -50,3 +50,27 @@ class MPIManager:
     def gather_stats(self, e, local_stats):
         e.global_stats = self.CalcCommWorldTotal(np.array(local_stats))
         # print(e.global_stats)
+
+
+class SerialManager:
+    """
+    Stand-in for MPIManager in serial mode: a single rank that makes no MPI
+    calls, so that it can run in a process forked after MPI was initialised.
+    """
+
+    rank = 0
+    size = 1
+
+    def CalcCommWorldTotalSingle(self, i):
+        return float(i)
+
+    def CalcCommWorldTotalDouble(self, np_array):
+        assert np_array.size > 0
+        return np_array.astype("f8")
+
+    def CalcCommWorldTotal(self, np_array):
+        assert np_array.size > 0
+        return np_array.astype("int64")
+
+    def gather_stats(self, e, local_stats):
+        e.global_stats = self.CalcCommWorldTotal(np.array(local_stats))
@@ -2,15 +2,25 @@
 
 from __future__ import annotations
 import os
+import numpy as np
 import pandas as pd
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from facs.base.person import Person
 
+HOSPITAL_NEEDS = 5040  # minutes per week spent in hospital when hospitalised.
+
 
 class Needs:
-    """Generates needs for the population and tracks statistics."""
+    """
+    Generates needs for the population and tracks statistics.
+
+    The needs table read from file is kept as it is. Measures act on it
+    through one multiplier per location type, and the effective age x
+    location type matrix used for lookups is rebuilt only when a multiplier
+    changes.
+    """
 
     def __init__(self, filename: str, building_types: list[str]):
         """Initialize Needs from a CSV file and compute basic statistics."""
@@ -30,6 +40,24 @@ class Needs:
         # Ensure the column order matches the building types list
         self.needs = self.needs.reindex(building_types, axis=1)
 
+        self.columns = {name: i for i, name in enumerate(self.needs.columns)}
+        self.hospital_needs = np.zeros(len(self.columns))
+        if "hospital" in self.columns:
+            self.hospital_needs[self.columns["hospital"]] = HOSPITAL_NEEDS
+
+        self.base = self.needs.to_numpy(dtype="float64")
+        self.multipliers = np.ones(len(self.columns))
+        self.build_matrix()
+
+    def build_matrix(self):
+        """
+        Rebuild the dense age x location type matrix from the needs table and
+        the multipliers. Scaled needs keep their fractions, as rounding them
+        would drop the small needs of partially closed location types.
+        """
+
+        self.matrix = np.ascontiguousarray(self.base * self.multipliers)
+
     def exception_handler(self, filename: str):
         """Check if the filename is valid before loading."""
 
@@ -46,30 +74,74 @@ class Needs:
         """Retrieve the needs of a given person, adjusting for WFH and hospitalization."""
 
         if not person.hospitalised:
-            need = dict(self.needs.iloc[person.age])  # Retrieve needs for person's age
+            need = self.matrix[person.age].tolist()  # Retrieve needs for person's age
 
             # Adjust based on individual conditions
             if person.work_from_home:
-                need["office"] = 0
+                need[self.columns["office"]] = 0
             if person.school_from_home:
-                need["school"] = 0
+                need[self.columns["school"]] = 0
 
-            return list(need.values())
+            return need
 
         # If hospitalized, override with hospital needs
-        return [0, 5040, 0, 0, 0, 0, 0]
+        return [0, HOSPITAL_NEEDS, 0, 0, 0, 0, 0]
+
+    def get_needs_bulk(
+        self,
+        ages: np.ndarray,
+        wfh_mask: np.ndarray | None = None,
+        school_mask: np.ndarray | None = None,
+        hospitalised_mask: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """
+        Retrieve the needs of many people at once, as a float array with one
+        row per person and one column per location type.
+        """
+
+        need = self.matrix[ages]
+
+        if wfh_mask is not None and "office" in self.columns:
+            need[wfh_mask, self.columns["office"]] = 0
+        if school_mask is not None and "school" in self.columns:
+            need[school_mask, self.columns["school"]] = 0
+        if hospitalised_mask is not None:
+            need[hospitalised_mask] = self.hospital_needs
+
+        return need
+
+    def set_multiplier(self, location_type: str, factor: float):
+        """
+        Set the multiplier of the needs of a location type, relative to the
+        needs table, replacing any earlier multiplier.
+        """
+
+        if location_type not in self.columns:
+            raise ValueError(f"Location type '{location_type}' not found in needs.")
+
+        if factor < 0:
+            raise ValueError("Scale factor must be positive.")
+
+        column = self.columns[location_type]
+        if self.multipliers[column] != factor:
+            self.multipliers[column] = factor
+            self.build_matrix()
 
     def scale_needs(self, location_type: str, factor: float):
-        """Scale the needs of a location type by a factor."""
+        """Scale the needs of a location type by a factor, on top of earlier scaling."""
 
-        if location_type not in self.needs.columns:
+        if location_type not in self.columns:
             raise ValueError(f"Location type '{location_type}' not found in needs.")
 
-        if factor < 0:
-            raise ValueError("Scale factor must be positive.")
+        column = self.columns[location_type]
+        self.set_multiplier(location_type, self.multipliers[column] * factor)
+
+    def reset_multipliers(self):
+        """Return to the needs of the needs table."""
 
-        self.needs[location_type] *= factor
-        print(f"Scaled needs for '{location_type}' by a factor of {factor}.")
+        if np.any(self.multipliers != 1.0):
+            self.multipliers[:] = 1.0
+            self.build_matrix()
 
     def compute_needs_statistics(self):
         """Compute and print statistics about total time spent in each location."""
@@ -2,25 +2,18 @@
 
 from __future__ import annotations
 
-import random
-import sys
 
-from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
 import numpy as np
-import yaml
 
-from facs.readers.read_disease_yml import read_disease_yml
-from .needs import Needs
-from .location_types import building_types_dict, building_types_data
+from .agents import STATUSES, STATUS_CODES
+from .location_types import building_types_dict
+from .rng import rng
 from .utils import (
     probability,
     get_random_int,
     log_infection,
-    log_hospitalisation,
-    log_recovery,
-    log_death,
 )
 
 if TYPE_CHECKING:
@@ -28,71 +21,122 @@ if TYPE_CHECKING:
     from .household import Household
     from .location import Location
     from .disease import Disease
-    
-    
-# Define `data_dir` globally but allow it to be overridden later
-data_dir = "covid_data"  # Default value
+    from .agents import AgentTable
+    from .needs import Needs
 
-def set_data_directory(directory):
-    """Function to update the global data directory."""
-    global data_dir
-    data_dir = directory
 
-needs = Needs(f"{data_dir}/needs.csv", list(building_types_dict.keys()))
+class _Column:
+    """Descriptor exposing one AgentTable column as a Person attribute."""
 
-with open(f"{data_dir}/vaccinations.yml", encoding="utf-8") as f:
-    vac_data = yaml.safe_load(f)
-    antivax_chance = vac_data["antivax_fraction"]
+    def __set_name__(self, owner, name):
+        self.name = name
 
-def load_disease_config(disease_yml_path):
-    disease_config = read_disease_yml(disease_yml_path)
-    return disease_config.immunity_duration, disease_config.immunity_fraction
+    def __get__(self, person, owner=None):
+        if person is None:
+            return self
+        return getattr(person.table, self.name)[person.index].item()
 
-# Example of usage
-immune_duration, immunity_fraction = load_disease_config(f"{data_dir}/disease_measles.yml")
+    def __set__(self, person, value):
+        getattr(person.table, self.name)[person.index] = value
 
 
-@dataclass
 class Person:
-    """Class for a person."""
-
-    # pylint: disable=too-many-instance-attributes
-
-    location: House
-    household: Household
-    ages: list[int]
-    home_location: Location = field(init=False)
-    mild_version: bool = field(init=False, default=True)
-    hospitalised: bool = field(init=False, default=False)
-    dying: bool = field(init=False, default=False)
-    work_from_home: bool = field(init=False, default=False)
-    school_from_home: bool = field(init=False, default=False)
-    phase_duration: float = field(init=False, default=0.0)
-    symptoms_suppressed: bool = field(init=False, default=False)
-    antivax: bool = field(init=False, default=False)
-    status: str = field(init=False, default="susceptible")
-    # states: susceptible, exposed, infectious, recovered, dead, immune.
-    symptomatic: bool = field(init=False, default=False)
-    status_change_time: float = field(init=False, default=-1)
-    age: int = field(init=False)
-    job: int = field(init=False)
-    groups: dict = field(init=False, default_factory=dict)
-    hospital: Location = field(init=False)
-
-    def __post_init__(self):
-        self.location.increment_num_agents()
-        self.home_location = self.location
-
-        if np.random.rand() < antivax_chance:  # 5% are antivaxxers.
-            self.antivax = True
-
-        if np.random.rand() < 0.5:  # 50% immune initially
-            self.status = "immune"
-            self.phase_duration = np.random.poisson(immune_duration)
-
-        self.age = np.random.choice(91, p=self.ages)  # age in years
-        self.job = np.random.choice(4, 1, p=[0.865, 0.015, 0.08, 0.04])[0]
-        # 0=default, 1=teacher (1.5%), 2=shop worker (8%), 3=health worker (4%)
+    """
+    Class for a person.
+
+    The state of a person lives in a row of an AgentTable; a Person is a thin
+    view of that row, so creating one for an existing agent is cheap. Agents
+    are added to the table in bulk by population.add_members.
+    """
+
+    __slots__ = ("table", "index")
+
+    age = _Column()
+    job = _Column()
+    phase_duration = _Column()
+    status_change_time = _Column()
+    mild_version = _Column()
+    dying = _Column()
+    symptomatic = _Column()
+    work_from_home = _Column()
+    school_from_home = _Column()
+    antivax = _Column()
+    compliance = _Column()
+    symptoms_suppressed = _Column()
+
+    @classmethod
+    def view(cls, table: AgentTable, index: int) -> Person:
+        """Return a view of an agent that already exists in the table."""
+
+        person = cls.__new__(cls)
+        person.table = table
+        person.index = index
+        return person
+
+    def __eq__(self, other):
+        if not isinstance(other, Person):
+            return NotImplemented
+        return self.table is other.table and self.index == other.index
+
+    def __hash__(self):
+        return hash((id(self.table), self.index))
+
+    def __repr__(self):
+        return f"Person(index={self.index}, status={self.status!r}, age={self.age})"
+
+    @property
+    def status(self) -> str:
+        """Status name: susceptible, exposed, infectious, recovered, dead or immune."""
+        return STATUSES[self.table.status[self.index]]
+
+    @status.setter
+    def status(self, value: str):
+        self.table.set_status(self.index, STATUS_CODES[value])
+
+    @property
+    def hospitalised(self) -> bool:
+        """Whether the person is in hospital."""
+        return bool(self.table.hospitalised[self.index])
+
+    @hospitalised.setter
+    def hospitalised(self, value: bool):
+        self.table.set_hospitalised(self.index, value)
+
+    @property
+    def location(self) -> House:
+        """The house the person lives in."""
+        return self.table.houses[self.table.house[self.index]]
+
+    @property
+    def home_location(self) -> House:
+        """The house the person lives in."""
+        return self.location
+
+    @property
+    def household(self) -> Household:
+        """The household the person belongs to."""
+        return self.table.households[self.table.household[self.index]]
+
+    @property
+    def hospital(self) -> Location | None:
+        """The hospital the person is admitted to, if any."""
+        lid = self.table.hospital[self.index]
+        return self.table.locations[lid] if lid >= 0 else None
+
+    @hospital.setter
+    def hospital(self, location: Location | None):
+        self.table.hospital[self.index] = (
+            location.loc_inf_minutes_id if location is not None else -1
+        )
+
+    @property
+    def groups(self) -> dict:
+        """Group number per location type id, for location types with groupings."""
+        return {
+            lid: int(group)
+            for lid, group in enumerate(self.table.groups[self.index])
+            if group >= 0
+        }
 
     def assign_group(self, location_type, num_groups):
         """
@@ -102,12 +146,14 @@ class Person:
         The location type should match the corresponding personal needs category
         (e.g., school or supermarket).
         """
-        self.groups[building_types_dict[location_type]] = get_random_int(num_groups)
+        self.table.groups[self.index, building_types_dict[location_type]] = (
+            get_random_int(num_groups)
+        )
 
     def location_has_grouping(self, lid):
         """Check if a location has a particular grouping."""
 
-        return lid in list(self.groups)
+        return self.table.groups[self.index, lid] >= 0
 
     def vaccinate(self, time, vac_no_symptoms, vac_no_transmission, vac_duration):
         """Vaccinate a person."""
@@ -115,12 +161,12 @@ class Person:
         self.status_change_time = time  # necessary if vaccines give temporary immunity.
         if vac_duration > 0:
             if vac_duration > 100:
-                self.phase_duration = np.random.gamma(vac_duration / 20.0, 20.0)
+                self.phase_duration = rng.generator.gamma(vac_duration / 20.0, 20.0)
                 # shape parameter is changed with variable, scale parameter is kept
                 # fixed at 20 (assumption).
 
             else:
-                self.phase_duration = np.poisson(vac_duration)
+                self.phase_duration = rng.generator.poisson(vac_duration)
 
         if self.status == "susceptible":
             if probability(vac_no_transmission):
@@ -129,68 +175,11 @@ class Person:
                 self.symptoms_suppressed = True
         # print("vac", self.status, self.symptoms_suppressed, self.phase_duration)
 
-    def plan_visits(self, e):
-        """
-        Plan visits for the day.
-        TODO: plan visits to classes not using nearest location (make an override).
-        """
-
-        if self.status in [
-            "susceptible",
-            "exposed",
-            "infectious",
-        ]:  # recovered people are assumed to be immune.
-            personal_needs = needs.get_needs(self)
-            for k, minutes in enumerate(personal_needs):
-                nearest_locs = self.home_location.nearest_locations
-
-                if minutes < 1:
-                    continue
-                elif k == building_types_dict["hospital"] and self.hospitalised:
-                    location_to_visit = self.hospital
-
-                elif k == building_types_dict["office"] and self.job > 0:
-                    if self.job == 1:  # teacher
-                        location_to_visit = nearest_locs[building_types_dict["school"]]
-                    if self.job == 2:  # shop employee
-                        location_to_visit = nearest_locs[
-                            building_types_dict["shopping"]
-                        ]
-                    if self.job == 3:  # health worker
-                        location_to_visit = nearest_locs[
-                            building_types_dict["hospital"]
-                        ]
-
-                elif self.location_has_grouping(k):
-                    location_to_visit = e.get_location_by_group(k, self.groups[k])
-
-                elif nearest_locs[k]:
-                    location_to_visit = nearest_locs[k]
-                else:  # no known nearby locations.
-                    continue
-
-                e.visit_minutes += minutes
-
-                if isinstance(location_to_visit, list):
-                    loc_type = location_to_visit[0].loc_type
-
-                    if building_types_data[loc_type]["weighted"]:
-                        sizes = [x.sqm for x in location_to_visit]
-                        prob = [x / sum(sizes) for x in sizes]
-                        location_to_visit = np.random.choice(location_to_visit, p=prob)
-
-                    else:
-                        location_to_visit = random.choice(location_to_visit)
-
-                # Register the actual visit to the location.
-                location_to_visit.register_visit(e, self, minutes)
-                
-
-    def print_needs(self):
+    def print_needs(self, needs: Needs):
         """Print the needs of a person."""
         print(self.age, needs.get_needs(self))
 
-    def get_needs(self):
+    def get_needs(self, needs: Needs):
         """Get the needs of a person."""
         return needs.get_needs(self)
 
@@ -212,131 +201,14 @@ class Person:
         self.status_change_time = e.time
         self.mild_version = True
         self.hospitalised = False
-        self.phase_duration = max(1, np.random.poisson(e.disease.incubation_period))
+        self.phase_duration = max(
+            1, rng.generator.poisson(e.disease.incubation_period)
+        )
         e.num_infections_today += log_infection(
             e.time,
             self.location.location_x,
             self.location.location_y,
             location_type,
             e.rank,
-            self.phase_duration,
-        )
-
-    def recover(self, e, location):
-        """Recover a person."""
-        if e.disease.immunity_duration > 0:
-            self.phase_duration = np.random.gamma(
-                e.disease.immunity_duration / 20.0, 20.0
-            )  # shape parameter is changed with variable,
-            # scale parameter is kept fixed at 20 (assumption).
-        self.status = "recovered"
-        self.status_change_time = e.time
-        e.num_recoveries_today = log_recovery(
-            e.time, self.location.location_x, self.location.location_x, location, e.rank
+            int(self.phase_duration),
         )
-
-    def progress_condition(self, e, t, disease: Disease):
-        """Progress the condition of a person."""
-        if self.status_change_time > t:
-            return
-        if self.status == "exposed":
-            # print("exposed", t, self.status_change_time, self.phase_duration)
-            if t - self.status_change_time >= int(self.phase_duration):
-                self.status = "infectious"
-                self.status_change_time = t
-                if (
-                    probability(self.get_hospitalisation_chance(disease))
-                    and self.symptoms_suppressed is False
-                ):
-                    self.mild_version = False
-                    # self.phase_duration =
-                    # np.random.poisson(disease.period_to_hospitalisation
-                    # - disease.incubation_period)
-                    self.phase_duration = max(
-                        1,
-                        np.random.poisson(disease.period_to_hospitalisation)
-                        - self.phase_duration,
-                    )
-                else:
-                    self.mild_version = True
-                    # self.phase_duration =
-                    # np.random.poisson(disease.mild_recovery_period
-                    # - disease.incubation_period)
-                    self.phase_duration = max(
-                        1,
-                        np.random.poisson(disease.mild_recovery_period)
-                        - self.phase_duration,
-                    )
-
-        elif self.status == "infectious":
-            # mild version (may require hospital visits, but not ICU visits)
-            if self.mild_version:
-                if t - self.status_change_time >= self.phase_duration:
-                    self.recover(e, "house")
-
-            # non-mild version (will involve ICU visit)
-            else:
-                if not self.hospitalised:
-                    if t - self.status_change_time >= self.phase_duration:
-                        self.hospitalised = True
-                        self.hospital = e.find_hospital()
-                        if self.hospital is None:
-                            print(
-                                "Error: agent is hospitalised, but there are no "
-                                "hospitals in the location graph."
-                            )
-                            sys.exit()
-                        e.num_hospitalised += 1
-                        e.num_hospitalisations_today += log_hospitalisation(
-                            t,
-                            self.location.location_x,
-                            self.location.location_y,
-                            self.age,
-                            e.rank,
-                        )
-
-                        self.status_change_time = t
-                        # hospitalisation is a status change,
-                        # because recovery_period is from date of hospitalisation.
-                        if probability(
-                            self.get_mortality_chance(disease)
-                            / self.get_hospitalisation_chance(disease)
-                        ):
-                            # avg mortality rate (divided by the average hospitalization rate).
-                            self.dying = True
-                            self.phase_duration = np.random.poisson(
-                                disease.mortality_period
-                            )
-                        else:
-                            self.dying = False
-                            self.phase_duration = np.random.poisson(
-                                disease.recovery_period
-                            )
-                else:
-                    if (
-                        t - self.status_change_time >= self.phase_duration
-                    ):  # from hosp. date
-                        self.hospitalised = False
-                        e.num_hospitalised -= 1
-                        self.status_change_time = t
-                        # decease
-                        if self.dying:
-                            self.status = "dead"
-                            e.num_deaths_today = log_death(
-                                t,
-                                self.location.location_x,
-                                self.location.location_y,
-                                "hospital",
-                                e.rank,
-                            )
-                        # hospital discharge
-                        else:
-                            self.recover(e, "hospital")
-
-        elif e.disease.immunity_duration > 0 and (
-            self.status in ("recovered", "immune")
-        ):
-            if t - self.status_change_time >= self.phase_duration:
-                # print("susc.", self.status, self.phase_duration)
-                self.status = "susceptible"
-                self.symptoms_suppressed = False
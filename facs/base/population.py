@@ -0,0 +1,95 @@
+"""Module for the synthesis of the population of a rank in bulk."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .agents import IMMUNE
+from .config import Config, default_config
+from .household import Household
+from .rng import rng
+
+if TYPE_CHECKING:
+    from .house import House
+
+# 0=default, 1=teacher (1.5%), 2=shop worker (8%), 3=health worker (4%)
+JOB_PROBABILITIES = [0.865, 0.015, 0.08, 0.04]
+INITIAL_IMMUNITY = 0.5  # 50% immune initially
+
+
+def add_households(
+    houses: list[House],
+    household_size: float,
+    ages: list[float],
+    num_households: int,
+    config: Config | None = None,
+) -> list[Household]:
+    """
+    Add num_households households to every house, with their members, see
+    add_members.
+
+    Household sizes are drawn for all houses at once, as 1 plus a Poisson
+    variate with mean household_size - 1.
+    """
+
+    sizes = 1 + rng.generator.poisson(
+        household_size - 1, (len(houses), num_households)
+    )
+
+    households = []
+    for house, house_sizes in zip(houses, sizes.tolist()):
+        for size in house_sizes:
+            household = Household(house, ages, size, populate=False)
+            house.households.append(household)
+            households.append(household)
+        house.total_size += sum(house_sizes)
+
+    add_members(households, config)
+    return households
+
+
+def add_members(households: list[Household], config: Config | None = None):
+    """
+    Add the members of households that have none yet to their agent table.
+    The antivax fraction and initial immunity are taken from config, or from
+    the default data directory if it is None.
+
+    The households must share one table and age distribution. The ages, jobs,
+    antivax stances, compliance quantiles and initial immunity of all new
+    agents are drawn in a few vectorised calls and written into the table
+    directly.
+    """
+
+    if len(households) == 0:
+        return
+
+    table = households[0].table
+    sizes = np.array([h.size for h in households])
+    total = int(sizes.sum())
+    start = table.add_agents(
+        total,
+        np.repeat([h.house.house_id for h in households], sizes),
+        np.repeat([h.household_id for h in households], sizes),
+    )
+    for household, first in zip(households, (start + np.cumsum(sizes) - sizes).tolist()):
+        household.first_agent = first
+        household.house.num_agents += household.size
+
+    if config is None:
+        config = default_config()
+    immune_duration, _ = config.immunity
+
+    ids = np.arange(start, start + total)
+    table.antivax[ids] = rng.generator.random(total) < config.antivax_fraction
+    table.compliance[ids] = rng.generator.random(total)
+
+    immune = ids[rng.generator.random(total) < INITIAL_IMMUNITY]
+    table.set_status(immune, IMMUNE)
+    table.phase_duration[immune] = rng.generator.poisson(
+        immune_duration, len(immune)
+    )
+
+    table.age[ids] = rng.generator.choice(91, total, p=households[0].ages)
+    table.job[ids] = rng.generator.choice(4, total, p=JOB_PROBABILITIES)
@@ -0,0 +1,150 @@
+"""Module for the batched disease progression kernel."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .agents import SUSCEPTIBLE, EXPOSED, INFECTIOUS, RECOVERED, DEAD, IMMUNE
+from .rng import rng
+from .utils import log_hospitalisation, log_recovery, log_death
+
+if TYPE_CHECKING:
+    from .facs import Ecosystem
+    from .disease import Disease
+
+
+def _house_xy(e: Ecosystem, i: int) -> tuple[float, float]:
+    house = e.agents.houses[e.agents.house[i]]
+    return house.location_x, house.location_y
+
+
+def _age_chances(chances: list[float], ages: np.ndarray) -> np.ndarray:
+    """Look up age-dependent chances, clipping ages to the last age class."""
+
+    chances = np.asarray(chances, dtype="f8")
+    return chances[np.minimum(ages, len(chances) - 1)]
+
+
+def _recover(e: Ecosystem, ids: np.ndarray, t: int, location: str):
+    """Move the agents in `ids` to the recovered state."""
+
+    agents = e.agents
+    if e.disease.immunity_duration > 0:
+        agents.phase_duration[ids] = rng.generator.gamma(
+            e.disease.immunity_duration / 20.0, 20.0, len(ids)
+        )  # shape parameter is changed with variable,
+        # scale parameter is kept fixed at 20 (assumption).
+    agents.set_status(ids, RECOVERED)
+    agents.status_change_time[ids] = t
+    for i in ids:
+        x, y = _house_xy(e, i)
+        e.num_recoveries_today += log_recovery(t, x, y, location, e.rank)
+
+
+def _become_infectious(e: Ecosystem, ids: np.ndarray, t: int, disease: Disease):
+    agents = e.agents
+    agents.set_status(ids, INFECTIOUS)
+    agents.status_change_time[ids] = t
+
+    severe = (
+        rng.generator.random(len(ids))
+        < _age_chances(disease.hospital, agents.age[ids])
+    ) & ~agents.symptoms_suppressed[ids]
+    agents.mild_version[ids] = ~severe
+
+    # phase_duration still holds the incubation time, which is subtracted from the
+    # period until hospitalisation or recovery.
+    period = np.where(
+        severe, disease.period_to_hospitalisation, disease.mild_recovery_period
+    )
+    agents.phase_duration[ids] = np.maximum(
+        1, rng.generator.poisson(period) - agents.phase_duration[ids]
+    )
+
+
+def _hospitalise(e: Ecosystem, ids: np.ndarray, t: int, disease: Disease):
+    if len(ids) == 0:
+        return
+
+    agents = e.agents
+    agents.set_hospitalised(ids, True)
+    agents.hospital[ids] = e.find_hospitals(len(ids))
+    e.num_hospitalised += len(ids)
+    for i in ids:
+        x, y = _house_xy(e, i)
+        e.num_hospitalisations_today += log_hospitalisation(
+            t, x, y, agents.age[i], e.rank
+        )
+
+    # hospitalisation is a status change,
+    # because recovery_period is from date of hospitalisation.
+    agents.status_change_time[ids] = t
+
+    # avg mortality rate (divided by the average hospitalization rate).
+    ages = agents.age[ids]
+    dying = rng.generator.random(len(ids)) < (
+        _age_chances(disease.mortality, ages) / _age_chances(disease.hospital, ages)
+    )
+    agents.dying[ids] = dying
+    agents.phase_duration[ids] = rng.generator.poisson(
+        np.where(dying, disease.mortality_period, disease.recovery_period)
+    )
+
+
+def _discharge(e: Ecosystem, ids: np.ndarray, t: int):
+    agents = e.agents
+    agents.set_hospitalised(ids, False)
+    e.num_hospitalised -= len(ids)
+    agents.status_change_time[ids] = t
+
+    # decease
+    deaths = ids[agents.dying[ids]]
+    agents.set_status(deaths, DEAD)
+    for i in deaths:
+        x, y = _house_xy(e, i)
+        e.num_deaths_today += log_death(t, x, y, "hospital", e.rank)
+
+    # hospital discharge
+    _recover(e, ids[~agents.dying[ids]], t, "hospital")
+
+
+def progress_conditions(e: Ecosystem, t: int, disease: Disease):
+    """
+    Progress the condition of all agents by one day.
+
+    Each agent takes at most one step per day:
+    exposed -> infectious, infectious -> recovered (mild),
+    infectious -> hospitalised -> dead or recovered (severe), and
+    recovered/immune -> susceptible when immunity is not permanent.
+    All transitions are selected from the state at the start of the day,
+    and the random draws for each transition are made in bulk.
+    """
+
+    agents = e.agents
+    status = agents.status
+    hospitalised = agents.hospitalised
+    elapsed = t - agents.status_change_time
+    due = (agents.status_change_time <= t) & (elapsed >= agents.phase_duration)
+
+    infectious = due & (status == INFECTIOUS)
+    exposed = np.flatnonzero(
+        (agents.status_change_time <= t)
+        & (status == EXPOSED)
+        & (elapsed >= np.trunc(agents.phase_duration))
+    )
+    recovering = np.flatnonzero(infectious & agents.mild_version)
+    admitted = np.flatnonzero(infectious & ~agents.mild_version & ~hospitalised)
+    discharged = np.flatnonzero(infectious & ~agents.mild_version & hospitalised)
+    waning = np.empty(0, dtype="intp")
+    if disease.immunity_duration > 0:
+        waning = np.flatnonzero(due & ((status == RECOVERED) | (status == IMMUNE)))
+
+    _become_infectious(e, exposed, t, disease)
+    _recover(e, recovering, t, "house")
+    _hospitalise(e, admitted, t, disease)
+    _discharge(e, discharged, t)
+
+    agents.set_status(waning, SUSCEPTIBLE)
+    agents.symptoms_suppressed[waning] = False
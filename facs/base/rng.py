@@ -0,0 +1,103 @@
+"""Module for the random number streams used by the simulation."""
+
+import zlib
+
+import numpy as np
+
+BLOCK_SIZE = 4096
+
+
+class RandomStreams:
+    """
+    Random number service of a rank.
+
+    Every rank draws from its own numpy Generator, spawned from a single
+    SeedSequence, so a run with a given seed and number of ranks is
+    reproducible without touching the global np.random state.
+
+    Vectorised code draws arrays from `generator` directly. Scalar callers use
+    `random` and `integer`, which are served from blocks of pre-drawn uniforms.
+    """
+
+    def __init__(self, seed: int | None = None, block_size: int = BLOCK_SIZE):
+        self.block_size = block_size
+        self.seed(seed)
+
+    def seed(self, seed: int | None = None, rank: int = 0, size: int = 1):
+        """Reset the stream of this rank, out of `size` ranks, from `seed`."""
+
+        self.entropy = np.random.SeedSequence(seed).entropy
+        self.spawn(rank, size)
+
+    def spawn(self, rank: int, size: int):
+        """Reset the stream of this rank, out of `size` ranks, from the last seed."""
+
+        streams = np.random.SeedSequence(self.entropy).spawn(size)
+        self._stream = streams[rank]
+        self.generator = np.random.default_rng(self._stream)
+        self._uniforms = np.empty(0)
+        self._next = 0
+
+    def independent(self, name: str) -> np.random.Generator:
+        """
+        Return a new generator for one named purpose, derived from the seed and
+        rank but independent of the main stream. Draws made with it do not
+        shift the main stream, so they can be skipped (e.g. when their results
+        are cached) without changing the rest of the run.
+        """
+
+        key = self._stream.spawn_key + (zlib.crc32(name.encode()),)
+        return np.random.default_rng(
+            np.random.SeedSequence(self.entropy, spawn_key=key)
+        )
+
+    def shared(self, name: str) -> np.random.Generator:
+        """
+        Return a new generator for one named purpose, derived from the seed
+        only, so that it draws the same numbers on every rank.
+        """
+
+        return np.random.default_rng(
+            np.random.SeedSequence([self.entropy, zlib.crc32(name.encode())])
+        )
+
+    def get_state(self) -> dict:
+        """Return the state of the streams, for set_state."""
+
+        return {
+            "entropy": self.entropy,
+            "spawn_key": self._stream.spawn_key,
+            "bit_generator": self.generator.bit_generator.state,
+            "uniforms": self._uniforms[self._next :].copy(),
+        }
+
+    def set_state(self, state: dict):
+        """Restore the streams to a state returned by get_state."""
+
+        self.entropy = state["entropy"]
+        self._stream = np.random.SeedSequence(
+            self.entropy, spawn_key=state["spawn_key"]
+        )
+        self.generator = np.random.default_rng(self._stream)
+        self.generator.bit_generator.state = state["bit_generator"]
+        self._uniforms = state["uniforms"].copy()
+        self._next = 0
+
+    def random(self) -> float:
+        """Return a uniform random float in [0, 1)."""
+
+        if self._next == len(self._uniforms):
+            self._uniforms = self.generator.random(self.block_size)
+            self._next = 0
+
+        value = self._uniforms[self._next]
+        self._next += 1
+        return float(value)
+
+    def integer(self, high: int) -> int:
+        """Return a uniform random integer in [0, high)."""
+
+        return min(int(self.random() * high), high - 1)
+
+
+rng = RandomStreams()
@@ -0,0 +1,105 @@
+"""
+Module for the Scheduler class, which fires intervention events on the days
+they apply.
+
+Interventions are typed events (closures, partial closures, social distance,
+case isolation, vaccination rate changes, mutations, ...) held in a priority
+queue by day, so that days without changes cost a single comparison. Linear
+ramps of a level are expanded into one event per day by expand_ramps.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+from datetime import date, timedelta
+from typing import Any, Callable
+
+
+class Scheduler:
+    """
+    Priority queue of (day, priority, kind, value) events. Every kind of
+    event is applied to an ecosystem by handlers[kind](e, value).
+    """
+
+    def __init__(self, handlers: dict[str, Callable]):
+        self.handlers = handlers
+        self.queue = []
+        self.day = None  # last day run.
+        self._order = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def add(self, day: date, kind: str, value: Any = None, priority: int = 0):
+        """
+        Add an event. Events of one day fire by priority (lowest first) and
+        then in the order they were added.
+        """
+
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown intervention event {kind}.")
+        heapq.heappush(self.queue, (day, priority, next(self._order), kind, value))
+
+    def run(self, e, day: date):
+        """
+        Fire the events of a day. Events of earlier days that have not fired,
+        e.g. before the start of the run, are dropped.
+        """
+
+        self.day = day
+        while self.queue and self.queue[0][0] <= day:
+            event_day, _, _, kind, value = heapq.heappop(self.queue)
+            if event_day == day:
+                self.handlers[kind](e, value)
+
+
+def _ramp(spec, name: str, day: date) -> tuple[float, float, int]:
+    try:
+        start, end, days = float(spec["from"]), float(spec["to"]), int(spec["days"])
+    except (KeyError, TypeError, ValueError) as err:
+        raise ValueError(
+            f"Ramp of {name} on {day} needs numeric from, to and days."
+        ) from err
+    if days < 1:
+        raise ValueError(f"Ramp of {name} on {day} must last at least one day.")
+    return start, end, days
+
+
+def expand_ramps(
+    entries: dict[date, dict], names: tuple[str, ...], inject: bool = False
+) -> tuple[dict[date, dict], dict[date, dict]]:
+    """
+    Expand the linear ramps in dated entries.
+
+    A level in names may be given as {"from": a, "to": b, "days": n}: it is
+    set to a on the day of its entry and moves linearly to b, reached n days
+    later. A ramp stops at the next entry that sets the same level.
+
+    Returns a copy of the entries with every ramp replaced by its first value,
+    and the later values of the ramps as {day: {name: value}}. With inject,
+    values that fall on the day of another entry are written into that entry
+    instead, for entries that replace all levels in force.
+    """
+
+    entries = {day: dict(entry or {}) for day, entry in entries.items()}
+    steps = {}
+    for day in sorted(entries):
+        for name in names:
+            spec = entries[day].get(name)
+            if not isinstance(spec, dict):
+                continue
+
+            start, end, days = _ramp(spec, name, day)
+            entries[day][name] = start
+            for i in range(1, days + 1):
+                step_day = day + timedelta(days=i)
+                value = end if i == days else start + (end - start) * i / days
+                other = entries.get(step_day)
+                if other is not None and name in other:
+                    break
+                if other is not None and inject:
+                    other[name] = value
+                else:
+                    steps.setdefault(step_day, {})[name] = value
+    return entries, steps
@@ -0,0 +1,121 @@
+"""
+Module for the warm-up and main loop of a simulation, shared by run.py and
+facs.batch so that both produce the same output for the same inputs.
+
+The measures, vaccination and disease files are passed on as files, the tuple
+(data_dir, measures_yml, vaccinations_yml, disease_yml) expected by
+Measures.enact_measures_and_evolutions.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .facs import Ecosystem
+    from .measures import Measures
+
+# number of days simulated before the start date.
+WARMUP_DAYS = 20
+
+# columns of the main output that get a cumulative sum at the end of a run.
+CUMULATIVE_COLUMNS = ["num hospitalisations today", "num infections today"]
+
+
+def get_starting_infections(e: Ecosystem, starting_infections: str) -> int:
+    """
+    Return the number of infections to seed during the warm-up. Values below
+    1.0 (written with a leading 0, e.g. 0.001) are a ratio of the population
+    of all ranks.
+    """
+
+    if not starting_infections:
+        return 500
+    if int(starting_infections[0]) == 0:
+        # Aggregate the num agents before using the starting infections multiplier.
+        num_agents_all = e.mpi.CalcCommWorldTotalSingle(float(e.num_agents))
+        print("Num agents all:", num_agents_all)
+        return int(num_agents_all * float(starting_infections))
+    return int(starting_infections)
+
+
+def run_warmup(
+    e: Ecosystem,
+    measures: Measures,
+    files: tuple[str, str, str, str],
+    start_date: str,
+    starting_infections: str,
+    outfile: str,
+    dbg: bool = False,
+):
+    """
+    Write the output headers and run the WARMUP_DAYS days before start_date
+    (format %d/%m/%Y), seeding the starting infections evenly over them.
+    With dbg, the warm-up days are written to the output as well.
+    """
+    # pylint: disable=too-many-arguments
+
+    e.print_status(outfile, silent=True)  # initialise the log data structures.
+
+    num_infections = get_starting_infections(e, starting_infections)
+    if e.rank == 0:
+        print(
+            f"THIS SIMULATIONS HAS {e.num_agents} AGENTS. "
+            f"Starting with {num_infections} infections."
+        )
+
+    e.time = -WARMUP_DAYS
+    e.date = datetime.strptime(start_date, "%d/%m/%Y")
+    e.date = e.date - timedelta(days=WARMUP_DAYS)
+    e.print_header(outfile)
+    for i in range(WARMUP_DAYS):
+        # Roughly evenly spread infections over the days.
+        num = int(num_infections / WARMUP_DAYS)
+        if num_infections % WARMUP_DAYS > i:
+            num += 1
+
+        e.add_infections(num)
+
+        measures.enact_measures_and_evolutions(e, e.time, *files)
+
+        e.evolve(reduce_stochasticity=False)
+
+        if e.rank == 0:
+            print(f"t({e.time})")
+
+        e.debug_mode = dbg
+        e.print_status(outfile, silent=not dbg)
+
+
+def run_until(
+    e: Ecosystem,
+    measures: Measures,
+    files: tuple[str, str, str, str],
+    end_time: int,
+    outfile: str,
+    checkpoint: str | None = None,
+    checkpoint_interval: int = 0,
+):
+    """
+    Run the simulation from its current day to end_time, writing every day
+    to the output, and then add the cumulative columns to the main output.
+    With a checkpoint file, a snapshot is written to it every
+    checkpoint_interval days.
+    """
+    # pylint: disable=too-many-arguments
+
+    while e.time < end_time:
+        measures.enact_measures_and_evolutions(e, e.time, *files)
+
+        # Propagate the model by one time step.
+        e.evolve(reduce_stochasticity=False)
+
+        e.print_status(outfile)
+
+        if checkpoint and checkpoint_interval > 0:
+            if e.time % checkpoint_interval == 0:
+                e.save_snapshot(checkpoint)
+
+    # calculate cumulative sums.
+    e.add_cum_column(outfile, CUMULATIVE_COLUMNS)
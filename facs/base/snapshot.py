@@ -0,0 +1,287 @@
+"""
+Module to save the state of an Ecosystem to a snapshot, and restore it.
+
+A snapshot holds everything needed to continue a run from the day it was
+taken: the agents, houses, households, locations, groupings, nearest
+locations, needs, disease, counters, measures in force (including the state
+kept by the measures and vaccinations readers), random number streams and the
+output written so far. Every rank writes its own file. Houses, households and
+locations are stored as columns and rebuilt on loading, which keeps the files
+compact.
+
+Restoring a state does not consume it, so several scenario branches can be
+started from one snapshot.
+"""
+
+from __future__ import annotations
+
+import copy
+import dataclasses
+import os
+import pickle
+import re
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from facs.readers import read_measures_yml, read_vaccinations_yml
+from . import utils
+from .agents import AgentTable
+from .house import House
+from .household import Household
+from .rng import rng
+
+if TYPE_CHECKING:
+    from .disease import Disease
+    from .facs import Ecosystem
+
+SNAPSHOT_VERSION = 4
+
+# Ecosystem attributes stored in a snapshot as they are.
+ECOSYSTEM_ATTRIBUTES = (
+    "time",
+    "date",
+    "seasonal_effect",
+    "num_agents",
+    "household_size",
+    "ages",
+    "num_hospitalised",
+    "num_infections_today",
+    "num_recoveries_today",
+    "num_hospitalisations_today",
+    "num_deaths_today",
+    "vaccinations_today",
+    "disease",
+    # measures in force.
+    "closures",
+    "measures_entries",
+    "contact_rate_multiplier",
+    "self_isolation_multiplier",
+    "household_isolation_multiplier",
+    "track_trace_multiplier",
+    "keyworker_fraction",
+    "ci_multiplier",
+    "work_from_home",
+    "hospital_protection_factor",
+    "traffic_multiplier",
+    "enforce_masks_on_transport",
+    "external_travel_multiplier",
+    "external_infection_ratio",
+    "immunity_duration",
+    "vaccinations_available",
+    "vac_no_symptoms",
+    "vac_no_transmission",
+    "vaccinations_age_limit",
+    "vaccinations_legal_age_limit",
+    "vaccine_effect_time",
+    "vac_duration",
+)
+
+# Disease fields that measures and mutations change during a run.
+EVOLVING_DISEASE_FIELDS = ("infection_rate", "mutations")
+
+
+def snapshot_file(fname: str, rank: int) -> str:
+    """Return the name of the snapshot file of a rank, e.g. warmup_0.pkl for warmup.pkl."""
+
+    root, ext = os.path.splitext(fname)
+    return f"{root}_{rank}{ext}"
+
+
+def get_snapshot(e: Ecosystem) -> dict:
+    """Return the state of an ecosystem as a dict of arrays and plain values."""
+
+    houses = e.houses
+    households = e.agents.households
+    house_ids = {id(h): i for i, h in enumerate(houses)}
+    location_ids = {
+        id(l): i for locations in e.locations.values() for i, l in enumerate(locations)
+    }
+
+    return {
+        "version": SNAPSHOT_VERSION,
+        "rank": e.rank,
+        "size": e.size,
+        "ecosystem": copy.deepcopy(
+            {name: getattr(e, name) for name in ECOSYSTEM_ATTRIBUTES}
+        ),
+        "validation": e.validation.copy(),
+        "loc_inf_minutes": e.loc_inf_minutes.copy(),
+        "measures": read_measures_yml.measure_state(),
+        "mutation": read_vaccinations_yml.mutation_state(),
+        "houses": {
+            "name": np.array(e.house_names),
+            "x": np.array([h.location_x for h in houses], dtype="f8"),
+            "y": np.array([h.location_y for h in houses], dtype="f8"),
+        },
+        "households": {
+            "house": np.array([house_ids[id(h.house)] for h in households]),
+            "size": np.array([h.size for h in households]),
+            "first_agent": np.array([h.first_agent for h in households]),
+        },
+        "locations": {
+            loc_type: {
+                "name": np.array([l.name for l in locations]),
+                "x": np.array([l.x for l in locations], dtype="f8"),
+                "y": np.array([l.y for l in locations], dtype="f8"),
+                "sqm": np.array([l.sqm for l in locations]),
+            }
+            for loc_type, locations in e.locations.items()
+        },
+        # location (index into e.locations[type]) of every group, per type.
+        "groups": {
+            loc_type: np.array([location_ids[id(groups[g])] for g in sorted(groups)])
+            for loc_type, groups in e.loc_groups.items()
+        },
+        "nearest_locations": e.nearest_locations.copy(),
+        "needs": copy.deepcopy(vars(e.needs)),
+        "agents": e.agents.state(),
+        "rng": rng.get_state(),
+        "outputs": _get_outputs(e),
+    }
+
+
+def set_snapshot(e: Ecosystem, state: dict):
+    """
+    Replace the population and locations of a freshly created ecosystem with
+    those of a state returned by get_snapshot, and restore its counters and
+    random number streams.
+    """
+
+    if state["version"] != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {state['version']}.")
+    if (state["rank"], state["size"]) != (e.rank, e.size):
+        raise ValueError(
+            f"Snapshot of rank {state['rank']} of {state['size']} cannot be "
+            f"loaded on rank {e.rank} of {e.size}."
+        )
+
+    for name, value in copy.deepcopy(state["ecosystem"]).items():
+        setattr(e, name, value)
+    vars(e.needs).update(copy.deepcopy(state["needs"]))
+    read_measures_yml.restore_measure_state(state["measures"])
+    read_vaccinations_yml.restore_mutation_state(state["mutation"])
+
+    # the run may be longer or shorter than the one that took the snapshot.
+    num = min(len(e.validation), len(state["validation"]))
+    e.validation[:num] = state["validation"][:num]
+
+    e.agents = AgentTable()
+    houses = state["houses"]
+    e.houses = [
+        House(x, y, agent_table=e.agents)
+        for x, y in zip(houses["x"].tolist(), houses["y"].tolist())
+    ]
+    e.house_names = houses["name"].tolist()
+
+    households = state["households"]
+    for h, size, first in zip(
+        households["house"].tolist(),
+        households["size"].tolist(),
+        households["first_agent"].tolist(),
+    ):
+        house = e.houses[h]
+        household = Household(house, e.ages, size, populate=False)
+        household.first_agent = first
+        house.households.append(household)
+        house.total_size += size
+        house.num_agents += size
+    e.agents.restore(state["agents"])
+
+    e.locations = {}
+    e.location_indices = {}
+    for loc_type, columns in state["locations"].items():
+        e.add_locations(
+            loc_type, columns["name"], columns["x"], columns["y"], columns["sqm"]
+        )
+        # sizes are stored as adjusted on creation (e.g. for parks).
+        for location, sqm in zip(e.locations[loc_type], columns["sqm"].tolist()):
+            location.sqm = sqm
+    e.number_of_non_house_locations = 0
+    e.init_loc_inf_minutes()
+    e.loc_inf_minutes[:] = state["loc_inf_minutes"]
+
+    e.loc_groups = {
+        loc_type: {g: e.locations[loc_type][i] for g, i in enumerate(ids.tolist())}
+        for loc_type, ids in state["groups"].items()
+    }
+    e.nearest_locations = state["nearest_locations"].copy()
+    e.visit_planner = None
+    e._assign_house_slices()  # pylint: disable=protected-access
+
+    rng.set_state(state["rng"])
+
+
+def disease_differences(requested: Disease, stored: Disease) -> list[str]:
+    """
+    Return the fields in which a disease read from file differs from the
+    disease of a snapshot, leaving out the fields that change during a run.
+    """
+
+    return [
+        f.name
+        for f in dataclasses.fields(stored)
+        if f.name not in EVOLVING_DISEASE_FIELDS
+        and getattr(requested, f.name) != getattr(stored, f.name)
+    ]
+
+
+def _get_outputs(e: Ecosystem) -> dict | None:
+    # per-rank event logs by file name, and the main output of rank 0, or
+    # None if the headers have not been written yet.
+    if e.outfile is None:
+        return None
+
+    log = re.compile(rf"out_[a-z]+_{e.rank}\.csv")
+    logs = {
+        os.path.basename(name): utils.out_files.read(name)
+        for name in utils.out_files.files
+        if os.path.dirname(name) == utils.LOG_PREFIX
+        and log.fullmatch(os.path.basename(name))
+    }
+    main = utils.out_files.read(e.outfile) if e.rank == 0 else None
+    return {"logs": logs, "main": main}
+
+
+def write_outputs(e: Ecosystem, state: dict, outfile: str):
+    """
+    Rewrite the event logs of this rank as they were when the snapshot was
+    taken, and on rank 0 the main output, to outfile. Writes fresh headers
+    if the snapshot was taken before any output.
+    """
+
+    outputs = state["outputs"]
+    if outputs is None:
+        e.print_header(outfile)
+        return
+
+    for name, text in outputs["logs"].items():
+        utils.out_files.open(f"{utils.LOG_PREFIX}/{name}").write(text)
+    e.outfile = outfile
+    if e.rank == 0:
+        utils.out_files.open(outfile).write(outputs["main"])
+
+
+def save_snapshot(e: Ecosystem, fname: str):
+    """
+    Write the snapshot of this rank to snapshot_file(fname, rank). The file
+    is replaced in one step, so an interrupted write keeps the old snapshot.
+    """
+
+    fname = snapshot_file(fname, e.rank)
+    os.makedirs(os.path.dirname(fname) or ".", exist_ok=True)
+    with open(f"{fname}.tmp", "wb") as f:
+        pickle.dump(get_snapshot(e), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(f"{fname}.tmp", fname)
+
+
+def load_snapshot(e: Ecosystem, fname: str) -> dict:
+    """
+    Restore an ecosystem from the snapshot of this rank, see save_snapshot,
+    and return the snapshot.
+    """
+
+    with open(snapshot_file(fname, e.rank), "rb") as f:
+        state = pickle.load(f)
+    set_snapshot(e, state)
+    return state
@@ -0,0 +1,226 @@
+"""Module for the LocationIndex class, a spatial index over locations."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .rng import rng
+
+if TYPE_CHECKING:
+    from .location import Location
+
+LOCATIONS_PER_CELL = 8
+MEMORY_BUDGET = 64 * 1024**2  # bytes of temporary arrays per block of houses.
+BYTES_PER_DISTANCE = 48  # distance matrix entry plus temporaries.
+
+
+class LocationIndex:
+    """
+    Uniform grid over a set of locations, for k-nearest queries in the
+    size-scaled distance `dist / sqrt(sqm)` used to pick preferred locations.
+
+    For every grid cell, the bounding box of its locations and their largest
+    sqm give a lower bound on the scaled distance to anything in the cell, so
+    a query only has to measure the locations in cells whose bound does not
+    exceed the k-th smallest distance found so far.
+    """
+
+    def __init__(self, x, y, sqm, locations_per_cell: int = LOCATIONS_PER_CELL):
+        self.x = np.asarray(x, dtype="f8")
+        self.y = np.asarray(y, dtype="f8")
+        self.root_sqm = np.sqrt(np.asarray(sqm, dtype="f8"))
+
+        num = len(self.x)
+        cells_per_axis = max(1, int(np.ceil(np.sqrt(num / locations_per_cell))))
+        cx = self._cell_coordinate(self.x, cells_per_axis)
+        cy = self._cell_coordinate(self.y, cells_per_axis)
+        cell = cx * cells_per_axis + cy
+
+        # location indices grouped by (non-empty) cell, in compressed rows.
+        self.members = np.argsort(cell, kind="stable")
+        cells, starts, counts = np.unique(
+            cell[self.members], return_index=True, return_counts=True
+        )
+        self.starts = starts
+        self.counts = counts
+
+        member_cell = np.repeat(np.arange(len(cells)), counts)
+        x, y = self.x[self.members], self.y[self.members]
+        self.min_x = np.minimum.reduceat(x, starts) if num > 0 else x
+        self.max_x = np.maximum.reduceat(x, starts) if num > 0 else x
+        self.min_y = np.minimum.reduceat(y, starts) if num > 0 else y
+        self.max_y = np.maximum.reduceat(y, starts) if num > 0 else y
+        self.max_root_sqm = np.zeros(len(cells))
+        np.maximum.at(self.max_root_sqm, member_cell, self.root_sqm[self.members])
+
+    @classmethod
+    def from_locations(cls, locations: list[Location]) -> LocationIndex:
+        """Build an index over a list of locations."""
+
+        return cls(
+            [l.x for l in locations],
+            [l.y for l in locations],
+            [l.sqm for l in locations],
+        )
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    @staticmethod
+    def _cell_coordinate(values: np.ndarray, cells_per_axis: int) -> np.ndarray:
+        if len(values) == 0:
+            return np.zeros(0, dtype="int64")
+
+        low, high = values.min(), values.max()
+        width = (high - low) / cells_per_axis
+        if width == 0.0:
+            return np.zeros(len(values), dtype="int64")
+        return np.minimum(((values - low) / width).astype("int64"), cells_per_axis - 1)
+
+    def _cell_members(self, cells: np.ndarray) -> np.ndarray:
+        counts = self.counts[cells]
+        offsets = np.repeat(self.starts[cells] - np.cumsum(counts) + counts, counts)
+        return self.members[offsets + np.arange(counts.sum())]
+
+    def scaled_distances(self, x: float, y: float, ids: np.ndarray) -> np.ndarray:
+        """Return the scaled distances from (x, y) to the locations in ids."""
+
+        return _distance(self.x[ids] - x, self.y[ids] - y) / self.root_sqm[ids]
+
+    def nearest(self, x: float, y: float, k: int) -> np.ndarray:
+        """
+        Return the indices of the k locations with the smallest scaled distance
+        to (x, y), closest first. Ties are ordered by location index, as in a
+        stable sort of all distances.
+        """
+
+        k = min(k, len(self))
+        if k <= 0:
+            return np.zeros(0, dtype="int64")
+
+        dx = np.maximum(np.maximum(self.min_x - x, x - self.max_x), 0.0)
+        dy = np.maximum(np.maximum(self.min_y - y, y - self.max_y), 0.0)
+        bounds = _distance(dx, dy) / self.max_root_sqm
+
+        # measure the cells with the smallest bounds until they hold k locations,
+        # which bounds the k-th distance, then every cell that may beat it.
+        order = np.argsort(bounds, kind="stable")
+        first = np.searchsorted(np.cumsum(self.counts[order]), k) + 1
+        ids = self._cell_members(order[:first])
+        kth = np.partition(self.scaled_distances(x, y, ids), k - 1)[k - 1]
+        ids = self._cell_members(np.flatnonzero(bounds <= kth))
+
+        distances = self.scaled_distances(x, y, ids)
+        ranked = np.lexsort((ids, distances))[:k]
+        return ids[ranked]
+
+    def nearest_many(
+        self, x: np.ndarray, y: np.ndarray, k: int, memory_budget: int = MEMORY_BUDGET
+    ) -> np.ndarray:
+        """
+        Return the k nearest locations to every point (x[i], y[i]) as a matrix,
+        ordered as in `nearest`.
+
+        Points are processed in blocks, each measured against all locations in
+        one broadcast distance matrix, with the block size bounded by
+        memory_budget bytes.
+        """
+
+        x, y = np.asarray(x, dtype="f8"), np.asarray(y, dtype="f8")
+        k = max(0, min(k, len(self)))
+        result = np.zeros((len(x), k), dtype="int64")
+        if k == 0:
+            return result
+
+        rows = max(1, memory_budget // (BYTES_PER_DISTANCE * len(self)))
+        for start in range(0, len(x), rows):
+            block = slice(start, start + rows)
+            dx = x[block, None] - self.x
+            dy = y[block, None] - self.y
+            result[block] = _smallest(_distance(dx, dy) / self.root_sqm, k)
+        return result
+
+
+def _distance(dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+    # same arithmetic as utils.calc_dist, so that rankings agree exactly.
+    return np.sqrt(dx * dx + dy * dy)
+
+
+def _smallest(distances: np.ndarray, k: int) -> np.ndarray:
+    """
+    Return the column indices of the k smallest entries of every row, in
+    increasing order, with ties ordered by column.
+    """
+
+    columns = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    selected = np.take_along_axis(distances, columns, axis=1)
+
+    # argpartition breaks ties at the k-th distance arbitrarily: in rows where
+    # not all tied entries fit, take the lowest columns among them instead.
+    kth = selected.max(axis=1)[:, None]
+    tied = distances == kth
+    ambiguous = np.flatnonzero(tied.sum(axis=1) > (selected == kth).sum(axis=1))
+    if len(ambiguous) > 0:
+        rows, tied = distances[ambiguous], tied[ambiguous]
+        missing = k - (rows < kth[ambiguous]).sum(axis=1)[:, None]
+        chosen = (rows < kth[ambiguous]) | (tied & (np.cumsum(tied, axis=1) <= missing))
+        columns[ambiguous] = np.nonzero(chosen)[1].reshape(len(ambiguous), k)
+        selected[ambiguous] = np.take_along_axis(rows, columns[ambiguous], axis=1)
+
+    order = np.lexsort((columns, selected), axis=1)
+    return np.take_along_axis(columns, order, axis=1)
+
+
+def nearest_location_matrix(
+    x: np.ndarray,
+    y: np.ndarray,
+    indices: list[LocationIndex | None],
+    neighbours: list[int],
+    fixed: list[bool],
+    engine: str = "block",
+    memory_budget: int = MEMORY_BUDGET,
+    generator: np.random.Generator | None = None,
+) -> np.ndarray:
+    """
+    Find the preferred locations of every house, for every location type.
+
+    indices, neighbours and fixed are given per location type id. Returns an
+    int32 matrix of shape (houses, types, k) holding, for every house and type,
+    the indices of the `neighbours` nearest locations of that type (in the
+    order of LocationIndex.nearest), padded with -1. For `fixed` types a single
+    location is picked at random from the nearest ones.
+
+    engine is "block" to measure blocks of houses against all locations at
+    once, or "index" to query the grid index house by house. The fixed picks
+    are drawn from generator, or from the rank's main stream if it is None.
+    """
+
+    if engine not in ("block", "index"):
+        raise ValueError(f"Unknown nearest location engine {engine}.")
+
+    num = len(x)
+    nearest = []
+    for index, k in zip(indices, neighbours):
+        if index is None:
+            nearest.append(np.zeros((num, 0), dtype="int64"))
+        elif engine == "block":
+            nearest.append(index.nearest_many(x, y, k, memory_budget))
+        else:
+            found = [index.nearest(hx, hy, k) for hx, hy in zip(x, y)]
+            nearest.append(np.array(found, dtype="int64").reshape(num, -1))
+
+    # fixed types keep one of the nearest locations, drawn for all houses at once.
+    if generator is None:
+        generator = rng.generator
+    for t, is_fixed in enumerate(fixed):
+        if is_fixed and nearest[t].shape[1] > 1:
+            slot = generator.integers(0, nearest[t].shape[1], num)
+            nearest[t] = nearest[t][np.arange(num), slot][:, None]
+
+    width = max([n.shape[1] for n in nearest] + [1])
+    matrix = np.full((num, len(nearest), width), -1, dtype="int32")
+    for t, n in enumerate(nearest):
+        matrix[:, t, : n.shape[1]] = n
+    return matrix
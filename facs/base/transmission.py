@@ -0,0 +1,185 @@
+"""Module for the vectorised location transmission kernel."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .agents import SUSCEPTIBLE, EXPOSED
+from .location_types import building_types_dict
+from .rng import rng
+from .utils import log_infection
+
+if TYPE_CHECKING:
+    from .facs import Ecosystem
+    from .visits import VisitPlanner
+
+PARK = building_types_dict["park"]
+TYPE_NAMES = sorted(building_types_dict, key=building_types_dict.get)
+MINUTES_OPENED = 12 * 60
+
+
+def base_rates(e: Ecosystem, planner: VisitPlanner) -> np.ndarray:
+    """
+    Return the base infection rate of every location, by loc_inf_minutes_id.
+
+    (i)
+    Pinf =
+    Contact rate multiplier [dimensionless] * 4
+    (to correct for a 1m2 baseline, rather than 4 m2.)
+    *
+    Infection rate [dimensionless] / airflow coefficient [dimensionless]
+    *
+    Duration of susceptible person visit [minutes] / 1 day [minutes]
+    *
+    (Number of infectious person visiting today [#] *
+    physical area of a single standing person [m^2]) /
+    (Area of space [m^2] *
+    number of infectious persons in 4 m^2 in baseline scenario (1) [#])
+    *
+    Average infectious person visit duration [minutes] / minutes_opened [minutes]
+
+    Pinf is a dimensionless quantity (a probability) which must never exceed one.
+
+    (ii)
+    if we define Pinf = Duration of susceptible person visit [minutes] * base_rate,
+    and substitute in the # of infectious people in the baseline scenario (i.e., 1),
+    then we get:
+    base_rate =
+    Contact rate multiplier [dimensionless] * 4
+    (to correct for a 1m2 baseline, rather than 4 m2.)
+    *
+    Infection rate [dimensionless] / airflow coefficient [dimensionless]
+    *
+    1.0 / 1 day [minutes]
+    *
+    (Number of infectious person visiting today [#] *
+    physical area of a single standing person [m^2]) /
+    (Area of space [m^2])
+    *
+    Average infectious person visit duration [minutes] / minutes_opened [minutes]
+
+    base_rate has a quantity of [minutes^-1].
+
+    (iii)
+    Furthermore, we have a merged quantity infected_minutes:
+    infected_minutes = Average number of infectious person visiting today [#] *
+    Average infectious person visit duration [minutes]
+    And we define two constants:
+    1. physical area of a single standing person [m^2], which we set to 1 m^2.
+
+    So we rewrite base_rate at:
+    base_rate =
+    Contact rate multiplier [dimensionless] * 4
+    (to correct for a 1m2 baseline, rather than 4 m2.)
+    *
+    Infection rate [dimensionless] / airflow coefficient [dimensionless]
+    *
+    1.0 / 1 day [minutes]
+    *
+    1 [m^2] /
+    (Area of space [m^2])
+    *
+    Total infectious person minutes [minutes] / minutes_opened [minutes]
+
+    (iv)
+    Lastly, we simplify the equation for easier coding to:
+
+    base_rate =
+    4.0
+    *
+    ( Contact rate multiplier [dimensionless]
+    *
+    Infection rate [dimensionless]
+    *
+    Total infectious person minutes [minutes] )
+    /
+    ( airflow coefficient [dimensionless]
+    *
+    24*60 [minutes]
+    *
+    Area of space [m^2]
+    *
+    minutes_opened [minutes] (
+
+    The infection probability of a visit is its duration in minutes times the
+    base rate of the visited location.
+    """
+
+    airflow = np.where(planner.loc_type == PARK, e.airflow_outdoors, e.airflow_indoors)
+    contact_rate = np.array(
+        [e.contact_rate_multiplier[t] for t in TYPE_NAMES], dtype="f8"
+    )[planner.loc_type]
+
+    return (
+        4.0
+        * e.seasonal_effect
+        * contact_rate
+        * e.disease.infection_rate
+        * e.loc_inf_minutes
+    ) / (airflow * 24.0 * 60.0 * planner.loc_sqm * MINUTES_OPENED)
+
+
+def closed_types(e: Ecosystem) -> np.ndarray:
+    """Return a mask of the location types that are closed today."""
+
+    closed = np.zeros(len(TYPE_NAMES), dtype=bool)
+    for loc_type, time in e.closures.items():
+        if loc_type in building_types_dict and time < e.time:
+            closed[building_types_dict[loc_type]] = True
+    return closed
+
+
+def infect_agents(e: Ecosystem, ids: np.ndarray, location_types: list[str]):
+    """Expose the agents in `ids`, who were infected at `location_types`."""
+
+    agents = e.agents
+    agents.set_status(ids, EXPOSED)
+    agents.status_change_time[ids] = e.time
+    agents.mild_version[ids] = True
+    agents.set_hospitalised(ids, False)
+    agents.phase_duration[ids] = np.maximum(
+        1, rng.generator.poisson(e.disease.incubation_period, len(ids))
+    )
+    for i, location_type in zip(ids, location_types):
+        house = agents.houses[agents.house[i]]
+        e.num_infections_today += log_infection(
+            e.time,
+            house.location_x,
+            house.location_y,
+            location_type,
+            e.rank,
+            int(agents.phase_duration[i]),
+        )
+
+
+def spread_infections(e: Ecosystem, planner: VisitPlanner):
+    """
+    Spread infections at all open locations, using today's visits in e.visits.
+
+    Infections for all susceptible visits are drawn in one batch. An agent
+    infected during several visits is infected once, at the first of these
+    visits in location order.
+    """
+
+    rates = base_rates(e, planner)
+    open_locations = ~closed_types(e)[planner.loc_type]
+    e.base_rate += rates[open_locations].sum()
+
+    agents = e.visits.agents
+    locations = e.visits.locations
+    visited = open_locations[locations]
+    e.loc_evolves += np.count_nonzero(visited)
+
+    susceptible = np.flatnonzero(visited & (e.agents.status[agents] == SUSCEPTIBLE))
+    infection_probability = (
+        e.visits.minutes[susceptible] * rates[locations[susceptible]]
+    )
+    draws = rng.generator.random(len(susceptible))
+    infected = susceptible[draws < infection_probability]
+
+    ids, first = np.unique(agents[infected], return_index=True)
+    order = np.argsort(first, kind="stable")
+    loc_types = planner.loc_type[locations[infected[first[order]]]]
+    infect_agents(e, ids[order], [TYPE_NAMES[t] for t in loc_types])
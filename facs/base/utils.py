@@ -5,10 +5,11 @@ from __future__ import annotations
 import os
 
 from typing import TYPE_CHECKING
-from warnings import warn
 
 import numpy as np
 
+from .rng import rng
+
 if TYPE_CHECKING:
     from .person import Person
 
@@ -16,12 +17,12 @@ LOG_PREFIX = "."
 
 
 def probability(prob):
-    """Return True with probability prob."""
-
-    if prob < 0 or prob > 1:
-        warn(f"Probability (currently {prob}) must be between 0 and 1.")
+    """
+    Return True with probability prob. Probabilities are validated where they
+    are read (see Disease and compile_vaccinations_yml), not on every draw.
+    """
 
-    return np.random.random() < prob
+    return rng.random() < prob
 
 
 def get_random_int(high) -> int:
@@ -30,7 +31,25 @@ def get_random_int(high) -> int:
     if high < 0:
         raise ValueError("high must be greater than 0")
 
-    return np.random.randint(0, high)
+    return rng.integer(high)
+
+
+def sample_without_replacement(population: int, num: int) -> np.ndarray:
+    """
+    Return num distinct random integers between 0 and population.
+
+    Uses rejection rather than a permutation, so the cost depends on num only;
+    meant for num much smaller than population.
+    """
+
+    if num > population:
+        raise ValueError("num must not be greater than population")
+
+    sample = np.unique(rng.generator.integers(0, population, num))
+    while len(sample) < num:
+        extra = rng.generator.integers(0, population, num - len(sample))
+        sample = np.unique(np.concatenate((sample, extra)))
+    return sample
 
 
 class OutputFiles:
@@ -51,6 +70,13 @@ class OutputFiles:
 
         return self.files[file_name]
 
+    def read(self, file_name):
+        """Return everything written so far to an open file."""
+
+        self.files[file_name].flush()
+        with open(file_name, encoding="utf-8") as f:
+            return f.read()
+
     def __del__(self) -> None:
         for _, value in self.files.items():
             value.close()
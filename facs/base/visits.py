@@ -0,0 +1,246 @@
+"""Module for the VisitPlanner class, which plans the daily visits of all agents."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .agents import SUSCEPTIBLE, EXPOSED, INFECTIOUS
+from .location_types import building_types, building_types_dict
+from .rng import rng
+
+if TYPE_CHECKING:
+    from .facs import Ecosystem
+
+HOSPITAL = building_types_dict["hospital"]
+OFFICE = building_types_dict["office"]
+
+# location type visited instead of an office, by job.
+# 0=default, 1=teacher, 2=shop worker, 3=health worker
+JOB_LOCATION_TYPES = np.array(
+    [
+        OFFICE,
+        building_types_dict["school"],
+        building_types_dict["shopping"],
+        HOSPITAL,
+    ]
+)
+
+
+class VisitPlanner:
+    """
+    Plans the visits of all agents for a day in one vectorised pass.
+
+    Locations are referred to by their loc_inf_minutes_id. For every house and
+    location type, the candidate locations (the nearest locations of the house,
+    from e.nearest_locations) are kept in a padded matrix, so that a location
+    can be picked for every (agent, need) pair with a single batch of random
+    draws.
+    """
+
+    def __init__(self, e: Ecosystem):
+        locations = e.agents.locations
+
+        self.loc_type = np.array(
+            [building_types_dict[l.loc_type] for l in locations], dtype="int32"
+        )
+        self.loc_sqm = np.array([l.sqm for l in locations], dtype="f8")
+        self.loc_visit_time = np.array(
+            [l.avg_visit_time for l in locations], dtype="f8"
+        )
+        types_data = e.config.building_types_data
+        self.weighted = np.array(
+            [bool(types_data[t]["weighted"]) for t in building_types]
+        )
+
+        # e.nearest_locations holds indices into e.locations[type].
+        nearest = e.nearest_locations
+        self.candidates = np.full(nearest.shape, -1, dtype="int32")
+        for lt, k in building_types_dict.items():
+            if lt in e.locations:
+                ids = np.array(
+                    [l.loc_inf_minutes_id for l in e.locations[lt]], dtype="int32"
+                )
+                found = nearest[:, k] >= 0
+                self.candidates[:, k][found] = ids[nearest[:, k][found]]
+        self.num_candidates = (self.candidates >= 0).sum(axis=2).astype("int32")
+
+        # location ids of the groups of location types with a grouping.
+        self.group_locations = {
+            building_types_dict[lt]: np.array(
+                [groups[g].loc_inf_minutes_id for g in sorted(groups)], dtype="int32"
+            )
+            for lt, groups in e.loc_groups.items()
+        }
+
+    def _pick_nearest(self, houses, types):
+        """Pick one candidate location per (house, type) pair, -1 if there is none."""
+
+        count = self.num_candidates[houses, types]
+        picked = np.full(len(houses), -1, dtype="int32")
+
+        uniform = np.flatnonzero((count > 0) & ~self.weighted[types])
+        slot = (rng.generator.random(len(uniform)) * count[uniform]).astype("int32")
+        picked[uniform] = self.candidates[houses[uniform], types[uniform], slot]
+
+        weighted = np.flatnonzero((count > 0) & self.weighted[types])
+        if len(weighted) > 0:
+            cand = self.candidates[houses[weighted], types[weighted]]
+            sizes = np.where(cand >= 0, self.loc_sqm[cand], 0.0)
+            cumulative = np.cumsum(sizes, axis=1)
+            draw = rng.generator.random(len(weighted)) * cumulative[:, -1]
+            slot = np.minimum(
+                (cumulative <= draw[:, None]).sum(axis=1), count[weighted] - 1
+            )
+            picked[weighted] = cand[np.arange(len(weighted)), slot]
+
+        return picked
+
+    def plan(self, e: Ecosystem) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Plan the visits of all agents for the day.
+
+        Adds the infectious minutes of today's visitors to e.loc_inf_minutes, and
+        returns the visits as arrays of agent indices, location ids and
+        visit times in minutes.
+        """
+
+        a = e.agents
+        active = np.flatnonzero(np.isin(a.status, (SUSCEPTIBLE, EXPOSED, INFECTIOUS)))
+        needs = e.needs.get_needs_bulk(
+            a.age[active],
+            a.work_from_home[active],
+            a.school_from_home[active],
+            a.hospitalised[active],
+        )
+        row, k = np.nonzero(needs >= 1)
+        minutes = needs[row, k].astype("f8")
+        agents = active[row]
+
+        hospitalised = a.hospitalised[agents]
+        job = a.job[agents]
+        group = a.groups[agents, k]
+
+        in_hospital = (k == HOSPITAL) & hospitalised
+        at_work = (k == OFFICE) & (job > 0)
+        grouped = ~in_hospital & ~at_work & (group >= 0)
+        nearest = ~in_hospital & ~grouped
+
+        location = np.full(len(agents), -1, dtype="int32")
+        location[in_hospital] = a.hospital[agents[in_hospital]]
+        for lid, group_locations in self.group_locations.items():
+            sel = grouped & (k == lid)
+            location[sel] = group_locations[group[sel]]
+        types = np.where(at_work, JOB_LOCATION_TYPES[job], k)[nearest]
+        location[nearest] = self._pick_nearest(a.house[agents[nearest]], types)
+
+        found = location >= 0
+        agents, location, minutes = agents[found], location[found], minutes[found]
+        e.visit_minutes += minutes.sum()
+
+        # Register the visits to the locations.
+        infectious = a.status[agents] == INFECTIOUS
+        visit_time = self.loc_visit_time[location]
+        visit_time[infectious] *= e.self_isolation_multiplier  # case isolation (CI)
+
+        admitted = (
+            infectious
+            & a.hospitalised[agents]
+            & (self.loc_type[location] == HOSPITAL)
+        )
+        e.loc_inf_minutes += np.bincount(
+            location[admitted],
+            weights=minutes[admitted] / 7 * e.hospital_protection_factor,
+            minlength=len(e.loc_inf_minutes),
+        )
+
+        # people in household quarantine, but not subject to CI.
+        quarantined = ~infectious & (a.household_infectious[a.household[agents]] > 0)
+        visit_time[quarantined] *= e.household_isolation_multiplier
+
+        # = minutes per week / (average visit time * days in the week)
+        possible = ~admitted & (visit_time > 0.0)
+        visit_probability = np.zeros(len(agents))
+        visit_probability[possible] = minutes[possible] / (visit_time[possible] * 7)
+        visits = possible & (rng.generator.random(len(agents)) < visit_probability)
+
+        contagious = visits & infectious
+        e.loc_inf_minutes += np.bincount(
+            location[contagious],
+            weights=visit_time[contagious],
+            minlength=len(e.loc_inf_minutes),
+        )
+
+        return agents[visits], location[visits], visit_time[visits]
+
+
+class VisitBuffer:
+    """
+    Reusable store of the visits of a day, grouped by location.
+
+    Visits are kept in flat, preallocated arrays sorted by location id, with
+    `offsets[lid]:offsets[lid + 1]` delimiting the visits to location lid
+    (compressed sparse row layout). Clearing the buffer is O(1), and the arrays
+    only grow when a day has more visits than any day before.
+    """
+
+    def __init__(self, num_locations: int, capacity: int = 1024):
+        self.num_locations = num_locations
+        self.size = 0
+        self.offsets = np.zeros(num_locations + 1, dtype="int64")
+        self._agents = np.zeros(capacity, dtype="int64")
+        self._locations = np.zeros(capacity, dtype="int32")
+        self._minutes = np.zeros(capacity, dtype="f8")
+
+    def __len__(self) -> int:
+        return self.size
+
+    def clear(self):
+        """Remove all visits."""
+        self.size = 0
+
+    def _reserve(self, capacity: int):
+        if capacity <= len(self._agents):
+            return
+
+        capacity = max(capacity, 2 * len(self._agents))
+        self._agents = np.zeros(capacity, dtype="int64")
+        self._locations = np.zeros(capacity, dtype="int32")
+        self._minutes = np.zeros(capacity, dtype="f8")
+
+    def load(self, agents: np.ndarray, locations: np.ndarray, minutes: np.ndarray):
+        """Replace the contents of the buffer with the given visits."""
+
+        n = len(agents)
+        self._reserve(n)
+        order = np.argsort(locations, kind="stable")
+        np.take(agents, order, out=self._agents[:n])
+        np.take(locations, order, out=self._locations[:n])
+        np.take(minutes, order, out=self._minutes[:n])
+        np.cumsum(
+            np.bincount(locations, minlength=self.num_locations),
+            out=self.offsets[1:],
+        )
+        self.size = n
+
+    @property
+    def agents(self) -> np.ndarray:
+        """Agent index of every visit, grouped by location."""
+        return self._agents[: self.size]
+
+    @property
+    def locations(self) -> np.ndarray:
+        """Location id of every visit, in ascending order."""
+        return self._locations[: self.size]
+
+    @property
+    def minutes(self) -> np.ndarray:
+        """Duration of every visit in minutes, grouped by location."""
+        return self._minutes[: self.size]
+
+    def location_visits(self, lid: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return the agent indices and visit minutes of the visits to location lid."""
+
+        visits = slice(self.offsets[lid], self.offsets[lid + 1])
+        return self.agents[visits], self.minutes[visits]
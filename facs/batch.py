@@ -0,0 +1,342 @@
+"""
+Run several measures, vaccination and disease scenarios on one population.
+
+The buildings, population and nearest locations are built once. Every
+scenario then runs its warm-up and simulation in a worker process forked from
+the built ecosystem, so the workers share its memory copy-on-write and a sweep
+costs little more than the simulations themselves. Each scenario writes to its
+own directory, with the same files as a run of run.py with --output_dir.
+
+Scenarios run the warm-up and main loop of facs.base.simulation, as run.py
+does, so a scenario started from the shared ecosystem with a given seed
+produces the same output as run.py with that seed and scenario. As MPI cannot be used in
+a forked process, a batch started with a single rank builds its ecosystem in
+serial mode, without MPI communication. Runs with more than one MPI rank do
+not fork; they run the scenarios one after another, restoring the built
+ecosystem from an in-memory snapshot before each.
+
+Usage:
+    python -m facs.batch --location=brent --seed=42 \\
+        --measures_yml measures_uk measures_uk_lockdown --processes=2
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import multiprocessing
+import os
+import sys
+from dataclasses import dataclass
+from mpi4py import MPI
+
+from facs.base import facs, simulation, utils
+from facs.base.config import Config
+from facs.base.measures import Measures
+from facs.readers import read_age_csv, read_building_csv, read_disease_yml
+
+
+@dataclass
+class Scenario:
+    """
+    Input files of a scenario, without extension, and the name of the
+    directory its output is written to (the measures file by default).
+    """
+
+    measures_yml: str = "measures_uk"
+    disease_yml: str = "disease_covid19"
+    vaccinations_yml: str = "vaccinations"
+    name: str | None = None
+
+    def __post_init__(self):
+        if self.name is None:
+            self.name = self.measures_yml
+
+
+@dataclass
+class Batch:
+    """Settings shared by all scenarios of a batch, and the built ecosystem."""
+
+    eco: facs.Ecosystem
+    location: str
+    data_dir: str
+    output_dir: str
+    end_time: int
+    start_date: str = "1/3/2020"
+    starting_infections: str = "500"
+    dbg: bool = False
+
+
+# the batch being run, inherited by the forked workers.
+_batch: Batch | None = None
+
+
+def build_ecosystem(
+    location: str,
+    end_time: int,
+    data_dir: str = "covid_data",
+    seed: int | None = None,
+    quicktest: bool = False,
+    household_size: float = 2.6,
+    office_size: int = 2500,
+    workspace: int = 20,
+    mode: str | None = None,
+) -> facs.Ecosystem:
+    """
+    Build the buildings, population and nearest locations of a location, as
+    run.py does before the warm-up. By default, the ecosystem runs in serial
+    mode unless the program was started on more than one MPI rank.
+    """
+    # pylint: disable=too-many-arguments
+
+    if mode is None:
+        mode = "parallel" if MPI.COMM_WORLD.Get_size() > 1 else "serial"
+    eco = facs.Ecosystem(
+        end_time, data_dir, mode=mode, seed=seed, config=Config(data_dir)
+    )
+    eco.ages = read_age_csv.read_age_csv(f"{data_dir}/age_distribution.csv", location)
+    read_building_csv.read_building_csv(
+        eco,
+        f"{data_dir}/{location}_buildings.csv",
+        data_dir=data_dir,
+        house_ratio=100 if quicktest else 2,
+        workspace=workspace,
+        office_size=office_size,
+        household_size=household_size,
+        work_participation_rate=0.5,
+    )
+    return eco
+
+
+def run_scenario(batch: Batch, scenario: Scenario) -> str:
+    """
+    Run the warm-up and simulation of a scenario on batch.eco, writing to
+    its own output directory, and return the main output file. The event logs
+    go to the same directory while the scenario runs.
+    """
+
+    eco = batch.eco
+    output_dir = f"{batch.output_dir}/{scenario.name}"
+    os.makedirs(output_dir, exist_ok=True)
+    outfile = f"{output_dir}/{batch.location}-{scenario.measures_yml}.csv"
+    files = (
+        batch.data_dir,
+        scenario.measures_yml,
+        scenario.vaccinations_yml,
+        scenario.disease_yml,
+    )
+
+    measures = Measures()
+    eco.disease = read_disease_yml.read_disease_yml(
+        f"{batch.data_dir}/{scenario.disease_yml}.yml"
+    )
+    log_prefix = utils.LOG_PREFIX
+    utils.LOG_PREFIX = output_dir
+    try:
+        simulation.run_warmup(
+            eco,
+            measures,
+            files,
+            batch.start_date,
+            batch.starting_infections,
+            outfile,
+            dbg=batch.dbg,
+        )
+        simulation.run_until(eco, measures, files, batch.end_time, outfile)
+    finally:
+        utils.LOG_PREFIX = log_prefix
+
+    if eco.rank == 0:
+        print(f"Scenario {scenario.name} complete.", file=sys.stderr)
+    return outfile
+
+
+def _run_worker(scenario: Scenario) -> str:
+    return run_scenario(_batch, scenario)
+
+
+def run_batch(
+    batch: Batch, scenarios: list[Scenario], processes: int | None = None
+) -> dict[str, str]:
+    """
+    Run every scenario from the ecosystem of the batch, and return the main
+    output file of every scenario by name. The ecosystem itself is left
+    unchanged.
+
+    Ecosystems in serial mode run up to processes scenarios at a time (all
+    CPUs by default) in forked workers. Ecosystems using MPI run them one
+    after another in this process, as forked processes cannot use MPI.
+    """
+    global _batch  # pylint: disable=global-statement
+
+    names = [scenario.name for scenario in scenarios]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Scenario names must be unique, got {names}.")
+
+    if batch.eco.mode != "serial":
+        state = batch.eco.get_snapshot()
+        outfiles = []
+        for scenario in scenarios:
+            outfiles.append(run_scenario(batch, scenario))
+            batch.eco.set_snapshot(state)
+        return dict(zip(names, outfiles))
+
+    # every scenario gets a fresh worker, forked from the unchanged ecosystem.
+    _batch = batch
+    try:
+        context = multiprocessing.get_context("fork")
+        with context.Pool(processes, maxtasksperchild=1) as pool:
+            return dict(zip(names, pool.map(_run_worker, scenarios, chunksize=1)))
+    finally:
+        _batch = None
+
+
+def parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse the command line of python -m facs.batch."""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m facs.batch",
+        description="Run every combination of the given measures, disease and "
+        "vaccination files on one population.",
+    )
+    parser.add_argument("--location", default="brent", help="Name of location to load.")
+    parser.add_argument(
+        "-m",
+        "--measures_yml",
+        nargs="+",
+        default=["measures_uk"],
+        help="Input YML files containing interventions.",
+    )
+    parser.add_argument(
+        "-d",
+        "--disease_yml",
+        nargs="+",
+        default=["disease_covid19"],
+        help="Input YML files containing disease specifications.",
+    )
+    parser.add_argument(
+        "-v",
+        "--vaccinations_yml",
+        nargs="+",
+        default=["vaccinations"],
+        help="Input YML files containing vaccine strategy specifications.",
+    )
+    parser.add_argument(
+        "--output_dir",
+        default=".",
+        help="Directory to write output to, one subdirectory per scenario.",
+    )
+    parser.add_argument(
+        "--data_dir",
+        default="covid_data",
+        help="subdirectory containing simulation input data.",
+    )
+    parser.add_argument(
+        "-s",
+        "--starting_infections",
+        default="500",
+        help="Starting # of infections. Values below 1.0 are interpreted as a ratio of population.",
+    )
+    parser.add_argument(
+        "--household_size", type=float, default=2.6, help="Average household size."
+    )
+    parser.add_argument(
+        "--start_date", default="1/3/2020", help="Start date, format = %%d/%%m/%%Y"
+    )
+    parser.add_argument(
+        "-q",
+        "--quicktest",
+        action="store_true",
+        help="set house_ratio to 100 to do quicker (but less accurate) runs for populous regions.",
+    )
+    parser.add_argument(
+        "--dbg", action="store_true", help="Write additional outputs to help debugging"
+    )
+    parser.add_argument(
+        "-t",
+        "--simulation_period",
+        type=int,
+        default=-1,
+        help="Simulation duration [days].",
+    )
+    parser.add_argument(
+        "-o", "--office_size", type=int, default=2500, help="Office size in m2."
+    )
+    parser.add_argument(
+        "-w", "--workspace", type=int, default=20, help="Workspace per person in m2."
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Seed for random number generator."
+    )
+    parser.add_argument(
+        "-p",
+        "--processes",
+        type=int,
+        default=None,
+        help="Number of scenarios run at once (default: number of CPUs).",
+    )
+    return parser.parse_args(argv)
+
+
+def scenario_grid(
+    measures: list[str], diseases: list[str], vaccinations: list[str]
+) -> list[Scenario]:
+    """
+    Return a scenario for every combination of the input files, named after
+    the files that differ between scenarios (or the measures file).
+    """
+
+    scenarios = []
+    for files in itertools.product(measures, diseases, vaccinations):
+        varied = [
+            name
+            for name, choices in zip(files, (measures, diseases, vaccinations))
+            if len(choices) > 1
+        ]
+        scenarios.append(Scenario(*files, name="-".join(varied) or None))
+    return scenarios
+
+
+def main(argv: list[str] | None = None):
+    """The main program"""
+
+    args = parse_arguments(argv)
+    end_time = args.simulation_period if args.simulation_period > 0 else 1100
+    scenarios = scenario_grid(
+        args.measures_yml, args.disease_yml, args.vaccinations_yml
+    )
+
+    eco = build_ecosystem(
+        args.location,
+        end_time,
+        data_dir=args.data_dir,
+        seed=args.seed,
+        quicktest=args.quicktest,
+        household_size=args.household_size,
+        office_size=args.office_size,
+        workspace=args.workspace,
+    )
+    if eco.rank == 0:
+        print(
+            f"Built {eco.num_agents} agents; running {len(scenarios)} scenarios.",
+            file=sys.stderr,
+        )
+
+    batch = Batch(
+        eco,
+        args.location,
+        args.data_dir,
+        args.output_dir,
+        end_time,
+        start_date=args.start_date,
+        starting_infections=args.starting_infections,
+        dbg=args.dbg,
+    )
+    outfiles = run_batch(batch, scenarios, processes=args.processes)
+    if eco.rank == 0:
+        for name, outfile in outfiles.items():
+            print(f"{name}: {outfile}")
+
+
+if __name__ == "__main__":
+    main()
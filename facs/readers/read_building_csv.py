@@ -1,10 +1,20 @@
-import csv
+import hashlib
+import math
 import pprint
-import random
 import sys
 
+import numpy as np
+import pandas as pd
 import yaml
 
+from .read_region_bundle import (
+    HEADER,
+    BuildingTable,
+    load_region_bundle,
+    region_bundle_dir,
+    write_region_bundle,
+)
+
 # File to read in CSV files of building definitions.
 # The format is as follows:
 # No,building,Longitude,Latitude,Occupancy
@@ -12,6 +22,8 @@ import yaml
 
 pp = pprint.PrettyPrinter()
 
+NEAREST_CACHE_VERSION = 1
+
 
 def apply_building_mapping(mapdict, label):
     """
@@ -25,6 +37,97 @@ def apply_building_mapping(mapdict, label):
     return "house"
 
 
+def building_label_categories(mapdict):
+    """
+    Returns a dict from every label in a building map YAML to its category,
+    giving the same category as apply_building_mapping for listed labels.
+    """
+    categories = {}
+    for category in mapdict:
+        for label in mapdict[category]["labels"]:
+            categories.setdefault(label, category)
+    return categories
+
+
+def read_building_table(csvfile, building_mapping):
+    """
+    Reads a building CSV file into a BuildingTable, binning every label
+    into its category with the given building map.
+    """
+    print("Reading in buildings...", file=sys.stderr)
+    buildings = pd.read_csv(
+        csvfile,
+        header=None,
+        skiprows=1,
+        usecols=range(4),
+        names=["building", "x", "y", "sqm"],
+        dtype={"building": str},
+        float_precision="round_trip",  # parse coordinates exactly as float().
+    )
+    buildings = buildings[~buildings["building"].str.startswith("#")]
+    x = buildings["x"].to_numpy(dtype="f8")
+    y = buildings["y"].to_numpy(dtype="f8")
+    print(f"Total {len(buildings)} buildings read", file=sys.stderr)
+
+    # map every distinct label to its category once.
+    label_categories = building_label_categories(building_mapping)
+    labels, label = np.unique(buildings["building"].to_numpy(), return_inverse=True)
+    labels = labels.tolist()
+    categories = [label_categories.get(l, "house") for l in labels]
+
+    return BuildingTable(
+        labels=labels,
+        categories=categories,
+        label=label.astype("int32"),
+        x=x,
+        y=y,
+        sqm=buildings["sqm"].to_numpy(dtype="int64"),
+        house=(np.array(categories + ["house"]) == "house")[label],
+        xbound=[float(x.min(initial=99999.0)), float(x.max(initial=-99999.0))],
+        ybound=[float(y.min(initial=99999.0)), float(y.max(initial=-99999.0))],
+    )
+
+
+def preprocess_building_csv(csvfile, building_type_map, bundle_dir=None):
+    """
+    Converts a building CSV file into a region bundle, by default next to the
+    CSV file, which later runs load instead of parsing the CSV.
+    """
+    with open(building_type_map) as f:
+        building_mapping = yaml.safe_load(f)
+
+    table = read_building_table(csvfile, building_mapping)
+    if bundle_dir is None:
+        bundle_dir = region_bundle_dir(csvfile)
+    write_region_bundle(
+        table,
+        bundle_dir,
+        {"buildings": csvfile, "building_types_map": building_type_map},
+    )
+    return bundle_dir
+
+
+def nearest_cache_file(e, csvfile, building_type_map, cache_dir, **params):
+    """
+    Returns the file name of the nearest locations cache for this rank, given
+    the input files and the parameters that shape the houses and locations.
+    The name contains a hash of all inputs, so any change gives a new file.
+    Returns None for unseeded runs, whose random offices are not reproducible.
+    """
+    if e.seed is None or cache_dir is None:
+        return None
+
+    digest = hashlib.sha256()
+    for fname in (csvfile, building_type_map):
+        with open(fname, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    key = [NEAREST_CACHE_VERSION, e.seed, e.rank, e.size, sorted(params.items())]
+    digest.update(repr(key).encode())
+
+    return f"{cache_dir}/nearest_{digest.hexdigest()[:20]}_{e.rank}.npz"
+
+
 def read_building_csv(
     e,
     csvfile,
@@ -37,6 +140,8 @@ def read_building_csv(
     work_participation_rate=0.5,
     dumptypesandquit=False,
     dumpnearest=False,
+    cache_dir="",
+    use_bundle=True,
 ):
     """
     house_ratio = number of households per house.
@@ -44,6 +149,10 @@ def read_building_csv(
     office_size = average office size per building.
     household_size = average size of household.
     work_participation_rate = fraction of population that works.
+    cache_dir = directory of the nearest locations cache, by default
+    <data_dir>/cache. None disables the cache.
+    use_bundle = load the buildings from the region bundle written by
+    preprocess.py, if there is an up-to-date one.
     """
     
     # Set building_type_map dynamically if not provided
@@ -56,76 +165,73 @@ def read_building_csv(
     with open(building_type_map) as f:
         building_mapping = yaml.safe_load(f)
 
-    house_csv_count = 0
-
     if csvfile == "":
         print("Error: could not find csv file.")
         sys.exit()
-    with open(csvfile) as csvfile:
-        building_reader = csv.reader(csvfile)
-        next(building_reader)
-        row_number = 0
-        num_locs = 0
-        num_houses = 0
-        office_sqm = 0
-        building_types = {}
-        xbound = [99999.0, -99999.0]
-        ybound = [99999.0, -99999.0]
-
-        print("Reading in buildings...", file=sys.stderr)
-        for row in building_reader:
-            if row[0][0] == "#":
-                continue
-
-            x = float(row[1])
-            y = float(row[2])
-            xbound[0] = min(x, xbound[0])
-            ybound[0] = min(y, ybound[0])
-            xbound[1] = max(x, xbound[1])
-            ybound[1] = max(y, ybound[1])
-
-            location_type = apply_building_mapping(building_mapping, row[0])
-            sqm = int(row[3])
-
-            # count all the building types in a dict.
-            if row[0] not in building_types:
-                building_types[row[0]] = 1
-            else:
-                building_types[row[0]] += 1
-
-            if location_type == "house":
-                if house_csv_count % house_ratio == 0:
-                    if num_houses % e.size == e.rank:
-                        e.addHouse(num_houses, x, y, house_ratio)
-
-                    num_houses += 1
-                house_csv_count += 1
-            else:
-                # e.addLocation(num_locs, location_type, x, y, building_mapping[location_type]['default_sqm'])
-                if location_type == "office":
-                    pass
-                    # num_locs += 1
-                    # office_sqm += sqm
-                    # e.addLocation(num_locs, location_type, x, y, sqm*10) # multiply office sqm by 10 to compensate for lack of parsing.
-                    # Space should be about 1 million m2 per borough, https://www.savoystewart.co.uk/blog/office-floor-space-in-london-growing-despite-premium-cost
-                else:
-                    num_locs += 1
-                    e.addLocation(num_locs, location_type, x, y, sqm)
-            row_number += 1
-            if row_number % 10000 == 0:
-                print(f"{row_number} buildings read", file=sys.stderr, end="\r")
-        print(f"Total {row_number} buildings read", file=sys.stderr)
-        print("Coordinate bounds:", xbound, ybound, file=sys.stderr)
-        office_sqm = (
-            workspace * house_csv_count * work_participation_rate
-        )  # 10 sqm per worker, 2.6 person per household, 50% in workforce
-        office_sqm_red = office_sqm
-            
-        with open(f"{data_dir}/offices.csv", "w") as f: 
-            while office_sqm_red > 0:
-                num_locs += 1
-                e.addRandomOffice(f, num_locs, xbound, ybound, office_size)
-                office_sqm_red -= office_size  # Reduce available office space
+
+    table = None
+    bundle_dir = region_bundle_dir(csvfile)
+    if use_bundle:
+        table = load_region_bundle(
+            bundle_dir, {"buildings": csvfile, "building_types_map": building_type_map}
+        )
+    if table is not None:
+        print(f"Buildings loaded from {bundle_dir}.", file=sys.stderr)
+        source = f"{bundle_dir}/{HEADER}"
+    else:
+        table = read_building_table(csvfile, building_mapping)
+        source = csvfile
+    print("Coordinate bounds:", table.xbound, table.ybound, file=sys.stderr)
+
+    if cache_dir == "":
+        cache_dir = f"{data_dir}/cache"
+    cache_file = nearest_cache_file(
+        e,
+        source,
+        building_type_map,
+        cache_dir,
+        house_ratio=house_ratio,
+        workspace=workspace,
+        office_size=office_size,
+        work_participation_rate=work_participation_rate,
+    )
+
+    x, y, sqm = table.x, table.y, table.sqm
+    location_types = table.location_types
+
+    # every house_ratio-th house is placed, and houses are dealt out to ranks.
+    is_house = np.asarray(table.house)
+    house_csv_count = int(is_house.sum())
+    placed = np.flatnonzero(is_house)[::house_ratio]
+    num_houses = len(placed)
+    mine = np.arange(e.rank, num_houses, e.size)
+    e.add_houses(mine, x[placed[mine]], y[placed[mine]], house_ratio)
+
+    # locations are numbered in file order, offices are generated below.
+    is_location = ~is_house & (location_types != "office")
+    rows = np.flatnonzero(is_location)
+    names = np.arange(1, len(rows) + 1)
+    num_locs = len(rows)
+    for location_type in dict.fromkeys(location_types[rows].tolist()):
+        sel = location_types[rows] == location_type
+        e.add_locations(
+            location_type, names[sel], x[rows[sel]], y[rows[sel]], sqm[rows[sel]]
+        )
+
+    office_sqm = (
+        workspace * house_csv_count * work_participation_rate
+    )  # 10 sqm per worker, 2.6 person per household, 50% in workforce
+
+    # enough offices of office_size to hold the office space.
+    num_offices = max(0, math.ceil(office_sqm / office_size))
+    e.add_random_offices(
+        np.arange(num_locs + 1, num_locs + num_offices + 1),
+        table.xbound,
+        table.ybound,
+        office_size,
+        office_log=f"{data_dir}/offices.csv",
+    )
+    num_locs += num_offices
 
     if e.rank == 0:
         print("Read in {} houses and {} other locations.".format(num_houses, num_locs))
@@ -135,8 +241,8 @@ def read_building_csv(
 
     if e.rank == 0:
         print("Building types:")
-        pp.pprint(building_types)
+        pp.pprint(table.label_counts)
 
-    e.update_nearest_locations(dumpnearest)
+    e.update_nearest_locations(dumpnearest, cache_file=cache_file)
     if dumptypesandquit:
         sys.exit()
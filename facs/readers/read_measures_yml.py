@@ -1,20 +1,43 @@
 import os
 import sys
-import yaml
 import warnings
+from datetime import datetime
+
+import yaml
 
 __measure_mask_uptake = 0.0
 __measure_mask_uptake_shopping = 0.0
 __measure_social_distance = 0.0
 __measure_work_from_home = 0.0
 
-def read_measures_yml(e, data_dir="covid_data", ymlfile=None):
+def measure_state():
+    """
+    Return the measure levels carried over between dates, for
+    restore_measure_state.
+    """
+    return {
+        "mask_uptake": __measure_mask_uptake,
+        "mask_uptake_shopping": __measure_mask_uptake_shopping,
+        "social_distance": __measure_social_distance,
+        "work_from_home": __measure_work_from_home,
+    }
+
+
+def restore_measure_state(state):
+    """Restore measure levels returned by measure_state."""
     global __measure_mask_uptake, __measure_mask_uptake_shopping, __measure_social_distance, __measure_work_from_home
-    
-    # Construct the correct path dynamically if `ymlfile` is not provided
-    if ymlfile is None:
-        ymlfile = f"{data_dir}/measures.yml"
 
+    __measure_mask_uptake = state["mask_uptake"]
+    __measure_mask_uptake_shopping = state["mask_uptake_shopping"]
+    __measure_social_distance = state["social_distance"]
+    __measure_work_from_home = state["work_from_home"]
+
+
+def compile_measures_yml(ymlfile):
+    """
+    Parse a measures YAML file once. Returns the keyworker fraction given in
+    the file and the measures of every date, keyed by datetime.date.
+    """
     if not os.path.exists(ymlfile):
         print("ERROR: measures YML file not found. Exiting.")
         sys.exit()
@@ -23,79 +46,189 @@ def read_measures_yml(e, data_dir="covid_data", ymlfile=None):
     with open(ymlfile, encoding="utf-8") as f:
         m = yaml.safe_load(f)
 
-    if m["keyworker_fraction"]:
-        e.keyworker_fraction = float(m["keyworker_fraction"])
-
     date_format = m["date_format"]
 
     # entry for backwards compatibility
     if date_format == "%d/%m/%Y":
         date_format = "%-d/%-m/%Y"
 
-    date = e.get_date_string(date_format)
-
-    if date in m:
-        e.remove_all_measures()
-
-        dm = m[date]
-
-        if "case_isolation" in dm:
-            if dm["case_isolation"] == True:
-                e.add_case_isolation()
-            if dm["case_isolation"] == False:
-                e.reset_case_isolation()
-        if "household_isolation" in dm:
-            if dm["household_isolation"] == True:
-                e.add_household_isolation()
-            if dm["household_isolation"] == False:
-                e.reset_household_isolation()
+    return m["keyworker_fraction"], dated_entries(m, date_format)
+
+
+def dated_entries(m, date_format):
+    """
+    Return the entries of a YAML dict whose keys are dates written in
+    date_format (e.g. "%-d/%-m/%Y"), keyed by datetime.date. Keys that would
+    not be written exactly like that are left out, as they never matched the
+    simulation date.
+    """
+    parse_format = date_format.replace("%-", "%")
+    entries = {}
+    for key, value in m.items():
+        if not isinstance(key, str):
+            continue
+        try:
+            day = datetime.strptime(key, parse_format).date()
+        except ValueError:
+            continue
+        if day.strftime(date_format) == key:
+            entries[day] = value
+    return entries
 
-        if "external_multiplier" in dm:
-            e.external_travel_multiplier = float(dm["external_multiplier"])
 
-        if "partial_closure" in dm:
-            for pc_key in dm["partial_closure"]:
-                e.add_partial_closure(pc_key, dm["partial_closure"][pc_key])
-
-        if "closure" in dm:
-            for loc_name in dm["closure"]:
-                e.add_closure(
-                    loc_name, 0
-                )  # add closure starting immediately (indicated by the 0)
-
-        if "work_from_home" in dm:
-            __measure_work_from_home = float(dm["work_from_home"])
-
-        e.add_work_from_home(__measure_work_from_home)
-
-        # Social distance variable parsing.
-        do_sd = False  # bool to indicate whether social distancing needs to be recalculated.
-
-        if "mask_uptake" in dm:
-            __measure_mask_uptake = float(dm["mask_uptake"])
-            do_sd = True
-
-        if "mask_uptake_shopping" in dm:
-            __measure_mask_uptake_shopping = float(dm["mask_uptake_shopping"])
-            do_sd = True
-
-        if "social_distance" in dm:
-            __measure_social_distance = float(dm["social_distance"])
-            do_sd = True
+def read_measures_yml(e, data_dir="covid_data", ymlfile=None):
+    # Construct the correct path dynamically if `ymlfile` is not provided
+    if ymlfile is None:
+        ymlfile = f"{data_dir}/measures.yml"
 
-        e.add_social_distance(
-            2.0,
-            compliance=__measure_social_distance,
-            mask_uptake=__measure_mask_uptake,
-            mask_uptake_shopping=__measure_mask_uptake_shopping,
+    keyworker_fraction, measures = compile_measures_yml(ymlfile)
+    enact_measures(e, keyworker_fraction, measures.get(e.date.date()))
+
+
+# levels that can be ramped linearly over days, see scheduler.expand_ramps.
+RAMPED_MEASURES = (
+    "work_from_home",
+    "social_distance",
+    "mask_uptake",
+    "mask_uptake_shopping",
+    "traffic_multiplier",
+    "external_multiplier",
+)
+SOCIAL_DISTANCE_LEVELS = ("social_distance", "mask_uptake", "mask_uptake_shopping")
+
+
+def measure_events(dm):
+    """
+    Return the events of the measures of one date, dm, as (kind, value)
+    pairs in the order they are applied by MEASURE_HANDLERS. All measures in
+    force are removed first; the work from home and social distance levels
+    of earlier dates carry over unless dm sets them.
+    """
+    events = [("reset", None)]
+    for kind in ("case_isolation", "household_isolation", "external_multiplier"):
+        if kind in dm:
+            events.append((kind, dm[kind]))
+    for kind in ("partial_closure", "closure"):
+        if kind in dm:
+            events.append((kind, dm[kind]))
+    events.append(("work_from_home", dm.get("work_from_home")))
+    events.append(
+        (
+            "social_distance",
+            {name: dm[name] for name in SOCIAL_DISTANCE_LEVELS if name in dm},
         )
+    )
+    for kind in ("traffic_multiplier", "hospital_protection_factor", "track_trace_efficiency"):
+        if kind in dm:
+            events.append((kind, dm[kind]))
+    return events
 
-        if "traffic_multiplier" in dm:
-            e.traffic_multiplier = float(dm["traffic_multiplier"])
-
-        if "hospital_protection_factor" in dm:
-            e.hospital_protection_factor = 1.0 - float(dm["hospital_protection_factor"])
-
-        if "track_trace_efficiency" in dm:
-            e.track_trace__multiplier = 1.0 - float(dm["track_trace_efficiency"])
 
+def ramp_events(levels):
+    """
+    Return the events that move the levels of RAMPED_MEASURES to the values
+    in levels, leaving the other measures in force.
+    """
+    events = []
+    social_distance = {
+        name: levels[name] for name in SOCIAL_DISTANCE_LEVELS if name in levels
+    }
+    if social_distance:
+        events.append(("remove_social_distance", None))
+        events.append(("social_distance", social_distance))
+    for kind in ("work_from_home", "traffic_multiplier", "external_multiplier"):
+        if kind in levels:
+            events.append((kind, levels[kind]))
+    return events
+
+
+def enact_measures(e, keyworker_fraction, dm):
+    """
+    Apply the measures of one date, dm, as compiled by compile_measures_yml,
+    or only the keyworker fraction if dm is None.
+    """
+    if keyworker_fraction:
+        e.keyworker_fraction = float(keyworker_fraction)
+
+    if dm is not None:
+        for kind, value in measure_events(dm):
+            MEASURE_HANDLERS[kind](e, value)
+
+
+def _case_isolation(e, value):
+    if value == True:
+        e.add_case_isolation()
+    if value == False:
+        e.reset_case_isolation()
+
+
+def _household_isolation(e, value):
+    if value == True:
+        e.add_household_isolation()
+    if value == False:
+        e.reset_household_isolation()
+
+
+def _partial_closure(e, fractions):
+    for pc_key in fractions:
+        e.add_partial_closure(pc_key, fractions[pc_key])
+
+
+def _closure(e, loc_names):
+    for loc_name in loc_names:
+        e.add_closure(loc_name, 0)  # add closure starting immediately (indicated by the 0)
+
+
+def _work_from_home(e, value):
+    global __measure_work_from_home
+
+    if value is not None:
+        __measure_work_from_home = float(value)
+
+    e.add_work_from_home(__measure_work_from_home)
+
+
+def _social_distance(e, levels):
+    global __measure_mask_uptake, __measure_mask_uptake_shopping, __measure_social_distance
+
+    if "mask_uptake" in levels:
+        __measure_mask_uptake = float(levels["mask_uptake"])
+    if "mask_uptake_shopping" in levels:
+        __measure_mask_uptake_shopping = float(levels["mask_uptake_shopping"])
+    if "social_distance" in levels:
+        __measure_social_distance = float(levels["social_distance"])
+
+    e.add_social_distance(
+        2.0,
+        compliance=__measure_social_distance,
+        mask_uptake=__measure_mask_uptake,
+        mask_uptake_shopping=__measure_mask_uptake_shopping,
+    )
+
+
+def _set_attribute(name, convert=float):
+    def handler(e, value):
+        setattr(e, name, convert(value))
+
+    return handler
+
+
+# functions applying every kind of measures event to an ecosystem.
+MEASURE_HANDLERS = {
+    "reset": lambda e, _: e.remove_all_measures(),
+    "remove_social_distance": lambda e, _: e.initialise_social_distance(),
+    "case_isolation": _case_isolation,
+    "household_isolation": _household_isolation,
+    "external_multiplier": _set_attribute("external_travel_multiplier"),
+    "partial_closure": _partial_closure,
+    "closure": _closure,
+    "work_from_home": _work_from_home,
+    "social_distance": _social_distance,
+    "traffic_multiplier": _set_attribute("traffic_multiplier"),
+    "hospital_protection_factor": _set_attribute(
+        "hospital_protection_factor", lambda value: 1.0 - float(value)
+    ),
+    "track_trace_efficiency": _set_attribute(
+        "track_trace__multiplier", lambda value: 1.0 - float(value)
+    ),
+}
@@ -0,0 +1,152 @@
+"""
+Module to write and load preprocessed region bundles.
+
+A region bundle is a directory holding the buildings of a region as binary
+columns (one .npy file per column) next to a JSON header. It is written once by
+preprocess.py, after which runs map the columns into memory instead of parsing
+the building CSV, so that all ranks on a node share the same pages.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+BUNDLE_VERSION = 1
+HEADER = "region.json"
+
+# on-disk type of every column.
+COLUMNS = {
+    "label": "int32",
+    "x": "float32",
+    "y": "float32",
+    "sqm": "int32",
+    "house": "bool",
+}
+
+
+@dataclass
+class BuildingTable:
+    """
+    Buildings of a region in file order, as columns.
+
+    label holds the index of every building's label in labels, and categories
+    the location type of every label ("house" for houses).
+    """
+
+    labels: list[str]
+    categories: list[str]
+    label: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    sqm: np.ndarray
+    house: np.ndarray
+    xbound: list[float]
+    ybound: list[float]
+
+    def __len__(self) -> int:
+        return len(self.label)
+
+    @property
+    def location_types(self) -> np.ndarray:
+        """Location type of every building."""
+        return np.array(self.categories + ["house"])[self.label]
+
+    @property
+    def label_counts(self) -> dict[str, int]:
+        """Number of buildings with every label."""
+        counts = np.bincount(self.label, minlength=len(self.labels))
+        return dict(zip(self.labels, counts.tolist()))
+
+
+def region_bundle_dir(csvfile):
+    """
+    Returns the directory of the region bundle of a building CSV file, e.g.
+    covid_data/brent_buildings.bundle for covid_data/brent_buildings.csv.
+    """
+    return f"{os.path.splitext(csvfile)[0]}.bundle"
+
+
+def _source_stamp(fname, digest=False):
+    stat = os.stat(fname)
+    stamp = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if digest:
+        sha = hashlib.sha256()
+        with open(fname, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+        stamp["sha256"] = sha.hexdigest()
+    return stamp
+
+
+def write_region_bundle(table, bundle_dir, sources):
+    """
+    Writes a BuildingTable to bundle_dir. sources maps a name to every input
+    file the table was made from, so that load_region_bundle can tell when
+    the bundle is out of date.
+    """
+    os.makedirs(bundle_dir, exist_ok=True)
+
+    # the header is written last, so an interrupted write leaves no bundle.
+    header_file = f"{bundle_dir}/{HEADER}"
+    if os.path.exists(header_file):
+        os.remove(header_file)
+
+    for column, dtype in COLUMNS.items():
+        np.save(f"{bundle_dir}/{column}.npy", getattr(table, column).astype(dtype))
+
+    header = {
+        "version": BUNDLE_VERSION,
+        "rows": len(table),
+        "labels": table.labels,
+        "categories": table.categories,
+        "xbound": table.xbound,
+        "ybound": table.ybound,
+        "sources": {
+            name: _source_stamp(fname, digest=True) for name, fname in sources.items()
+        },
+    }
+    with open(header_file, "w") as f:
+        json.dump(header, f, indent=1)
+
+
+def load_region_bundle(bundle_dir, sources):
+    """
+    Loads the BuildingTable in bundle_dir, with its columns memory-mapped.
+    Returns None if there is no bundle, or if it was written by another
+    version or from sources that have changed since. Sources that no longer
+    exist are not checked.
+    """
+    header_file = f"{bundle_dir}/{HEADER}"
+    if not os.path.exists(header_file):
+        return None
+
+    with open(header_file) as f:
+        header = json.load(f)
+    if header["version"] != BUNDLE_VERSION:
+        return None
+
+    for name, fname in sources.items():
+        stamp = header["sources"].get(name)
+        if os.path.exists(fname) and (
+            stamp is None
+            or {k: stamp[k] for k in ("size", "mtime_ns")} != _source_stamp(fname)
+        ):
+            return None
+
+    columns = {
+        column: np.load(f"{bundle_dir}/{column}.npy", mmap_mode="r")
+        for column in COLUMNS
+    }
+    if any(len(values) != header["rows"] for values in columns.values()):
+        return None
+
+    return BuildingTable(
+        labels=header["labels"],
+        categories=header["categories"],
+        xbound=header["xbound"],
+        ybound=header["ybound"],
+        **columns,
+    )
@@ -1,87 +1,168 @@
 import sys
 import warnings
 from datetime import datetime, timedelta
+
 import yaml
 
+from facs.readers.read_measures_yml import dated_entries
+
 __mutation_daily_change = 0.0
 __mutation_days_remaining = -1
 
-def read_vaccinations_yml(e, base_date, data_dir, ymlfile, diseasefile):
+def mutation_state():
+    """
+    Return the state of the mutation in progress, for restore_mutation_state.
+    """
+    return {
+        "daily_change": __mutation_daily_change,
+        "days_remaining": __mutation_days_remaining,
+    }
+
+
+def restore_mutation_state(state):
+    """Restore the state of a mutation returned by mutation_state."""
     global __mutation_daily_change, __mutation_days_remaining
+
+    __mutation_daily_change = state["daily_change"]
+    __mutation_days_remaining = state["days_remaining"]
+
+
+def compile_vaccinations_yml(data_dir, ymlfile, diseasefile):
+    """
+    Parse the vaccinations, disease and mutations YAML files once. Returns a
+    dict with the vaccine effect time, the immunity duration, the vaccination
+    changes keyed by the datetime.date on which they take effect, the
+    mutations keyed by the date they start and the infection rates of the
+    mutations of the disease.
+    """
     with open(ymlfile, "r", encoding="utf-8") as f:
         v = yaml.safe_load(f)
 
     with open(diseasefile, "r", encoding="utf-8") as g:
         w = yaml.safe_load(g)
 
-        if "vaccine_effect_time" in v:
-            e.vaccine_effect_time = v["vaccine_effect_time"]
-        else:
-            e.vaccine_effect_time = 14
-            warnings.warn(
-                f"vaccine_effect_time not found in {ymlfile}, using default value of 14 days."
-            )
-
-        if "immunity_duration" not in w:
-            raise KeyError(
-                f"immunity_duration not found in {diseasefile}, please add it."
-            )
-
-        e.vac_duration = w["immunity_duration"]
-
-        if e.vac_duration < 0:
-            raise ValueError("immunity_duration cannot be negative")
-
-        tmpdate = datetime.strptime(base_date, "%d/%m/%Y")
-        tmpdate = tmpdate - timedelta(days=e.vaccine_effect_time)
-        date = tmpdate.strftime("%-d/%-m/%Y")
-
-        # print(date,v)
-
-        if date in v:
-            dv = v[date]
-            if "vaccines_per_day" in dv:
-                e.vaccinations_available = int(dv["vaccines_per_day"]) / e.mpi.size
-            if "vaccine_age_limit" in dv:
-                e.vaccinations_age_limit = int(dv["vaccine_age_limit"])
-            if "no_symptoms" in dv:
-                e.vac_no_symptoms = float(dv["no_symptoms"])
-            if "no_transmission" in dv:
-                e.vac_no_transmission = float(dv["no_transmission"])
-
-            # dvb = v[date]["booster"]
-            # fields:
-            # boosters_per_day: 10 # this number is SUBTRACTED from vaccines_per_day.
-            # booster_age_limit: 70
-            # no_symptoms: 0.75
-            # no_transmission: 0.6
-            # TO BE IMPLEMENTED
-
-    verbose = False
+    if "vaccine_effect_time" in v:
+        vaccine_effect_time = v["vaccine_effect_time"]
+    else:
+        vaccine_effect_time = 14
+        warnings.warn(
+            f"vaccine_effect_time not found in {ymlfile}, using default value of 14 days."
+        )
+
+    if "immunity_duration" not in w:
+        raise KeyError(f"immunity_duration not found in {diseasefile}, please add it.")
+
+    if w["immunity_duration"] < 0:
+        raise ValueError("immunity_duration cannot be negative")
+
+    # vaccinations take effect vaccine_effect_time days after their date.
+    delay = timedelta(days=vaccine_effect_time)
+    vaccinations = {
+        day + delay: dv for day, dv in dated_entries(v, "%-d/%-m/%Y").items()
+    }
+
+    for day, dv in vaccinations.items():
+        check_vaccine_probabilities(dv, f"{ymlfile} ({day - delay})")
+
+    mutations = {}
     try:
-        with open(f"{data_dir}/mutations.yml") as f:
-            v = yaml.safe_load(f)
-
-        with open(diseasefile) as g:
-            w = yaml.safe_load(g)
-
-            if base_date in v:
-                dv = v[base_date]
-                new_inf_rate = w["mutations"][dv["type"]]["infection_rate"]
-                e.disease.mutations[dv["type"]]["infection_rate"] = new_inf_rate
-                __mutation_daily_change = (
-                    new_inf_rate - e.disease.infection_rate
-                ) / int(dv["transition_period"])
-                __mutation_days_remaining = int(dv["transition_period"])
-
-                # print("Mutation started to {}, inf. rate {}, transition period {}, daily change {}".format(dv["type"], new_inf_rate, dv["transition_period"], __mutation_daily_change))
+        with open(f"{data_dir}/mutations.yml", encoding="utf-8") as f:
+            mutations = dated_entries(yaml.safe_load(f), "%-d/%-m/%Y")
     except FileNotFoundError:
-        if verbose:
-            print(
-                f"WARNING: {data_dir}/mutations.yml OR {diseasefile} not found"
-            )
+        pass
+
+    return {
+        "vaccine_effect_time": vaccine_effect_time,
+        "vac_duration": w["immunity_duration"],
+        "vaccinations": vaccinations,
+        "mutations": mutations,
+        "mutation_rates": w.get("mutations", {}),
+    }
+
+
+def check_vaccine_probabilities(dv, where):
+    """
+    Raise a ValueError if the vaccine effects of an entry, or the ends of
+    their ramps, are not probabilities.
+    """
+    for name in ("no_symptoms", "no_transmission"):
+        value = dv.get(name) if dv else None
+        values = [value]
+        if isinstance(value, dict):  # a ramp, see scheduler.expand_ramps.
+            values = [value.get("from"), value.get("to")]
+        for v in values:
+            if v is not None and not 0.0 <= float(v) <= 1.0:
+                raise ValueError(f"{name} in {where} must be between 0 and 1, got {v}")
+
+
+def read_vaccinations_yml(e, base_date, data_dir, ymlfile, diseasefile):
+    timeline = compile_vaccinations_yml(data_dir, ymlfile, diseasefile)
+    enact_vaccinations(e, datetime.strptime(base_date, "%d/%m/%Y").date(), timeline)
+
+
+# levels that can be ramped linearly over days, see scheduler.expand_ramps.
+RAMPED_VACCINATIONS = ("vaccines_per_day", "no_symptoms", "no_transmission")
+
+
+def enact_vaccinations(e, day, timeline):
+    """
+    Apply the vaccination changes and mutations of one datetime.date, from a
+    timeline compiled by compile_vaccinations_yml, and advance a mutation in
+    progress by a day.
+    """
+    e.vaccine_effect_time = timeline["vaccine_effect_time"]
+    e.vac_duration = timeline["vac_duration"]
+
+    if day in timeline["vaccinations"]:
+        change_vaccinations(e, timeline["vaccinations"][day])
+
+    if day in timeline["mutations"]:
+        start_mutation(e, timeline["mutations"][day], timeline["mutation_rates"])
+
+    advance_mutation(e)
+
+
+def change_vaccinations(e, dv):
+    """Apply the vaccination changes of one date."""
+    if "vaccines_per_day" in dv:
+        e.vaccinations_available = int(dv["vaccines_per_day"]) / e.mpi.size
+    if "vaccine_age_limit" in dv:
+        e.vaccinations_age_limit = int(dv["vaccine_age_limit"])
+    if "no_symptoms" in dv:
+        e.vac_no_symptoms = float(dv["no_symptoms"])
+    if "no_transmission" in dv:
+        e.vac_no_transmission = float(dv["no_transmission"])
+
+    # dvb = v[date]["booster"]
+    # fields:
+    # boosters_per_day: 10 # this number is SUBTRACTED from vaccines_per_day.
+    # booster_age_limit: 70
+    # no_symptoms: 0.75
+    # no_transmission: 0.6
+    # TO BE IMPLEMENTED
+
+
+def start_mutation(e, dv, mutation_rates):
+    """
+    Start the transition of the infection rate to that of the mutation in
+    dv, over its transition period, replacing any transition in progress.
+    """
+    global __mutation_daily_change, __mutation_days_remaining
+
+    new_inf_rate = mutation_rates[dv["type"]]["infection_rate"]
+    e.disease.mutations[dv["type"]]["infection_rate"] = new_inf_rate
+    __mutation_daily_change = (new_inf_rate - e.disease.infection_rate) / int(
+        dv["transition_period"]
+    )
+    __mutation_days_remaining = int(dv["transition_period"])
+
+    # print("Mutation started to {}, inf. rate {}, transition period {}, daily change {}".format(dv["type"], new_inf_rate, dv["transition_period"], __mutation_daily_change))
+
+
+def advance_mutation(e):
+    """Advance the infection rate by a day of the transition in progress, if any."""
+    global __mutation_days_remaining
 
     if __mutation_days_remaining > 0:
         e.disease.infection_rate += __mutation_daily_change
         __mutation_days_remaining -= 1
-
@@ -0,0 +1,53 @@
+"""Script to preprocess the buildings of a region into a region bundle"""
+
+import argparse
+
+from facs.readers import read_building_csv
+
+
+def parse_arguments():
+    """Formats command-line arguments as dictionary
+
+    Returns:
+        dict: Dictionary of all command line arguments
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Convert <location>_buildings.csv into a binary region bundle, "
+        "which runs load instead of parsing the CSV file."
+    )
+    parser.add_argument(
+        "--location", action="store", default="brent", help="Name of location to convert."
+    )
+    parser.add_argument(
+        "--data_dir",
+        action="store",
+        default="covid_data",
+        help="subdirectory containing simulation input data.",
+    )
+    parser.add_argument(
+        "--building_type_map",
+        action="store",
+        default=None,
+        help="Building type map YML, by default <data_dir>/building_types_map.yml.",
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    """The main program"""
+
+    args = parse_arguments()
+    building_type_map = args.building_type_map
+    if building_type_map is None:
+        building_type_map = f"{args.data_dir}/building_types_map.yml"
+
+    bundle_dir = read_building_csv.preprocess_building_csv(
+        f"{args.data_dir}/{args.location}_buildings.csv", building_type_map
+    )
+    print(f"Region bundle written to {bundle_dir}.")
+
+
+if __name__ == "__main__":
+    main()
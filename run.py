@@ -2,14 +2,11 @@
 
 import argparse
 import csv
-import random
 import sys
-from datetime import datetime, timedelta
 from os import makedirs, path
 
-import numpy as np
-
-from facs.base import facs, person
+from facs.base import facs, simulation
+from facs.base.config import Config
 from facs.base.measures import Measures
 from facs.readers import (
     read_age_csv,
@@ -127,8 +124,46 @@ def parse_arguments() -> dict:
         default=None,
         help="Seed for random number generator.",
     )
+    parser.add_argument(
+        "--snapshot",
+        action="store",
+        default=None,
+        help="Write a snapshot of the simulation after the warm-up to this file "
+        "(one file per MPI rank, e.g. warmup_0.pkl for warmup.pkl).",
+    )
+    parser.add_argument(
+        "--from-snapshot",
+        action="store",
+        default=None,
+        help="Start the scenario from a snapshot written with --snapshot, "
+        "skipping the building, population and warm-up phases, or resume a run "
+        "from the last checkpoint written with --checkpoint. The disease is "
+        "taken from the snapshot, with a warning if --disease_yml differs. "
+        "Entries of --measures_yml dated before the snapshot day are not "
+        "enacted, with a warning if they differ from those of the run that "
+        "wrote the snapshot.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="store",
+        default=None,
+        help="Write a snapshot of the simulation to this file every "
+        "--snapshot_interval days of the scenario, so that an interrupted run "
+        "can be resumed with --from-snapshot.",
+    )
+    parser.add_argument(
+        "--snapshot_interval",
+        action="store",
+        type=int,
+        default=0,
+        help="Interval between checkpoints [days].",
+    )
+
+    args = parser.parse_args()
+    if args.snapshot_interval > 0 and not args.checkpoint:
+        parser.error("--snapshot_interval requires --checkpoint.")
 
-    return parser.parse_args()
+    return args
 
 
 def get_house_ratio(test: bool) -> float:
@@ -174,8 +209,6 @@ def main():
     print(args)
 
     if args.seed is not None:
-        np.random.seed(args.seed)
-        random.seed(args.seed)
         print(f"Random seed set to {args.seed}")
 
     house_ratio = get_house_ratio(args.quicktest)
@@ -199,7 +232,7 @@ def main():
     workspace = args.workspace
     office_size = args.office_size
     
-    eco = facs.Ecosystem(end_time, data_dir)
+    eco = facs.Ecosystem(end_time, data_dir, seed=args.seed, config=Config(data_dir))
     
     if eco.mpi.rank == 0:
         print("Running basic simulation kernel.")
@@ -213,100 +246,67 @@ def main():
         print(f"data_dir  = {data_dir}")
     
     measures = Measures()
-    
-    person.set_data_directory(data_dir) 
-
-    eco.ages = read_age_csv.read_age_csv(f"{data_dir}/age_distribution.csv", location)
-    
-    if eco.mpi.rank == 0:
-        print("Age distribution:", eco.ages, file=sys.stderr)
+    files = (data_dir, measures_yml, vaccinations_yml, disease_yml)
 
     eco.disease = read_disease_yml.read_disease_yml(f"{data_dir}/{disease_yml}.yml")
 
-    building_file = f"{data_dir}/{location}_buildings.csv"
-    read_building_csv.read_building_csv(
-        eco,
-        building_file,
-        data_dir=data_dir,
-        house_ratio=house_ratio,
-        workspace=workspace,
-        office_size=office_size,
-        household_size=household_size,
-        work_participation_rate=0.5,
-    )
-    # house ratio: number of households per house placed (higher number adds noise, but reduces
-    # runtime
-    # And then 3 parameters that ONLY affect office placement.
-    # workspace: m2 per employee on average. (10 in an office setting, but we use 20 as some
-    # people work in much more spacious environments)
-    # household size: average size of each household, specified separately here.
-    # work participation rate: fraction of population in workforce, irrespective of age
-
-    eco.print_status(
-        outfile, silent=True
-    )  # silent print to initialise log data structures.
-
-    starting_num_infections = 500
-    if args.starting_infections:
-        if int(args.starting_infections[0]) == 0:
-            # Aggregate the num agents before using the starting infections multiplier.
-            num_agents_all = eco.mpi.CalcCommWorldTotalSingle(float(eco.num_agents))
-            print("Num agents all:", num_agents_all)
-            starting_num_infections = int(
-                (num_agents_all * float(args.starting_infections))
-            )
-        else:
-            starting_num_infections = int(args.starting_infections)
-    elif location == "test":
-        starting_num_infections = 10
-
-    if eco.mpi.rank == 0:
-        print(
-            f"THIS SIMULATIONS HAS {eco.num_agents} AGENTS. "
-            f"Starting with {starting_num_infections} infections."
-        )
-
-    eco.time = -20
-    eco.date = datetime.strptime(args.start_date, "%d/%m/%Y")
-    eco.date = eco.date - timedelta(days=20)
-    eco.print_header(outfile)
-    for i in range(0, 20):
-        # Roughly evenly spread infections over the days.
-        num = int(starting_num_infections / 20)
-        if starting_num_infections % 20 > i:
-            num += 1
-
-        eco.add_infections(num)
-
-        measures.enact_measures_and_evolutions(
-            eco, eco.time, data_dir, measures_yml, vaccinations_yml, disease_yml
-        )
+    if args.from_snapshot:
+        # buildings, population, warm-up and any days of the scenario already
+        # run are restored from the snapshot, along with the output so far.
+        eco.load_snapshot(args.from_snapshot, outfile)
+        if eco.mpi.rank == 0:
+            print(f"Loaded snapshot {args.from_snapshot} at t({eco.time}).")
+        eco.print_status(outfile, silent=True)
+    else:
+        eco.ages = read_age_csv.read_age_csv(f"{data_dir}/age_distribution.csv", location)
 
-        eco.evolve(reduce_stochasticity=False)
-        
         if eco.mpi.rank == 0:
-            print(f"t({eco.time})")
-            
-        if args.dbg:
-            eco.debug_mode = True
-            eco.print_status(outfile)
-        else:
-            eco.debug_mode = False
-            eco.print_status(outfile, silent=True)
-
-    for _ in range(0, end_time):
-        measures.enact_measures_and_evolutions(
-            eco, eco.time, data_dir, measures_yml, vaccinations_yml, disease_yml
+            print("Age distribution:", eco.ages, file=sys.stderr)
+
+        building_file = f"{data_dir}/{location}_buildings.csv"
+        read_building_csv.read_building_csv(
+            eco,
+            building_file,
+            data_dir=data_dir,
+            house_ratio=house_ratio,
+            workspace=workspace,
+            office_size=office_size,
+            household_size=household_size,
+            work_participation_rate=0.5,
+        )
+        # house ratio: number of households per house placed (higher number adds noise, but reduces
+        # runtime
+        # And then 3 parameters that ONLY affect office placement.
+        # workspace: m2 per employee on average. (10 in an office setting, but we use 20 as some
+        # people work in much more spacious environments)
+        # household size: average size of each household, specified separately here.
+        # work participation rate: fraction of population in workforce, irrespective of age
+
+        starting_infections = args.starting_infections
+        if not starting_infections and location == "test":
+            starting_infections = "10"
+        simulation.run_warmup(
+            eco,
+            measures,
+            files,
+            args.start_date,
+            starting_infections,
+            outfile,
+            dbg=args.dbg,
         )
 
-        # Propagate the model by one time step.
-        eco.evolve(reduce_stochasticity=False)
-
-        # print(time, eco.get_date_string(), eco.vac_no_symptoms, eco.vac_no_transmission)
-        eco.print_status(outfile)
+        if args.snapshot:
+            eco.save_snapshot(args.snapshot)
 
-    # calculate cumulative sums.
-    eco.add_cum_column(outfile, ["num hospitalisations today", "num infections today"])
+    simulation.run_until(
+        eco,
+        measures,
+        files,
+        end_time,
+        outfile,
+        checkpoint=args.checkpoint,
+        checkpoint_interval=args.snapshot_interval,
+    )
 
     if eco.mpi.rank == 0:
         print("Simulation complete.", file=sys.stderr)
@@ -0,0 +1,149 @@
+"""Tests for the AgentTable class."""
+
+import numpy as np
+import pytest
+
+from facs.base.agents import (
+    AgentTable,
+    STATUSES,
+    SUSCEPTIBLE,
+    INFECTIOUS,
+    IMMUNE,
+    DEAD,
+)
+from facs.base.house import House
+from facs.base.person import Person
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture
+def table():
+    """Return an empty AgentTable."""
+    return AgentTable(capacity=2)
+
+
+def test_add_agents_defaults(table):
+    """Test that new agents get default values."""
+
+    start = table.add_agents(3, house_id=4, household_id=7)
+
+    assert start == 0
+    assert len(table) == 3
+    assert np.all(table.status == SUSCEPTIBLE)
+    assert table.status_counts[SUSCEPTIBLE] == 3
+    assert np.all(table.house == 4)
+    assert np.all(table.household == 7)
+    assert np.all(table.hospital == -1)
+    assert np.all(table.groups == -1)
+    assert np.all(table.mild_version)
+
+
+def test_add_agents_grows_and_keeps_rows(table):
+    """Test that growing the table keeps existing rows."""
+
+    table.add_agents(2, 0, 0)
+    table.set_status(1, INFECTIOUS)
+    table.add_agents(5, 1, 1)
+
+    assert len(table) == 7
+    assert table.capacity >= 7
+    assert table.status[1] == INFECTIOUS
+    assert table.status[6] == SUSCEPTIBLE
+    assert table.house[6] == 1
+
+
+def test_person_view_reads_and_writes_table(table):
+    """Test that a Person view reads and writes its row."""
+
+    table.add_agents(2, 0, 0)
+    person = table.person(1)
+
+    person.status = "exposed"
+    person.age = 42
+    table.work_from_home[1] = True
+
+    assert person.status == "exposed"
+    assert table.status_counts.sum() == 2
+    assert table.age[1] == 42
+    assert person.work_from_home is True
+    assert person == Person.view(table, 1)
+
+
+
+@pytest.mark.parametrize("vac_duration", [50, 300])
+def test_person_vaccinate(table, vac_duration):
+    """Test that vaccination draws a waning period and gives immunity."""
+
+    table.add_agents(1, 0, 0)
+    person = table.person(0)
+
+    person.vaccinate(5, 1.0, 1.0, vac_duration)
+
+    assert person.status == "immune"
+    assert person.status_change_time == 5
+    assert person.phase_duration > 0
+
+def test_status_counts(table):
+    """Test that status counters follow status changes."""
+
+    table.add_agents(4, 0, 0)
+    table.set_status([0, 1], IMMUNE)
+    table.set_status(3, DEAD)
+    table.set_status([1, 2], INFECTIOUS)
+
+    assert table.status_counts[SUSCEPTIBLE] == 0
+    assert table.status_counts[IMMUNE] == 1
+    assert table.status_counts[INFECTIOUS] == 2
+    assert table.status_counts[DEAD] == 1
+    assert np.array_equal(
+        table.status_counts, np.bincount(table.status, minlength=len(STATUSES))
+    )
+
+
+def test_households_share_table():
+    """Test that households in one house store their agents in one table."""
+
+    probs = [1.0 / 91] * 91
+    house = House(0, 0)
+    house.add_households(2.6, probs, 3)
+
+    assert len(house.agent_table) == house.total_size
+    for household in house.households:
+        assert all(a.household is household for a in household.agents)
+        assert all(a.location is house for a in household.agents)
+
+
+def test_household_infectious_counts(table):
+    """Test that household counters follow status and hospitalisation changes."""
+
+    for _ in range(20):
+        table.add_household(None)
+    table.add_agents(3, 0, 0)
+    table.add_agents(2, 0, 1)
+    table.set_status([0, 1, 3], INFECTIOUS)
+    table.set_hospitalised(1, True)
+
+    assert list(table.household_infectious[:2]) == [1, 1]
+
+    table.set_status(0, IMMUNE)
+    table.set_hospitalised(1, False)
+    table.set_status(4, INFECTIOUS)
+
+    assert list(table.household_infectious[:2]) == [1, 2]
+    assert len(table.household_infectious) == 20
+
+
+def test_susceptible_index(table):
+    """Test that the susceptible index follows status changes."""
+
+    table.add_agents(6, 0, 0)
+    table.set_status([0, 5], INFECTIOUS)
+    table.set_status(2, DEAD)
+    table.add_agents(2, 0, 0)
+    table.set_status(5, SUSCEPTIBLE)
+
+    assert sorted(table.susceptible.tolist()) == [1, 3, 4, 5, 6, 7]
+    assert np.array_equal(
+        np.sort(table.susceptible), np.flatnonzero(table.status == SUSCEPTIBLE)
+    )
@@ -0,0 +1,160 @@
+"""Tests for running scenario batches on one population."""
+
+import shutil
+
+import numpy as np
+import pytest
+
+from facs.base import simulation, utils
+from facs.base.measures import Measures
+from facs.readers import read_measures_yml, read_vaccinations_yml
+from facs.readers.read_disease_yml import read_disease_yml
+from facs.batch import (
+    Batch,
+    Scenario,
+    build_ecosystem,
+    run_batch,
+    run_scenario,
+    scenario_grid,
+)
+
+DATA_FILES = [
+    "age_distribution.csv",
+    "building_types_map.yml",
+    "disease_covid19.yml",
+    "disease_measles.yml",
+    "measures_uk.yml",
+    "needs.csv",
+    "test_buildings.csv",
+    "vaccinations.yml",
+]
+
+
+def test_scenario_grid():
+    """Test that scenarios are named after the files that vary."""
+
+    scenarios = scenario_grid(["m1", "m2"], ["d"], ["v1", "v2"])
+
+    assert [s.name for s in scenarios] == ["m1-v1", "m1-v2", "m2-v1", "m2-v2"]
+    assert scenarios[1] == Scenario("m1", "d", "v2", name="m1-v2")
+    assert scenario_grid(["m"], ["d"], ["v"])[0].name == "m"
+
+
+def copy_data(tmp_path):
+    """
+    Return a copy of the test data, as the office log and nearest locations
+    cache are written to the data directory.
+    """
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for name in DATA_FILES:
+        shutil.copy(f"covid_data/{name}", data_dir)
+    return str(data_dir)
+
+
+def test_run_batch(tmp_path):
+    """Test that every scenario starts from the same, unchanged population."""
+
+    data_dir = copy_data(tmp_path)
+    eco = build_ecosystem("test", 3, data_dir=data_dir, seed=1)
+    assert eco.mode == "serial"  # forked workers make no MPI calls.
+    status = eco.agents.status.copy()
+    batch = Batch(eco, "test", data_dir, str(tmp_path), 3, starting_infections="50")
+
+    with pytest.raises(ValueError):
+        run_batch(batch, [Scenario(), Scenario()])
+
+    outfiles = run_batch(
+        batch,
+        [
+            Scenario(name="a"),
+            Scenario(name="b"),
+            Scenario(disease_yml="disease_measles", name="c"),
+        ],
+        processes=2,
+    )
+
+    assert outfiles["a"] == f"{tmp_path}/a/test-measures_uk.csv"
+    outputs = {name: open(f, encoding="utf-8").read() for name, f in outfiles.items()}
+    assert outputs["a"] == outputs["b"]
+    assert outputs["a"] != outputs["c"]
+    assert (tmp_path / "a" / "out_infections_0.csv").exists()
+
+    # the workers ran on copies of the ecosystem.
+    assert eco.time == 0
+    assert np.array_equal(eco.agents.status, status)
+    assert utils.LOG_PREFIX == "."
+
+
+def test_run_batch_in_process(tmp_path):
+    """Test that ecosystems using MPI run the scenarios in turn, with the same output."""
+
+    data_dir = copy_data(tmp_path)
+    scenarios = [Scenario(name="a"), Scenario(disease_yml="disease_measles", name="c")]
+    outputs = {}
+    for mode in ["serial", "parallel"]:
+        eco = build_ecosystem("test", 3, data_dir=data_dir, seed=1, mode=mode)
+        batch = Batch(
+            eco, "test", data_dir, f"{tmp_path}/{mode}", 3, starting_infections="50"
+        )
+        outfiles = run_batch(batch, scenarios, processes=2)
+        outputs[mode] = [open(f, encoding="utf-8").read() for f in outfiles.values()]
+
+    assert outputs["parallel"] == outputs["serial"]
+    assert (tmp_path / "parallel" / "c" / "out_infections_0.csv").exists()
+    assert utils.LOG_PREFIX == "."
+
+
+def test_batch_matches_run(tmp_path, monkeypatch):
+    """Test that a batch scenario writes what a run through the simulation loop does."""
+
+    data_dir = copy_data(tmp_path)
+    eco = build_ecosystem("test", 3, data_dir=data_dir, seed=1)
+    batch = Batch(
+        eco, "test", data_dir, f"{tmp_path}/batch", 3, starting_infections="50"
+    )
+    outfile = run_batch(batch, [Scenario(name="a")])["a"]
+
+    # the same run, as run.py makes it.
+    monkeypatch.setattr("facs.base.utils.LOG_PREFIX", str(tmp_path))
+    measures_state = read_measures_yml.measure_state()
+    mutation_state = read_vaccinations_yml.mutation_state()
+    eco = build_ecosystem("test", 3, data_dir=data_dir, seed=1)
+    eco.disease = read_disease_yml(f"{data_dir}/disease_covid19.yml")
+    files = (data_dir, "measures_uk", "vaccinations", "disease_covid19")
+    run_outfile = f"{tmp_path}/test-measures_uk.csv"
+    measures = Measures()
+    simulation.run_warmup(eco, measures, files, "1/3/2020", "50", run_outfile)
+    simulation.run_until(eco, measures, files, 3, run_outfile)
+    read_measures_yml.restore_measure_state(measures_state)
+    read_vaccinations_yml.restore_mutation_state(mutation_state)
+
+    for batch_file, run_file in [
+        (outfile, run_outfile),
+        (
+            f"{tmp_path}/batch/a/out_infections_0.csv",
+            f"{tmp_path}/out_infections_0.csv",
+        ),
+    ]:
+        with open(batch_file, encoding="utf-8") as f, open(
+            run_file, encoding="utf-8"
+        ) as g:
+            assert f.read() == g.read()
+
+
+def test_run_scenario_restores_log_prefix(tmp_path):
+    """Test that running a scenario in this process leaves the log prefix as it was."""
+
+    data_dir = copy_data(tmp_path)
+    eco = build_ecosystem("test", 1, data_dir=data_dir, seed=1)
+    batch = Batch(eco, "test", data_dir, str(tmp_path), 1, starting_infections="5")
+    measures_state = read_measures_yml.measure_state()
+    mutation_state = read_vaccinations_yml.mutation_state()
+
+    run_scenario(batch, Scenario(name="a"))
+    read_measures_yml.restore_measure_state(measures_state)
+    read_vaccinations_yml.restore_mutation_state(mutation_state)
+
+    assert utils.LOG_PREFIX == "."
+    assert (tmp_path / "a" / "out_infections_0.csv").exists()
@@ -0,0 +1,51 @@
+"""Tests for the Config class."""
+
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import facs
+from facs.base.config import Config
+from facs.base.location_types import building_types
+
+
+def test_import_reads_no_files(tmp_path):
+    """Test that importing the simulation does not read the data directory."""
+
+    # run from an empty directory, where covid_data does not exist.
+    code = "import facs.base.facs, facs.base.person, facs.base.population"
+    subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": os.path.dirname(list(facs.__path__)[0])},
+        check=True,
+    )
+
+
+def test_config_loads_lazily(tmp_path):
+    """Test that a Config reads its files on first use, from its own directory."""
+
+    config = Config(str(tmp_path))
+    assert config.needs_file == f"{tmp_path}/needs.csv"
+
+    (tmp_path / "vaccinations.yml").write_text("antivax_fraction: 0.25\n")
+    assert config.antivax_fraction == 0.25
+    (tmp_path / "vaccinations.yml").write_text("antivax_fraction: 0.5\n")
+    assert config.antivax_fraction == 0.25
+
+
+def test_building_types_map(tmp_path):
+    """Test that the building types map must define the fixed location types."""
+
+    shutil.copy("covid_data/building_types_map.yml", tmp_path)
+    assert set(Config(str(tmp_path)).building_types_data) >= set(building_types)
+
+    text = (tmp_path / "building_types_map.yml").read_text()
+    (tmp_path / "building_types_map.yml").write_text(
+        text.replace("shopping:", "market:", 1)
+    )
+    with pytest.raises(ValueError):
+        _ = Config(str(tmp_path)).building_types_data
@@ -101,6 +101,7 @@ def test_evolve(mock_probability, sample_house, sample_ages):
     eco.contact_rate_multiplier = {"house": 1.0}
     eco.disease.incubation_period = 5.0
     eco.num_infections_today = 0
+    eco.time = 0
 
     disease.infection_rate = 1.0
 
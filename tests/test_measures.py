@@ -0,0 +1,186 @@
+"""Tests for the measures and vaccinations timeline."""
+
+import warnings
+from datetime import date, datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from facs.base.disease import Disease
+from facs.base.measures import Measures
+from facs.readers import read_measures_yml, read_vaccinations_yml
+from facs.readers.read_measures_yml import compile_measures_yml, dated_entries
+from facs.readers.read_vaccinations_yml import (
+    compile_vaccinations_yml,
+    enact_vaccinations,
+)
+
+
+def test_dated_entries():
+    """Test that only keys written exactly in the date format are kept."""
+
+    m = {"date_format": "%d/%m/%Y", "1/3/2020": 1, "01/3/2020": 2, "31/2/2020": 3}
+    assert dated_entries(m, "%-d/%-m/%Y") == {date(2020, 3, 1): 1}
+
+
+def test_compile_measures_yml():
+    """Test that the measures file is indexed by date."""
+
+    keyworker_fraction, measures = compile_measures_yml("covid_data/measures_uk.yml")
+
+    assert keyworker_fraction == 0.18
+    assert measures[date(2020, 3, 12)]["work_from_home"] == 0.1
+    assert all(isinstance(day, date) for day in measures)
+
+
+def test_vaccinations_timeline(tmp_path):
+    """Test that vaccinations apply after their effect time and mutations ramp up."""
+
+    (tmp_path / "vaccinations.yml").write_text(
+        "vaccine_effect_time: 5\n1/3/2020:\n  vaccines_per_day: 100\n"
+    )
+    (tmp_path / "disease.yml").write_text(
+        "immunity_duration: 100\nmutations:\n  alpha:\n    infection_rate: 0.2\n"
+    )
+    (tmp_path / "mutations.yml").write_text(
+        "2/3/2020:\n  type: alpha\n  transition_period: 2\n"
+    )
+    timeline = compile_vaccinations_yml(
+        str(tmp_path), tmp_path / "vaccinations.yml", tmp_path / "disease.yml"
+    )
+    assert list(timeline["vaccinations"]) == [date(2020, 3, 6)]
+
+    disease = Disease("test", 0.1, 4, 8, 8, 10, 6, 100, 0.5)
+    disease.add_mutations({"alpha": {"infection_rate": 0.0}})
+    e = SimpleNamespace(
+        mpi=SimpleNamespace(size=2), disease=disease, vaccinations_available=0
+    )
+    state = read_vaccinations_yml.mutation_state()
+    for day in range(1, 7):
+        enact_vaccinations(e, date(2020, 3, day), timeline)
+        if day == 5:
+            assert e.vaccinations_available == 0
+    read_vaccinations_yml.restore_mutation_state(state)
+
+    assert e.vaccinations_available == 50
+    assert abs(e.disease.infection_rate - 0.2) < 1e-12
+    assert e.vac_duration == 100 and e.vaccine_effect_time == 5
+
+
+def test_vaccine_probabilities(tmp_path):
+    """Test that vaccine effects that are not probabilities are rejected once read."""
+
+    (tmp_path / "disease.yml").write_text("immunity_duration: 100\n")
+    ramp = "{from: 0.5, to: -0.1, days: 5}"
+    for entry in ["no_symptoms: 1.2", f"no_transmission: {ramp}"]:
+        (tmp_path / "vaccinations.yml").write_text(
+            f"vaccine_effect_time: 5\n1/3/2020:\n  {entry}\n"
+        )
+        with pytest.raises(ValueError, match="must be between 0 and 1"):
+            compile_vaccinations_yml(
+                str(tmp_path), tmp_path / "vaccinations.yml", tmp_path / "disease.yml"
+            )
+
+
+def test_measures_parsed_once(monkeypatch):
+    """Test that the input files are parsed on the first day only."""
+
+    calls = []
+    vaccinations = {
+        "vaccine_effect_time": 14,
+        "vac_duration": 100,
+        "vaccinations": {},
+        "mutations": {},
+        "mutation_rates": {},
+    }
+    monkeypatch.setattr(
+        "facs.base.measures.compile_measures_yml",
+        lambda ymlfile: calls.append(ymlfile)
+        or (0.2, {date(2020, 3, 2): {"traffic_multiplier": 0.5}}),
+    )
+    monkeypatch.setattr(
+        "facs.base.measures.compile_vaccinations_yml",
+        lambda *args: calls.append(args) or vaccinations,
+    )
+
+    measures = Measures()
+    e = MagicMock()
+    e.traffic_multiplier = 1.0
+    for day in range(1, 4):
+        e.date = datetime(2020, 3, day)
+        measures.enact_measures_and_evolutions(
+            e, day, "covid_data", "measures_uk", "vaccinations", "disease_covid19"
+        )
+        assert e.traffic_multiplier == (1.0 if day == 1 else 0.5)
+
+    assert len(calls) == 2
+    assert e.remove_all_measures.call_count == 1
+    assert e.keyworker_fraction == 0.2
+
+
+def test_measures_ramp(tmp_path):
+    """Test that a ramp changes its level daily and leaves other measures in force."""
+
+    (tmp_path / "measures.yml").write_text(
+        'date_format: "%d/%m/%Y"\n'
+        "keyworker_fraction: 0.1\n"
+        "1/3/2020:\n"
+        '  closure: ["leisure"]\n'
+        "  work_from_home: {from: 0.0, to: 0.4, days: 4}\n"
+        "3/3/2020:\n"
+        "  traffic_multiplier: 0.5\n"
+    )
+    (tmp_path / "vaccinations.yml").write_text("vaccine_effect_time: 14\n")
+    (tmp_path / "disease.yml").write_text("immunity_duration: 100\n")
+
+    state = read_measures_yml.measure_state()
+    measures = Measures()
+    e = MagicMock()
+    for day in range(1, 7):
+        e.date = datetime(2020, 3, day)
+        measures.enact_measures_and_evolutions(
+            e, day, str(tmp_path), "measures", "vaccinations", "disease"
+        )
+
+    # entries on the 1st and 3rd (which takes over the ramp value), ramp
+    # steps on the 2nd, 4th and 5th.
+    levels = [c.args[0] for c in e.add_work_from_home.call_args_list]
+    read_measures_yml.restore_measure_state(state)
+    assert levels == pytest.approx([0.0, 0.1, 0.2, 0.3, 0.4])
+    assert e.remove_all_measures.call_count == 2
+    assert e.add_closure.call_count == 1
+
+
+def test_measures_file_changed(tmp_path):
+    """Test that a measures file taking over warns if its earlier entries differ."""
+
+    header = 'date_format: "%d/%m/%Y"\nkeyworker_fraction: 0.1\n'
+    (tmp_path / "a.yml").write_text(header + "1/3/2020:\n  traffic_multiplier: 0.5\n")
+    (tmp_path / "b.yml").write_text(
+        header + "1/3/2020:\n  traffic_multiplier: 0.5\n5/3/2020:\n  closure: []\n"
+    )
+    (tmp_path / "c.yml").write_text(header + "2/3/2020:\n  traffic_multiplier: 0.5\n")
+    (tmp_path / "vaccinations.yml").write_text("vaccine_effect_time: 14\n")
+    (tmp_path / "disease.yml").write_text("immunity_duration: 100\n")
+
+    state = read_measures_yml.measure_state()
+    e = MagicMock()
+    e.rank = 0
+    e.measures_entries = None
+    e.date = datetime(2020, 3, 1)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        Measures().enact_measures_and_evolutions(
+            e, 0, str(tmp_path), "a", "vaccinations", "disease"
+        )
+        e.date = datetime(2020, 3, 4)  # e.g. a run from a snapshot.
+        Measures().enact_measures_and_evolutions(
+            e, 3, str(tmp_path), "b", "vaccinations", "disease"
+        )
+
+    with pytest.warns(RuntimeWarning, match="dated before 2020-03-04"):
+        Measures().enact_measures_and_evolutions(
+            e, 3, str(tmp_path), "c", "vaccinations", "disease"
+        )
+    read_measures_yml.restore_measure_state(state)
@@ -1,8 +1,10 @@
 """Tests for the Needs class."""
 
 from unittest.mock import patch, Mock
+import numpy as np
 import pandas as pd
 import pytest
+from facs.base.facs import Ecosystem
 from facs.base.needs import Needs
 
 # pylint: disable=redefined-outer-name
@@ -148,14 +150,79 @@ def test_scale_needs():
     needs = needs_instance()  # pylint: disable=no-value-for-parameter
 
     needs.scale_needs("office", 0.5)
-    assert needs.needs["office"].sum() == 35
+    assert needs.matrix[:, 0].sum() == 35
     needs.scale_needs("school", 0.5)
-    assert needs.needs["school"].sum() == 31.5
+    assert needs.matrix[:, 1].sum() == 31.5
     needs.scale_needs("market", 0.5)
-    assert needs.needs["market"].sum() == 52.5
+    needs.scale_needs("market", 0.5)
+    assert needs.matrix[:, 2].tolist() == [15, 11.25]
+
+    # the needs table itself is left as read.
+    assert needs.needs["office"].sum() == 70
 
     with pytest.raises(ValueError):
         needs.scale_needs("hospital", 0.5)
 
     with pytest.raises(ValueError):
         needs.scale_needs("office", -0.5)
+
+
+def test_set_multiplier():
+    """Test that multipliers replace each other and can be reset."""
+
+    needs = needs_instance()  # pylint: disable=no-value-for-parameter
+
+    needs.set_multiplier("market", 0.3)
+    needs.set_multiplier("market", 0.5)
+    assert needs.matrix[:, 2].tolist() == [30, 22.5]
+
+    matrix = needs.matrix
+    needs.set_multiplier("market", 0.5)
+    assert needs.matrix is matrix  # unchanged multipliers keep the matrix.
+
+    needs.reset_multipliers()
+    assert needs.matrix.tolist() == [[40, 37, 60], [30, 26, 45]]
+    assert needs.matrix.flags.c_contiguous
+
+
+def test_closures_per_ecosystem():
+    """Test that partial closures change the needs of their own ecosystem only."""
+
+    e1 = Ecosystem(10, "covid_data", seed=1)
+    e2 = Ecosystem(10, "covid_data", seed=1)
+    leisure = e1.needs.columns["leisure"]
+
+    e1.add_partial_closure("leisure", 0.5)
+    assert e1.needs.multipliers[leisure] == 0.5
+    assert e2.needs.multipliers[leisure] == 1.0
+
+    e1.remove_all_measures()
+    assert e1.needs.multipliers[leisure] == 1.0
+
+
+def test_get_needs_bulk():
+    """Test the get_needs_bulk method."""
+
+    needs = needs_instance()  # pylint: disable=no-value-for-parameter
+
+    ages = np.array([0, 1, 1, 1])
+    wfh = np.array([False, True, False, False])
+    school = np.array([False, False, True, False])
+    hospitalised = np.array([False, False, False, True])
+
+    result = needs.get_needs_bulk(ages, wfh, school, hospitalised)
+
+    assert result.dtype == np.float64
+    assert result.tolist() == [[40, 37, 60], [0, 26, 45], [30, 0, 45], [0, 0, 0]]
+    assert needs.get_needs_bulk(ages).tolist()[1] == [30, 26, 45]
+
+
+def test_scale_needs_rebuilds_matrix():
+    """Test that scaling needs is reflected in the needs matrix."""
+
+    needs = needs_instance()  # pylint: disable=no-value-for-parameter
+
+    needs.scale_needs("market", 0.5)
+
+    assert needs.matrix[:, 2].tolist() == [30, 22.5]
+    assert needs.get_needs_bulk(np.array([1]))[0, 2] == 22.5
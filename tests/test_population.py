@@ -0,0 +1,64 @@
+"""Tests for the bulk population synthesis."""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from facs.base.agents import AgentTable, STATUSES, SUSCEPTIBLE, IMMUNE
+from facs.base.facs import Ecosystem
+from facs.base.house import House
+from facs.base.population import add_households, JOB_PROBABILITIES
+from facs.base.rng import rng
+
+
+def test_add_households_fills_table():
+    """Test that households, houses and agent rows agree after bulk synthesis."""
+
+    table = AgentTable()
+    houses = [House(i, i % 2, agent_table=table) for i in range(100)]
+    ages = [0.0] * 91
+    ages[30] = ages[60] = 0.5
+
+    households = add_households(houses, 2.6, ages, 2)
+
+    assert len(households) == 200
+    assert len(table) == sum(h.size for h in households)
+    assert sum(h.total_size for h in houses) == len(table)
+    assert all(h.num_agents == h.total_size for h in houses)
+    for household in households:
+        rows = np.arange(len(table))[household.agent_slice]
+        assert np.all(table.household[rows] == household.household_id)
+        assert np.all(table.house[rows] == household.house.house_id)
+        assert all(a.household is household for a in household.agents)
+
+    assert set(table.age.tolist()) <= {30, 60}
+    assert table.job.max() < len(JOB_PROBABILITIES)
+    assert set(table.status.tolist()) <= {SUSCEPTIBLE, IMMUNE}
+    assert np.array_equal(
+        table.status_counts, np.bincount(table.status, minlength=len(STATUSES))
+    )
+    assert len(table.susceptible) == table.status_counts[SUSCEPTIBLE]
+    assert np.all(table.phase_duration[table.status == SUSCEPTIBLE] == 0)
+
+
+def test_compliance_thresholds():
+    """Test that stay-at-home measures pick agents by their fixed compliance."""
+
+    table = AgentTable()
+    houses = [House(i, 0, agent_table=table) for i in range(200)]
+    add_households(houses, 2.6, [1 / 91] * 91, 1)
+    assert np.all((table.compliance >= 0) & (table.compliance < 1))
+
+    e = SimpleNamespace(agents=table, keyworker_fraction=0.2)
+    state = rng.get_state()
+    Ecosystem.add_partial_closure(e, "office", 0.3, exclude_people=True)
+    some = table.work_from_home.copy()
+    Ecosystem.add_partial_closure(e, "office", 0.6, exclude_people=True)
+    more = table.work_from_home.copy()
+    Ecosystem.add_partial_closure(e, "school", 1.0, exclude_people=True)
+
+    assert rng.get_state()["bit_generator"] == state["bit_generator"]
+    assert np.array_equal(some, table.compliance < 0.3)
+    assert np.all(more[some]) and more.sum() > some.sum()
+    # keyworkers, the least compliant agents, keep going to school.
+    assert np.array_equal(table.school_from_home, table.compliance < np.float32(0.8))
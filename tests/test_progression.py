@@ -0,0 +1,124 @@
+"""Tests for the batched disease progression kernel."""
+
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from facs.base.agents import (
+    STATUSES,
+    SUSCEPTIBLE,
+    EXPOSED,
+    INFECTIOUS,
+    RECOVERED,
+    IMMUNE,
+)
+from facs.base.disease import Disease
+from facs.base.house import House
+from facs.base.household import Household
+from facs.base.progression import progress_conditions
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture
+def disease():
+    """Return a Disease with waning immunity and no hospitalisations."""
+
+    d = Disease(
+        name="COVID-19",
+        infection_rate=0.05,
+        incubation_period=5.0,
+        mild_recovery_period=10.0,
+        recovery_period=15.0,
+        mortality_period=20.0,
+        period_to_hospitalisation=25.0,
+        immunity_duration=30.0,
+        immunity_fraction=0.5,
+    )
+    d.add_hospitalisation_chances([[0, 0.0], [90, 0.0]])
+    d.add_mortality_chances([[0, 0.0], [90, 0.0]])
+    return d
+
+
+@pytest.fixture
+def eco(tmp_path, disease, monkeypatch):
+    """Return a mock Ecosystem with 4 agents in one house."""
+
+    monkeypatch.setattr("facs.base.utils.LOG_PREFIX", str(tmp_path))
+    house = House(0, 0)
+    house.households.append(Household(house, [1.0] + [0.0] * 90, size=4))
+    table = house.agent_table
+    table.set_status(np.arange(len(table)), SUSCEPTIBLE)
+
+    e = Mock()
+    e.agents = table
+    e.disease = disease
+    e.rank = 0
+    e.num_hospitalised = 0
+    e.num_recoveries_today = 0
+    return e
+
+
+def test_exposed_become_infectious(eco, disease):
+    """Test that exposed agents become infectious after incubation."""
+
+    a = eco.agents
+    a.set_status([0, 1], EXPOSED)
+    a.status_change_time[:2] = 0
+    a.phase_duration[:2] = [3.0, 5.5]
+
+    progress_conditions(eco, 4, disease)
+
+    assert list(a.status[:2]) == [INFECTIOUS, EXPOSED]
+    assert a.status_change_time[0] == 4
+    assert a.mild_version[0]
+    assert a.phase_duration[0] >= 1
+
+
+def test_mild_cases_recover(eco, disease):
+    """Test that mild infectious agents recover when their phase ends."""
+
+    a = eco.agents
+    a.set_status([0, 1, 2], INFECTIOUS)
+    a.status_change_time[:3] = [0, 0, 5]
+    a.phase_duration[:3] = 4
+
+    progress_conditions(eco, 4, disease)
+
+    assert list(a.status[:3]) == [RECOVERED, RECOVERED, INFECTIOUS]
+    assert a.status_counts[RECOVERED] == 2
+    assert eco.num_recoveries_today == 2
+    assert np.all(a.phase_duration[:2] > 0)
+
+
+def test_one_step_per_day(eco, disease):
+    """Test that an agent that becomes infectious does not also recover."""
+
+    a = eco.agents
+    a.set_status(0, EXPOSED)
+    a.status_change_time[0] = 0
+    a.phase_duration[0] = 0
+
+    progress_conditions(eco, 100, disease)
+
+    assert a.status[0] == INFECTIOUS
+
+
+def test_immunity_wanes(eco, disease):
+    """Test that recovered and immune agents become susceptible again."""
+
+    a = eco.agents
+    a.set_status(0, RECOVERED)
+    a.set_status(1, IMMUNE)
+    a.status_change_time[:2] = 0
+    a.phase_duration[:2] = 10
+    a.symptoms_suppressed[:2] = True
+
+    progress_conditions(eco, 10, disease)
+
+    assert list(a.status[:2]) == [SUSCEPTIBLE, SUSCEPTIBLE]
+    assert np.array_equal(
+        a.status_counts, np.bincount(a.status, minlength=len(STATUSES))
+    )
+    assert not a.symptoms_suppressed[:2].any()
@@ -2,7 +2,12 @@ import pytest
 from unittest.mock import Mock, mock_open, patch
 import csv
 
-from facs.readers.read_building_csv import read_building_csv
+from facs.readers.read_building_csv import (
+    read_building_csv,
+    nearest_cache_file,
+    apply_building_mapping,
+    building_label_categories,
+)
 
 
 def test_read_building_csv_missing_file():
@@ -13,3 +18,68 @@ def test_read_building_csv_missing_file():
         with pytest.raises(FileNotFoundError):
             read_building_csv(e, csvfile)
             
+
+
+def test_nearest_cache_file(tmp_path):
+    csvfile = tmp_path / "buildings.csv"
+    ymlfile = tmp_path / "building_types_map.yml"
+    csvfile.write_text("building,x,y,sqm\nhouse,0,0,10\n")
+    ymlfile.write_text("park:\n  index: 0\n")
+    e = Mock(seed=1, rank=0, size=1)
+
+    name = nearest_cache_file(e, csvfile, ymlfile, "cache", house_ratio=2)
+    assert name.startswith("cache/nearest_") and name.endswith("_0.npz")
+    assert name == nearest_cache_file(e, csvfile, ymlfile, "cache", house_ratio=2)
+    assert name != nearest_cache_file(e, csvfile, ymlfile, "cache", house_ratio=3)
+
+    csvfile.write_text("building,x,y,sqm\nhouse,0,1,10\n")
+    assert name != nearest_cache_file(e, csvfile, ymlfile, "cache", house_ratio=2)
+
+    e.seed = None
+    assert nearest_cache_file(e, csvfile, ymlfile, "cache", house_ratio=2) is None
+
+
+
+def test_building_label_categories():
+    mapping = {
+        "park": {"labels": ["park", "garden"]},
+        "leisure": {"labels": ["pub", "garden"]},
+    }
+    categories = building_label_categories(mapping)
+    assert categories == {"park": "park", "garden": "park", "pub": "leisure"}
+    for label in ["park", "garden", "pub"]:
+        assert categories[label] == apply_building_mapping(mapping, label)
+
+
+def test_read_building_csv_columns(tmp_path):
+    csvfile = tmp_path / "buildings.csv"
+    ymlfile = tmp_path / "building_types_map.yml"
+    csvfile.write_text(
+        "building,x,y,sqm\n"
+        "house,0.1,0,10\n"
+        "park,2,-1,500\n"
+        "#house,9,9,10\n"
+        "detached,1,3,20\n"
+        "school,0.5,2,100\n"
+        "house,1,1,10\n"
+        "park,1,1,300\n"
+    )
+    ymlfile.write_text(
+        "park:\n  labels: [park]\nschool:\n  labels: [school]\n"
+        "office:\n  labels: [office]\n"
+    )
+    e = Mock(seed=None, rank=0, size=1)
+    e.update_nearest_locations.side_effect = SystemExit  # stop after reading.
+
+    with pytest.raises(SystemExit):
+        read_building_csv(e, csvfile, str(tmp_path), str(ymlfile), house_ratio=2)
+
+    names, xs, ys, households = e.add_houses.call_args.args
+    assert list(names) == [0, 1] and list(xs) == [0.1, 1.0] and households == 2
+    calls = {c.args[0]: c.args[1:] for c in e.add_locations.call_args_list}
+    assert list(calls) == ["park", "school"]
+    assert list(calls["park"][0]) == [1, 3]
+    assert list(calls["park"][3]) == [500, 300]
+    assert list(calls["school"][0]) == [2]
+    names, xbound, ybound, _ = e.add_random_offices.call_args.args
+    assert list(names) == [4] and (xbound, ybound) == ([0.1, 2.0], [-1.0, 3.0])
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+
+from facs.readers.read_building_csv import preprocess_building_csv
+from facs.readers.read_region_bundle import (
+    BuildingTable,
+    load_region_bundle,
+    region_bundle_dir,
+)
+
+
+def write_inputs(tmp_path):
+    csvfile = tmp_path / "test_buildings.csv"
+    ymlfile = tmp_path / "building_types_map.yml"
+    csvfile.write_text(
+        "building,x,y,sqm\n"
+        "house,0.1,0,10\n"
+        "park,2,-1,500\n"
+        "#house,9,9,10\n"
+        "detached,1,3,20\n"
+        "school,0.5,2,100\n"
+    )
+    ymlfile.write_text("park:\n  labels: [park]\nschool:\n  labels: [school]\n")
+    return str(csvfile), str(ymlfile)
+
+
+def test_region_bundle_dir():
+    assert region_bundle_dir("data/brent_buildings.csv") == "data/brent_buildings.bundle"
+
+
+def test_region_bundle_round_trip(tmp_path):
+    csvfile, ymlfile = write_inputs(tmp_path)
+    bundle_dir = preprocess_building_csv(csvfile, ymlfile)
+    assert bundle_dir == str(tmp_path / "test_buildings.bundle")
+
+    table = load_region_bundle(
+        bundle_dir, {"buildings": csvfile, "building_types_map": ymlfile}
+    )
+    assert isinstance(table, BuildingTable)
+    assert isinstance(table.x, np.memmap) and table.x.dtype == np.float32
+    assert table.sqm.dtype == np.int32
+    assert len(table) == 4
+    assert list(table.location_types) == ["house", "park", "house", "school"]
+    assert list(table.house) == [True, False, True, False]
+    assert list(table.sqm) == [10, 500, 20, 100]
+    assert table.label_counts == {"detached": 1, "house": 1, "park": 1, "school": 1}
+    assert table.xbound == [0.1, 2.0] and table.ybound == [-1.0, 3.0]
+
+
+def test_region_bundle_out_of_date(tmp_path):
+    csvfile, ymlfile = write_inputs(tmp_path)
+    bundle_dir = preprocess_building_csv(csvfile, ymlfile)
+    sources = {"buildings": csvfile, "building_types_map": ymlfile}
+
+    assert load_region_bundle(str(tmp_path / "missing"), sources) is None
+
+    with open(csvfile, "a") as f:
+        f.write("house,1,1,10\n")
+    assert load_region_bundle(bundle_dir, sources) is None
+
+    # without the sources, the bundle is used as is.
+    os.remove(csvfile)
+    assert len(load_region_bundle(bundle_dir, sources)) == 4
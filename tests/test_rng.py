@@ -0,0 +1,96 @@
+"""Tests for the RandomStreams class."""
+
+import numpy as np
+import pytest
+
+from facs.base.rng import RandomStreams
+
+
+def test_seed_is_reproducible():
+    """Test that streams seeded alike produce the same draws."""
+
+    a = RandomStreams(42, block_size=8)
+    b = RandomStreams(42, block_size=8)
+
+    assert [a.random() for _ in range(20)] == [b.random() for _ in range(20)]
+    assert np.array_equal(a.generator.random(5), b.generator.random(5))
+
+
+def test_ranks_get_different_streams():
+    """Test that every rank gets its own stream from one seed."""
+
+    streams = RandomStreams()
+    draws = []
+    for rank in range(3):
+        streams.seed(7, rank, 3)
+        draws.append(streams.generator.random(4))
+
+    assert not np.array_equal(draws[0], draws[1])
+    assert not np.array_equal(draws[1], draws[2])
+
+    streams.seed(7, 1, 3)
+    assert np.array_equal(streams.generator.random(4), draws[1])
+
+
+def test_spawn_reuses_seed():
+    """Test that spawn restarts a rank's stream from the last seed."""
+
+    streams = RandomStreams(3)
+    streams.spawn(0, 2)
+    first = [streams.random() for _ in range(3)]
+    streams.spawn(0, 2)
+
+    assert [streams.random() for _ in range(3)] == first
+
+
+@pytest.mark.parametrize("high", [1, 2, 10])
+def test_integer_range(high):
+    """Test that integer draws lie in [0, high)."""
+
+    streams = RandomStreams(1, block_size=16)
+    values = [streams.integer(high) for _ in range(100)]
+
+    assert min(values) >= 0
+    assert max(values) < high
+
+
+def test_independent_streams():
+    """Test that named streams do not shift the main stream."""
+
+    a, b = RandomStreams(11), RandomStreams(11)
+    first = a.independent("nearest_locations").random(3)
+    a.independent("other").random(3)
+
+    assert np.array_equal(a.generator.random(3), b.generator.random(3))
+    assert np.array_equal(b.independent("nearest_locations").random(3), first)
+
+
+def test_shared_streams():
+    """Test that shared streams draw the same numbers on every rank."""
+
+    a, b = RandomStreams(), RandomStreams()
+    b.entropy = a.entropy
+    a.spawn(0, 2)
+    b.spawn(1, 2)
+
+    assert np.array_equal(a.shared("offices").random(3), b.shared("offices").random(3))
+    assert not np.array_equal(a.shared("offices").random(3), a.shared("x").random(3))
+    assert not np.array_equal(a.generator.random(3), b.generator.random(3))
+
+
+def test_state_round_trip():
+    """Test that restoring a state replays the same draws, buffered ones included."""
+
+    streams = RandomStreams(5, block_size=4)
+    streams.random()
+    state = streams.get_state()
+    first = [streams.random() for _ in range(6)]
+
+    other = RandomStreams(6, block_size=4)
+    other.set_state(state)
+
+    assert [other.random() for _ in range(6)] == first
+    assert np.array_equal(other.generator.random(2), streams.generator.random(2))
+    assert np.array_equal(
+        other.independent("x").random(2), streams.independent("x").random(2)
+    )
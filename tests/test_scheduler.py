@@ -0,0 +1,56 @@
+"""Tests for the intervention scheduler."""
+
+from datetime import date
+
+import pytest
+
+from facs.base.scheduler import Scheduler, expand_ramps
+
+
+def test_scheduler_order():
+    """Test that events fire on their day, by priority and then order added."""
+
+    fired = []
+    scheduler = Scheduler(
+        {"a": lambda e, v: fired.append(v), "b": lambda e, v: fired.append(v)}
+    )
+    scheduler.add(date(2020, 3, 2), "a", 1, priority=1)
+    scheduler.add(date(2020, 3, 2), "b", 2)
+    scheduler.add(date(2020, 3, 2), "a", 3)
+    scheduler.add(date(2020, 3, 1), "a", 0)
+    scheduler.add(date(2020, 3, 4), "a", 4)
+
+    scheduler.run(None, date(2020, 3, 2))
+    assert fired == [2, 3, 1]  # the event of the 1st was missed and dropped.
+    scheduler.run(None, date(2020, 3, 3))
+    assert fired == [2, 3, 1] and len(scheduler) == 1
+    scheduler.run(None, date(2020, 3, 4))
+    assert fired == [2, 3, 1, 4] and len(scheduler) == 0
+
+    with pytest.raises(ValueError):
+        scheduler.add(date(2020, 3, 5), "c")
+
+
+def test_expand_ramps():
+    """Test that ramps are expanded into daily values and stop at the next setting."""
+
+    entries = {
+        date(2020, 3, 1): {"x": {"from": 0, "to": 1, "days": 4}, "y": 5},
+        date(2020, 3, 3): {"y": 6},
+        date(2020, 3, 4): {"x": 0.9},
+    }
+    expanded, steps = expand_ramps(entries, ("x",))
+
+    assert expanded[date(2020, 3, 1)] == {"x": 0.0, "y": 5}
+    assert steps == {
+        date(2020, 3, 2): {"x": 0.25},
+        date(2020, 3, 3): {"x": 0.5},
+    }
+    assert isinstance(entries[date(2020, 3, 1)]["x"], dict)
+
+    expanded, steps = expand_ramps(entries, ("x",), inject=True)
+    assert expanded[date(2020, 3, 3)] == {"y": 6, "x": 0.5}
+    assert steps == {date(2020, 3, 2): {"x": 0.25}}
+
+    with pytest.raises(ValueError):
+        expand_ramps({date(2020, 3, 1): {"x": {"to": 1, "days": 0}}}, ("x",))
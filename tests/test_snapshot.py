@@ -0,0 +1,197 @@
+"""Tests for saving and restoring Ecosystem snapshots."""
+
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from facs.base import utils
+from facs.base.agents import INFECTIOUS
+from facs.base.facs import Ecosystem
+from facs.base.rng import rng
+from facs.base.snapshot import snapshot_file, write_outputs
+from facs.readers import read_measures_yml, read_vaccinations_yml
+from facs.readers.read_disease_yml import read_disease_yml
+
+# pylint: disable=redefined-outer-name
+
+
+def make_ecosystem(seed):
+    """Return a small ecosystem with houses, locations and groups."""
+
+    e = Ecosystem(10, "covid_data", seed=seed)
+    e.household_size = 2.6
+    e.ages = np.full(91, 1 / 91)
+    e.disease = read_disease_yml("covid_data/disease_covid19.yml")
+    e.date = datetime(2020, 3, 1)
+
+    generator = np.random.default_rng(0)
+    e.add_houses(np.arange(40), generator.random(40), generator.random(40), 2)
+    for loc_type in [
+        "park",
+        "hospital",
+        "supermarket",
+        "school",
+        "leisure",
+        "shopping",
+    ]:
+        e.add_locations(
+            loc_type,
+            np.arange(1, 4),
+            generator.random(3),
+            generator.random(3),
+            np.full(3, 500),
+        )
+    e.add_random_offices(np.arange(4, 8), [0, 1], [0, 1], 800)
+    e.init_loc_inf_minutes()
+    e.update_nearest_locations()
+    e.make_group("school", 5)
+    e.agents.set_status(np.arange(0, len(e.agents), 7), INFECTIOUS)
+    return e
+
+
+@pytest.fixture
+def snapshot(tmp_path, monkeypatch):
+    """Return a saved ecosystem and the name its snapshot was saved under."""
+
+    monkeypatch.setattr("facs.base.utils.LOG_PREFIX", str(tmp_path))
+    e = make_ecosystem(3)
+    e.evolve()
+    fname = str(tmp_path / "warm.pkl")
+    e.save_snapshot(fname)
+    return e, fname
+
+
+def test_snapshot_file():
+    """Test that every rank gets its own snapshot file."""
+
+    assert snapshot_file("out/warm.pkl", 3) == "out/warm_3.pkl"
+
+
+def test_snapshot_round_trip(snapshot):
+    """Test that a restored ecosystem continues exactly like the original."""
+
+    e, fname = snapshot
+    restored = make_ecosystem(4)
+    assert not np.array_equal(restored.agents.age[:10], e.agents.age[:10])
+    restored.load_snapshot(fname)
+
+    assert len(restored.houses) == len(e.houses)
+    assert [h.size for h in restored.agents.households] == [
+        h.size for h in e.agents.households
+    ]
+    for column in ["status", "age", "job", "groups", "_susceptible_index"]:
+        assert np.array_equal(
+            getattr(restored.agents, column), getattr(e.agents, column)
+        )
+    assert np.array_equal(restored.nearest_locations, e.nearest_locations)
+    assert [l.sqm for l in restored.locations["park"]] == [
+        l.sqm for l in e.locations["park"]
+    ]
+    assert restored.time == e.time and restored.date == e.date
+
+    state = rng.get_state()
+    e.evolve()
+    after = e.agents.status.copy()
+    rng.set_state(state)
+    restored.evolve()
+
+    assert np.array_equal(restored.agents.status, after)
+    assert np.array_equal(restored.agents.status_counts, e.agents.status_counts)
+
+
+
+def test_snapshot_disease(snapshot):
+    """Test that loading a snapshot warns if another disease was requested."""
+
+    e, fname = snapshot
+    e.disease.infection_rate *= 2  # as a mutation would.
+    e.save_snapshot(fname)
+
+    restored = make_ecosystem(4)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        restored.load_snapshot(fname)
+    assert restored.disease.infection_rate == e.disease.infection_rate
+
+    restored = make_ecosystem(4)
+    restored.disease = read_disease_yml("covid_data/disease_measles.yml")
+    with pytest.warns(RuntimeWarning, match="disease of the snapshot"):
+        restored.load_snapshot(fname)
+    assert restored.disease == e.disease
+
+def test_snapshot_measures(snapshot):
+    """Test that the state kept by the measures and vaccinations readers is restored."""
+
+    e, _ = snapshot
+    measures = {
+        "mask_uptake": 0.1,
+        "mask_uptake_shopping": 0.2,
+        "social_distance": 0.3,
+        "work_from_home": 0.4,
+    }
+    mutation = {"daily_change": 0.05, "days_remaining": 7}
+    read_measures_yml.restore_measure_state(measures)
+    read_vaccinations_yml.restore_mutation_state(mutation)
+    e.add_closure("school", 0)
+    state = e.get_snapshot()
+
+    read_measures_yml.restore_measure_state(dict.fromkeys(measures, 0.0))
+    read_vaccinations_yml.restore_mutation_state(
+        {"daily_change": 0.0, "days_remaining": -1}
+    )
+    e.remove_closures()
+    e.set_snapshot(state)
+
+    assert read_measures_yml.measure_state() == measures
+    assert read_vaccinations_yml.mutation_state() == mutation
+    assert e.closures == {"school": 0}
+    read_measures_yml.restore_measure_state(dict.fromkeys(measures, 0.0))
+    read_vaccinations_yml.restore_mutation_state(
+        {"daily_change": 0.0, "days_remaining": -1}
+    )
+
+
+def test_snapshot_branches(tmp_path, monkeypatch):
+    """Test that one state can start several identical branches."""
+
+    monkeypatch.setattr("facs.base.utils.LOG_PREFIX", str(tmp_path))
+    e = make_ecosystem(3)
+    e.evolve()
+    state = e.get_snapshot()
+
+    branches = []
+    for _ in range(2):
+        e.set_snapshot(state)
+        e.add_closure("school", 0)
+        e.evolve()
+        branches.append((e.agents.status.copy(), e.loc_inf_minutes.copy()))
+
+    assert e.time == state["ecosystem"]["time"] + 1
+    assert "school" not in state["ecosystem"]["closures"]
+    assert np.array_equal(branches[0][0], branches[1][0])
+    assert np.array_equal(branches[0][1], branches[1][1])
+
+
+def test_snapshot_outputs(tmp_path, monkeypatch):
+    """Test that the output written before a snapshot is restored with it."""
+
+    monkeypatch.setattr("facs.base.utils.LOG_PREFIX", str(tmp_path))
+    e = make_ecosystem(3)
+    e.print_header(str(tmp_path / "out.csv"))
+    e.print_status(str(tmp_path / "out.csv"))
+    state = e.get_snapshot()
+
+    restored = make_ecosystem(4)
+    restored.set_snapshot(state)
+    write_outputs(restored, state, str(tmp_path / "resumed.csv"))
+    utils.out_files.files[str(tmp_path / "resumed.csv")].flush()
+
+    assert (tmp_path / "resumed.csv").read_text() == state["outputs"]["main"]
+    assert state["outputs"]["main"].count("\n") == 2
+    assert restored.outfile == str(tmp_path / "resumed.csv")
+    assert set(state["outputs"]["logs"]) == {
+        f"out_{category}_0.csv"
+        for category in ["infections", "hospitalisations", "deaths", "recoveries"]
+    }
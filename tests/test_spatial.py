@@ -0,0 +1,93 @@
+"""Tests for the LocationIndex class."""
+
+import numpy as np
+import pytest
+
+from facs.base.location import Location
+from facs.base.spatial import LocationIndex, nearest_location_matrix
+
+
+def brute_force_nearest(x, y, sqm, px, py, k):
+    """Return the k nearest locations by sorting all scaled distances."""
+
+    distances = np.hypot(x - px, y - py) / np.sqrt(sqm)
+    return sorted(range(len(x)), key=lambda i: distances[i])[:k]
+
+
+@pytest.mark.parametrize("num", [1, 5, 200])
+def test_nearest_matches_brute_force(num):
+    """Test that k-nearest queries match a full sort of the scaled distances."""
+
+    rng = np.random.default_rng(num)
+    x, y = rng.random(num), rng.random(num)
+    sqm = rng.choice([100, 400, 20000], num)
+    x[: num // 4], y[: num // 4] = 0.5, 0.5  # coinciding locations give ties.
+    index = LocationIndex(x, y, sqm)
+
+    for px, py in rng.random((50, 2)) * 1.4 - 0.2:
+        for k in [1, 10, 50]:
+            expected = brute_force_nearest(x, y, sqm, px, py, k)
+            assert index.nearest(px, py, k).tolist() == expected
+
+
+@pytest.mark.parametrize("budget", [1, 10**6])
+def test_nearest_many_matches_nearest(budget):
+    """Test that block queries match single queries, for any block size."""
+
+    rng = np.random.default_rng(0)
+    x, y = rng.random(100), rng.random(100)
+    sqm = rng.choice([100, 400], 100)
+    x[:30], y[:30] = 0.5, 0.5
+    index = LocationIndex(x, y, sqm)
+    points = rng.random((40, 2))
+
+    nearest = index.nearest_many(points[:, 0], points[:, 1], 10, budget)
+
+    assert nearest.shape == (40, 10)
+    for (px, py), row in zip(points, nearest):
+        assert row.tolist() == index.nearest(px, py, 10).tolist()
+
+
+@pytest.mark.parametrize("engine", ["block", "index"])
+def test_nearest_location_matrix(engine):
+    """Test the padded nearest location matrix, with a fixed type."""
+
+    index = LocationIndex([0.0, 1.0, 2.0], [0.0, 0.0, 0.0], [100, 100, 100])
+    x, y = np.array([0.1, 1.9]), np.array([0.0, 0.0])
+
+    matrix = nearest_location_matrix(
+        x, y, [index, None, index], [2, 5, 2], [False, False, True], engine=engine
+    )
+
+    assert matrix.shape == (2, 3, 2)
+    assert matrix[:, 0].tolist() == [[0, 1], [2, 1]]
+    assert np.all(matrix[:, 1] == -1)
+    assert matrix[0, 2, 0] in (0, 1)
+    assert matrix[1, 2, 0] in (2, 1)
+    assert np.all(matrix[:, 2, 1] == -1)
+
+
+def test_nearest_location_matrix_bad_engine():
+    """Test that an unknown engine is rejected."""
+
+    with pytest.raises(ValueError):
+        nearest_location_matrix([], [], [], [], [], engine="tree")
+
+
+def test_nearest_prefers_larger_locations():
+    """Test that a larger location can beat a closer one."""
+
+    locations = [
+        Location(0, "school", 1.0, 0.0, 100),
+        Location(1, "school", 3.0, 0.0, 10000),
+    ]
+    index = LocationIndex.from_locations(locations)
+
+    assert index.nearest(0.0, 0.0, 2).tolist() == [1, 0]
+    assert len(index) == 2
+
+
+def test_nearest_empty():
+    """Test queries on an empty index."""
+
+    assert len(LocationIndex([], [], []).nearest(0.0, 0.0, 3)) == 0
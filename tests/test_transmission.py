@@ -0,0 +1,107 @@
+"""Tests for the vectorised location transmission kernel."""
+
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from facs.base.agents import SUSCEPTIBLE, EXPOSED
+from facs.base.house import House
+from facs.base.household import Household
+from facs.base.location import Location
+from facs.base.location_types import building_types, building_types_dict
+from facs.base.rng import rng
+from facs.base.transmission import base_rates, closed_types, spread_infections
+from facs.base.visits import VisitBuffer
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture
+def eco(tmp_path, monkeypatch):
+    """Return a mock Ecosystem with 4 agents, a school and a park."""
+
+    monkeypatch.setattr("facs.base.utils.LOG_PREFIX", str(tmp_path))
+    house = House(0, 0)
+    house.households.append(Household(house, [1.0] + [0.0] * 90, size=4))
+    table = house.agent_table
+    table.set_status(np.arange(4), SUSCEPTIBLE)
+
+    planner = Mock()
+    planner.loc_type = np.array(
+        [building_types_dict["school"], building_types_dict["park"]]
+    )
+    planner.loc_sqm = np.array([100.0, 1000.0])
+
+    e = Mock()
+    e.agents = table
+    e.visit_planner = planner
+    e.time = 3
+    e.rank = 0
+    e.closures = {}
+    e.seasonal_effect = 1.0
+    e.airflow_indoors = 0.007
+    e.airflow_outdoors = 0.028
+    e.contact_rate_multiplier = {t: 1.0 for t in building_types}
+    e.disease.infection_rate = 0.07
+    e.disease.incubation_period = 5.0
+    e.loc_inf_minutes = np.array([360.0, 0.0])
+    e.visits = VisitBuffer(2)
+    e.base_rate = 0.0
+    e.loc_evolves = 0
+    e.num_infections_today = 0
+    return e
+
+
+def test_base_rates_match_location_formula(eco):
+    """Test that the base rates follow the per-location formula."""
+
+    eco.loc_inf_minutes = np.array([360.0, 720.0])
+    rates = base_rates(eco, eco.visit_planner)
+
+    school = 4.0 * 0.07 * 360.0 / (0.007 * 24 * 60 * 100.0 * 720)
+    park = 4.0 * 0.07 * 720.0 / (0.028 * 24 * 60 * 1000.0 * 720)
+    assert rates == pytest.approx([school, park])
+
+
+def test_closed_types(eco):
+    """Test that location types closed before today are masked."""
+
+    eco.closures = {"school": 2, "park": 3}
+    closed = closed_types(eco)
+
+    assert closed[building_types_dict["school"]]
+    assert not closed[building_types_dict["park"]]
+
+
+def test_spread_infections(eco, monkeypatch):
+    """Test that susceptible visitors to infectious locations are infected once."""
+
+    monkeypatch.setattr(rng, "generator", Mock(wraps=rng.generator, random=np.zeros))
+    eco.agents.set_status(3, EXPOSED)
+    eco.visits.load(
+        np.array([0, 0, 1, 2, 3]),
+        np.array([0, 0, 1, 0, 0]),
+        np.array([60.0, 60.0, 60.0, 60.0, 60.0]),
+    )
+
+    spread_infections(eco, eco.visit_planner)
+
+    assert list(eco.agents.status) == [EXPOSED, SUSCEPTIBLE, EXPOSED, EXPOSED]
+    assert eco.agents.status_counts[EXPOSED] == 3
+    assert eco.num_infections_today == 2
+    assert eco.loc_evolves == 5
+    assert np.all(eco.agents.phase_duration[[0, 2]] >= 1)
+
+
+def test_spread_infections_closed(eco, monkeypatch):
+    """Test that nobody is infected at closed locations."""
+
+    monkeypatch.setattr(rng, "generator", Mock(wraps=rng.generator, random=np.zeros))
+    eco.closures = {"school": 0}
+    eco.visits.load(np.array([0, 1]), np.array([0, 0]), np.array([60.0, 60.0]))
+
+    spread_infections(eco, eco.visit_planner)
+
+    assert np.all(eco.agents.status == SUSCEPTIBLE)
+    assert eco.loc_evolves == 0
@@ -15,7 +15,7 @@ def test_probability_general():
     assert utils.probability(0.5) in [True, False]
 
 
-@mock.patch("numpy.random.random")
+@mock.patch("facs.base.utils.rng.random")
 def test_probability_with_mock(mock_random):
     """Test the probability function with a mock."""
 
@@ -24,23 +24,14 @@ def test_probability_with_mock(mock_random):
     assert utils.probability(0.4) is False
 
 
-def test_probability_raises_warning():
-    """Test the probability function raises an error."""
-
-    with pytest.warns(UserWarning):
-        utils.probability(-0.1)
-    with pytest.warns(UserWarning):
-        utils.probability(1.1)
-
-
-@mock.patch("numpy.random.randint")
+@mock.patch("facs.base.utils.rng.integer")
 def test_get_random_int_valid(mock_randint):
     """Test the get_random_int function."""
 
     mock_randint.return_value = 3
     high = 10
     result = utils.get_random_int(high)
-    mock_randint.assert_called_once_with(0, high)
+    mock_randint.assert_called_once_with(high)
     assert result == 3
 
 
@@ -51,6 +42,18 @@ def test_get_random_int_negative_high():
         utils.get_random_int(-1)
 
 
+def test_sample_without_replacement():
+    """Test the sample_without_replacement function."""
+
+    sample = utils.sample_without_replacement(10, 10)
+    assert sorted(sample.tolist()) == list(range(10))
+    assert len(set(utils.sample_without_replacement(1000, 50).tolist())) == 50
+    assert len(utils.sample_without_replacement(5, 0)) == 0
+
+    with pytest.raises(ValueError):
+        utils.sample_without_replacement(3, 4)
+
+
 @mock.patch("os.path.exists", return_value=False)
 @mock.patch("builtins.open", new_callable=mock.mock_open)
 def test_open_new_file(mock_open, mock_exists):
@@ -0,0 +1,105 @@
+"""Tests for the VisitPlanner and VisitBuffer classes."""
+
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from facs.base.agents import SUSCEPTIBLE, INFECTIOUS
+from facs.base.config import Config
+from facs.base.house import House
+from facs.base.household import Household
+from facs.base.location import Location
+from facs.base.location_types import building_types, building_types_dict
+from facs.base.visits import VisitPlanner, VisitBuffer
+
+# pylint: disable=redefined-outer-name
+
+NUM_TYPES = len(building_types)
+SCHOOL = building_types_dict["school"]
+HOSPITAL = building_types_dict["hospital"]
+
+
+@pytest.fixture
+def eco():
+    """Return a mock Ecosystem with one house of 4 agents, 2 schools and a hospital."""
+
+    house = House(0, 0)
+    house.households.append(Household(house, [1.0] + [0.0] * 90, size=4))
+    table = house.agent_table
+    table.set_status(np.arange(4), SUSCEPTIBLE)
+
+    schools = [Location(1, "school", 0, 0, 100), Location(2, "school", 1, 1, 100)]
+    hospital = Location(3, "hospital", 2, 2, 5000)
+    for i, loc in enumerate(schools + [hospital]):
+        loc.loc_inf_minutes_id = i
+    table.locations.extend(schools + [hospital])
+
+    e = Mock()
+    e.config = Config()
+    e.agents = table
+    e.locations = {"school": schools, "hospital": [hospital]}
+    e.nearest_locations = np.full((1, NUM_TYPES, 2), -1, dtype="int32")
+    e.nearest_locations[0, SCHOOL] = [0, 1]
+    e.nearest_locations[0, HOSPITAL, 0] = 0
+    e.loc_groups = {}
+    e.loc_inf_minutes = np.zeros(3)
+    e.visit_minutes = 0.0
+    e.self_isolation_multiplier = 1.0
+    e.household_isolation_multiplier = 1.0
+    e.hospital_protection_factor = 0.5
+
+    def get_needs_bulk(ages, wfh, school, hospitalised):
+        needs = np.zeros((len(ages), NUM_TYPES), dtype="int32")
+        needs[:, SCHOOL] = 10000  # always visit
+        needs[hospitalised] = 0
+        needs[hospitalised, HOSPITAL] = 7
+        return needs
+
+    e.needs.get_needs_bulk = get_needs_bulk
+    return e
+
+
+def test_plan_visits_to_candidates(eco):
+    """Test that every agent visits one of its candidate schools."""
+
+    agents, locations, minutes = VisitPlanner(eco).plan(eco)
+
+    assert sorted(agents.tolist()) == [0, 1, 2, 3]
+    assert set(locations.tolist()) <= {0, 1}
+    assert np.all(minutes == 360)
+    assert eco.visit_minutes == 4 * 10000
+    assert not eco.loc_inf_minutes.any()
+
+
+def test_plan_visits_infectious_minutes(eco):
+    """Test that infectious visitors and hospitalised agents add infectious minutes."""
+
+    table = eco.agents
+    table.set_status([0, 1], INFECTIOUS)
+    table.set_hospitalised(1, True)
+    table.hospital[1] = 2
+
+    agents, locations, _ = VisitPlanner(eco).plan(eco)
+
+    assert 1 not in agents.tolist()
+    assert eco.loc_inf_minutes[2] == pytest.approx(7 / 7 * 0.5)
+    assert eco.loc_inf_minutes[locations[agents == 0][0]] == 360
+
+
+def test_visit_buffer_groups_by_location():
+    """Test that the buffer groups visits by location and can be reused."""
+
+    buffer = VisitBuffer(3, capacity=2)
+    buffer.load(np.array([5, 6, 7, 8]), np.array([2, 0, 2, 0]), np.arange(4.0))
+
+    assert len(buffer) == 4
+    assert list(buffer.offsets) == [0, 2, 2, 4]
+    agents, minutes = buffer.location_visits(2)
+    assert list(agents) == [5, 7]
+    assert list(minutes) == [0.0, 2.0]
+    assert len(buffer.location_visits(1)[0]) == 0
+
+    buffer.clear()
+    assert len(buffer) == 0
+    assert len(buffer.location_visits(0)[0]) == 0